@@ -0,0 +1,108 @@
+"""Hit rate and ops/sec of the LRU, LFU and TinyLFU caches against recorded or synthetic key access traces.
+
+Run from the repository root:
+
+    python -m benchmarks.cache_policies [trace ...] [--sizes 100,500,2000]
+
+A trace is a text file with one key per line. Any cache can record one while the bot is running with
+cache.start_trace(path) and cache.stop_trace(), e.g. from the owner eval command.
+
+Without trace files three synthetic workloads are replayed, shaped like the bots hot paths:
+    prefix  - guild IDs from on_message. A few very busy guilds and a long tail.
+    blocks  - author IDs from command checks. Heavy skew plus many users who only ever run one command.
+    tracks  - track search queries. Popular songs mixed with bursts of one off queries, like a playlist load.
+
+Every miss is followed by a set, the same way the bot fills its caches.
+"""
+import argparse
+import random
+import time
+
+import utils
+
+
+POLICIES = (utils.EvieeLRU, utils.LFUCache, utils.TinyLFUCache)
+MISSING = object()
+
+
+def zipf_keys(rand, count: int, universe: int, skew: float):
+    weights = [1 / (rank ** skew) for rank in range(1, universe + 1)]
+    return rand.choices(range(universe), weights=weights, k=count)
+
+
+def prefix_trace(rand, count: int):
+    return [str(k) for k in zipf_keys(rand, count, 5_000, 1.1)]
+
+
+def blocks_trace(rand, count: int):
+    keys = [str(k) for k in zipf_keys(rand, count, 20_000, 0.9)]
+
+    # One in five lookups is a user we will never see again.
+    for i in range(0, count, 5):
+        keys[i] = f'once-{i}'
+    return keys
+
+
+def tracks_trace(rand, count: int):
+    popular = zipf_keys(rand, count, 2_000, 1.0)
+    keys = []
+
+    i = 0
+    while len(keys) < count:
+        if rand.random() < 0.002:
+            # A scan of queries which are not repeated, e.g. loading a large playlist.
+            keys.extend(f'scan-{i}-{n}' for n in range(rand.randint(50, 400)))
+        else:
+            keys.append(f'track-{popular[i % count]}')
+        i += 1
+
+    return keys[:count]
+
+
+SYNTHETIC = {'prefix': prefix_trace, 'blocks': blocks_trace, 'tracks': tracks_trace}
+
+
+def load_trace(path: str):
+    with open(path, encoding='utf-8') as fp:
+        return [line.rstrip('\n') for line in fp if line.strip()]
+
+
+def replay(policy, keys, size: int):
+    cache = policy(name=f'bench-{policy.__name__}', limit=size)
+
+    start = time.perf_counter()
+    for key in keys:
+        if cache.get(key, MISSING) is MISSING:
+            cache[key] = True
+    elapsed = time.perf_counter() - start
+
+    return cache.hit_rate, len(keys) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('traces', nargs='*', help='Trace files with one key per line.')
+    parser.add_argument('--sizes', default='100,500,2000', help='Comma separated cache limits.')
+    parser.add_argument('--length', type=int, default=200_000, help='Length of each synthetic trace.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    if args.traces:
+        traces = {path: load_trace(path) for path in args.traces}
+    else:
+        rand = random.Random(args.seed)
+        traces = {name: func(rand, args.length) for name, func in SYNTHETIC.items()}
+
+    for name, keys in traces.items():
+        print(f'\n[{name}] {len(keys):,} accesses | {len(set(keys)):,} unique keys')
+        print(f'{"limit":>8} | ' + ' | '.join(f'{p.__name__:^27}' for p in POLICIES))
+
+        for size in sizes:
+            results = (replay(policy, keys, size) for policy in POLICIES)
+            print(f'{size:>8} | ' + ' | '.join(f'{rate:>7.2%} hits {ops:>11,.0f} op/s' for rate, ops in results))
+
+
+if __name__ == '__main__':
+    main()
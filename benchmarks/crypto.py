@@ -0,0 +1,73 @@
+"""Message archive encryption throughput, inline on the event loop vs batched through CryptoService.
+
+Run from the repository root:
+
+    python -m benchmarks.crypto [messages] [batch_size]
+
+"Loop time" is CPU time spent on the event loop thread, which is what every other handler waits on.
+"""
+from cryptography.fernet import Fernet
+
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+
+import utils
+
+
+def make_contents(count: int):
+    rand = random.Random(0)
+    letters = string.ascii_letters + ' ' * 10
+    return [''.join(rand.choices(letters, k=rand.randint(5, 300))) for _ in range(count)]
+
+
+async def inline(key, contents):
+    fernet = Fernet(key)
+    return [fernet.encrypt(c.encode()).decode() for c in contents]
+
+
+async def batched(service, contents, batch_size: int):
+    batches = [contents[i:i + batch_size] for i in range(0, len(contents), batch_size)]
+    results = await asyncio.gather(*(service.encrypt_many(b) for b in batches))
+    return [token for batch in results for token in batch]
+
+
+def measure(loop, coro):
+    wall, cpu = time.perf_counter(), time.thread_time()
+    ret = loop.run_until_complete(coro)
+    return ret, time.perf_counter() - wall, time.thread_time() - cpu
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    workers = os.cpu_count() or 2
+    utils.executors.register(utils.ManagedExecutor('cpu', kind='process', max_workers=workers, max_queue=1024))
+
+    key = Fernet.generate_key()
+    service = utils.CryptoService(key)
+    contents = make_contents(count)
+    loop = asyncio.get_event_loop()
+
+    # Warm the worker processes so start up is not measured.
+    loop.run_until_complete(batched(service, contents[:workers * 8], 8))
+
+    print(f'{count:,} messages | batches of {batch_size} | {workers} workers\n')
+
+    _, wall, cpu = measure(loop, inline(key, contents))
+    print(f'inline : {count / wall:>10,.0f} messages/sec | loop time {cpu:.3f}s')
+
+    tokens, bwall, bcpu = measure(loop, batched(service, contents, batch_size))
+    print(f'batched: {count / bwall:>10,.0f} messages/sec | loop time {bcpu:.3f}s '
+          f'({1 - bcpu / cpu:.0%} saved)')
+
+    assert Fernet(key).decrypt(tokens[-1].encode()).decode() == contents[-1]
+    utils.executors.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    main()
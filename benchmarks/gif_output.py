@@ -0,0 +1,67 @@
+"""Output size and send latency of the Fun GIFs, written whole by Pillow vs delta encoded by GifTemplate.encode.
+
+Run from the repository root:
+
+    python -m benchmarks.gif_output [renders] [--mbps 8] [--rtt 80]
+
+"before" is Image.save with every rendered frame appended, padding included, as the commands used to encode.
+"after" is encode_gif: changed rectangles only, and repeated frames merged into one longer frame.
+
+Send latency is render + encode time, plus the upload of the file at --mbps and one --rtt round trip. The upload
+is estimated from the size, nothing is sent to Discord.
+"""
+import argparse
+import io
+import time
+
+import utils
+
+
+TEXTS = {'a': 'Some Display Name', 'b': 'Myst', 'msg': 'Myst to rule the world!'}
+
+
+def before(template):
+    frames = template.render(TEXTS)
+
+    f = io.BytesIO()
+    frames[0].save(f, 'gif', save_all=True, duration=template.duration, loop=0, append_images=frames[1:])
+    return f.getvalue()
+
+
+def after(template):
+    return template.encode(template.render(TEXTS))
+
+
+def measure(func, template, renders: int):
+    start = time.perf_counter()
+    for _ in range(renders):
+        data = func(template)
+    return data, (time.perf_counter() - start) / renders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('renders', nargs='?', type=int, default=10)
+    parser.add_argument('--mbps', type=float, default=8.0, help='Upload bandwidth in megabits per second.')
+    parser.add_argument('--rtt', type=float, default=80.0, help='Round trip time to Discord in milliseconds.')
+    args = parser.parse_args()
+
+    registry = utils.TemplateRegistry()
+
+    def send(size: int, elapsed: float):
+        return elapsed + size * 8 / (args.mbps * 1_000_000) + args.rtt / 1000
+
+    print(f'{len(registry)} templates | upload {args.mbps}Mbps | rtt {args.rtt:.0f}ms\n')
+    print(f'{"template":>8} | {"bytes before":>12} | {"bytes after":>11} | {"saved":>5} | '
+          f'{"send before":>11} | {"send after":>10}')
+
+    for template in registry:
+        old, old_time = measure(before, template, args.renders)
+        new, new_time = measure(after, template, args.renders)
+
+        print(f'{template.name:>8} | {len(old):>12,} | {len(new):>11,} | {1 - len(new) / len(old):>5.0%} | '
+              f'{send(len(old), old_time) * 1000:>9.0f}ms | {send(len(new), new_time) * 1000:>8.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
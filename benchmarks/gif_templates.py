@@ -0,0 +1,91 @@
+"""Per render cost of the Fun image commands, before encoding.
+
+Run from the repository root:
+
+    python -m benchmarks.gif_templates [renders]
+
+Three ways of drawing the same text are compared:
+    uncached  - reopen and decode the GIF and load the font on every call, then draw.text on every frame.
+    preloaded - copy every frame of the preloaded template, then draw.text on every frame.
+    render    - GifTemplate.render. Text is rasterized once and stamped, untouched frames are shared.
+
+All three must produce identical frames. Encoding is not measured here.
+Memory is the size of the decoded palette frames.
+"""
+from PIL import Image, ImageDraw, ImageFont, ImageSequence
+
+import sys
+import time
+
+import utils
+from utils.templates import _palette_frames
+
+
+TEXTS = {'a': 'Some Display Name', 'b': 'Myst', 'msg': 'Myst to rule the world!'}
+
+
+def draw_text(frames, template, fonts):
+    for slot in template.slots:
+        text = TEXTS[slot.text]
+        font = fonts[slot.font.size]
+        size = utils.text_size(font, text)
+
+        for index in range(slot.start, slot.stop):
+            draw = ImageDraw.Draw(frames[index])
+            draw.fontmode = slot.fontmode or draw.fontmode
+            draw.text(slot.position(index, size), text, font=font, fill=slot.fill)
+
+    last = frames[-1]
+    frames.extend(last.copy() for _ in range(template.pad))
+    return frames
+
+
+def uncached(template, path: str, font: str):
+    fonts = {s.font.size: ImageFont.truetype(font, s.font.size) for s in template.slots}
+
+    with _palette_frames(), Image.open(path) as base:
+        frames = [frame.copy() for frame in ImageSequence.Iterator(base)]
+    return draw_text(frames, template, fonts)
+
+
+def preloaded(template, fonts):
+    return draw_text(template.copy_frames(), template, fonts)
+
+
+def timeit(func, *args, renders: int):
+    start = time.perf_counter()
+    for _ in range(renders):
+        func(*args)
+    return (time.perf_counter() - start) / renders
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    start = time.perf_counter()
+    registry = utils.TemplateRegistry()
+    load = time.perf_counter() - start
+
+    print(f'{len(registry)} templates loaded in {load * 1000:.0f}ms | missing: {", ".join(registry.missing) or "none"}')
+    print(f'registry: {registry.nbytes / 1024 ** 2:.2f}MiB of decoded frames held for the life of the cog\n')
+    print(f'{"template":>8} | {"frames":>6} | {"memory":>9} | {"uncached":>9} | {"preloaded":>9} | {"render":>9} | '
+          f'{"saved":>15}')
+
+    for template in registry:
+        font = registry.font_path
+
+        expected = [f.tobytes() for f in uncached(template, template.path, font)]
+        assert [f.tobytes() for f in preloaded(template, registry.fonts)] == expected, template.name
+        assert [f.tobytes() for f in template.render(TEXTS)] == expected, template.name
+
+        before = timeit(uncached, template, template.path, font, renders=renders)
+        middle = timeit(preloaded, template, registry.fonts, renders=renders)
+        after = timeit(template.render, TEXTS, renders=renders)
+
+        print(f'{template.name:>8} | {len(template):>6} | {template.nbytes / 1024:>7.0f}KiB | '
+              f'{before * 1000:>7.1f}ms | {middle * 1000:>7.1f}ms | {after * 1000:>7.1f}ms | '
+              f'{(before - after) * 1000:>6.1f}ms ({1 - after / before:>4.0%})')
+
+
+if __name__ == '__main__':
+    main()
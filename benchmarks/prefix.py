@@ -0,0 +1,128 @@
+"""Messages/sec through the on_message prefix stage, with and without the compiled PrefixMatcher.
+
+Run from the repository root:
+
+    python -m benchmarks.prefix [messages] [hit_ratio]
+
+The "without" path is the old get_prefix: sort the guilds prefixes, build a when_mentioned_or closure and
+then build a full EvieeContext before finding out the message had no prefix.
+"""
+import discord
+from discord.ext import commands
+
+import asyncio
+import random
+import sys
+import time
+
+import utils
+
+
+USER_ID = 319047630048985099
+GUILDS = 500
+
+
+class FakeUser:
+    __slots__ = ('id', 'bot', 'mention')
+
+    def __init__(self, id_, *, bot=False):
+        self.id = id_
+        self.bot = bot
+        self.mention = f'<@{id_}>'
+
+
+class FakeGuild:
+    __slots__ = ('id',)
+
+    def __init__(self, id_):
+        self.id = id_
+
+
+class FakeMessage:
+    __slots__ = ('content', 'guild', 'author', 'channel')
+
+    def __init__(self, content, guild):
+        self.content = content
+        self.guild = guild
+        self.author = FakeUser(1)
+        self.channel = None
+
+
+class BenchBot(commands.Bot):
+
+    def __init__(self, *, compiled: bool):
+        self.defaults = {'>>', 'eviee pls ', 'eviee '}
+        self.guild_settings = utils.SettingsStore(defaults=self.defaults)
+        self.compiled = compiled
+        self.invoked = 0
+
+        super().__init__(command_prefix=self.compiled_prefix if compiled else self.legacy_prefix)
+        self._connection.user = FakeUser(USER_ID, bot=True)
+
+    async def legacy_prefix(self, bot_, msg):
+        lru = sorted(self.guild_settings[msg.guild.id].prefixes, reverse=True)
+        return commands.when_mentioned_or(*lru)(bot_, msg)
+
+    async def compiled_prefix(self, bot_, msg):
+        return self.guild_settings[msg.guild.id].matcher(USER_ID).prefixes
+
+    async def on_message(self, message):
+        if message.author.bot:
+            return
+
+        if self.compiled and not self.guild_settings[message.guild.id].matcher(USER_ID).match(message.content):
+            return
+
+        ctx = await self.get_context(message, cls=utils.EvieeContext)
+
+        if not ctx.prefix:
+            return
+        self.invoked += 1
+
+
+def make_messages(count: int, hit_ratio: float):
+    words = ('hello', 'lol', 'does anyone know', 'eviee is cute', 'brb', 'gg', 'what time is it', 'evie')
+    prefixes = ('>>', 'eviee ', 'eviee pls ', f'<@{USER_ID}> ', '?!')
+    rand = random.Random(0)
+
+    messages = []
+    for _ in range(count):
+        guild = FakeGuild(rand.randrange(GUILDS))
+        content = ' '.join(rand.choice(words) for _ in range(rand.randint(1, 12)))
+
+        if rand.random() < hit_ratio:
+            content = f'{rand.choice(prefixes)}help'
+
+        messages.append(FakeMessage(content, guild))
+    return messages
+
+
+async def run(bot, messages):
+    start = time.perf_counter()
+    for message in messages:
+        await bot.on_message(message)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    hit_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    loop = asyncio.get_event_loop()
+    messages = make_messages(count, hit_ratio)
+
+    print(f'discord.py {discord.__version__} | {count} messages | {hit_ratio:.0%} with a prefix\n')
+
+    for compiled in (False, True):
+        bot = BenchBot(compiled=compiled)
+        bot.guild_settings.load([{'id': g, 'prefixes': None, 'autoroom': None, 'twitch': None}
+                                 for g in range(GUILDS)])
+        bot.guild_settings[0].add_prefix('?!')
+
+        elapsed = loop.run_until_complete(run(bot, messages))
+        label = 'with PrefixMatcher' if compiled else 'without (legacy)  '
+        print(f'{label}: {count / elapsed:>12,.0f} messages/sec  ({bot.invoked} contexts with a prefix)')
+
+
+if __name__ == '__main__':
+    main()
@@ -42,11 +42,8 @@ import pathlib
 import psutil
 import os
 import sys
-import time
 import traceback
 import websockets
-from collections import deque
-from cryptography.fernet import Fernet
 
 import utils
 
@@ -68,25 +65,7 @@ config.read('config.ini')
 
 
 async def get_prefix(bot_, msg):
-    if not msg.guild:
-        return bot_.defaults
-
-    if bot_.lru_prefix.get(msg.guild.id):
-        lru = sorted(bot_.lru_prefix[msg.guild.id], reverse=True)
-        return commands.when_mentioned_or(*lru)(bot_, msg)
-
-    async with bot_.pool.acquire() as conn:
-        async with conn.transaction():
-            ret = await conn.fetchval("""SELECT prefixes FROM guilds WHERE id IN ($1)""", msg.guild.id)
-            if not ret:
-                query = """INSERT INTO guilds(id, prefixes) VALUES($1, $2) ON CONFLICT (id)
-                           DO UPDATE SET prefixes = $2 WHERE guilds.id IN ($1)"""
-                await conn.execute(query, msg.guild.id, bot_.defaults)
-                ret = bot_.defaults
-
-    ret = sorted(ret, reverse=True)
-    bot_.lru_prefix[msg.guild.id] = [*ret]
-    return commands.when_mentioned_or(*ret)(bot_, msg)
+    return bot_.get_matcher(msg).prefixes
 
 
 class Botto(commands.Bot):
@@ -96,16 +75,33 @@ class Botto(commands.Bot):
         self.loop = loop
         self.initialised = False
         self.pool = None  # Async init
+        self.db = None  # Async init
         self.session = None  # Async init
         self.proc = psutil.Process()
         self.owners = (402159684724719617, 214925855359631360)
         self.starttime = datetime.datetime.utcnow()
 
         self.defaults = {'>>', 'eviee pls ', 'eviee '}  # Prefix Defaults
-        self.lru_prefix = utils.EvieeLRU(name='Prefix LRU', limit=120)
-        self.lru_blocks = utils.EvieeLRU(name='Blocks LRU', limit=500)
-        self._wspings = deque(maxlen=60)
-        self._rtts = deque(maxlen=60)
+        self.guild_settings = utils.SettingsStore(defaults=self.defaults)
+        self._default_matcher = None
+        self.blocks = utils.BlockIndex(self)
+        self.scheduler = utils.Scheduler(self)
+        self.batch_writers = {}
+        # Batches which can't be written while the database is down are journaled here and replayed later.
+        self.journal_dir = config.get('DB', 'journal_dir', fallback='journal')
+        self.telemetry = utils.CommandTelemetry()
+        self.leaderboards = utils.Leaderboards(self)
+
+        # Partition the message archive by expiry day and expire it by dropping partitions. Set in config.ini.
+        if config.getboolean('DB', 'partitioned_messages', fallback=False):
+            self.message_partitions = utils.DailyPartitions(self, table='messages', column='expiry', index=('mid',),
+                                                            horizon=datetime.timedelta(days=14))
+        else:
+            self.message_partitions = None
+        # WS and RTT latency history, by minute for a day, hour for a month and day for a year. Survives restarts.
+        self.pings = utils.TimeSeriesStore(config.get('STATS', 'latency_file', fallback='data/latency.ts'),
+                                           series=('ws', 'rtt'))
+        self.latency_sampler = utils.LatencySampler(self)
 
         self._config = config
         self._abstract_commands = None
@@ -114,7 +110,22 @@ class Botto(commands.Bot):
         self.categories = {}
         self.extensions_other = {}
 
-        self.fkey = Fernet(config.get('ENCRYPTION', '_token').encode())
+        self.crypto = utils.CryptoService(config.get('ENCRYPTION', '_token').encode())
+
+        # Long lived pools used by utils.evieecutor. "io" for blocking IO, "cpu" for GIL bound work.
+        self.executors = utils.executors
+        self.executors.register(utils.ManagedExecutor('io', kind='thread', max_workers=8, max_queue=64))
+        self.executors.register(utils.ManagedExecutor('cpu', kind='process', max_workers=os.cpu_count() or 2,
+                                                      max_queue=32, timeout=120))
+        # Fun GIFs are drawn and encoded here. Renders past workers + queue are turned away as busy.
+        self.executors.register(utils.ManagedExecutor('render', kind='process',
+                                                      max_workers=config.getint('RENDER', 'workers', fallback=2),
+                                                      max_queue=config.getint('RENDER', 'queue', fallback=8),
+                                                      timeout=30))
+        # Rendered GIFs are cached by content. Set RENDER.cache_dir to keep them across restarts.
+        self.renderer = utils.RenderService(cache_size=config.getint('RENDER', 'cache_mb', fallback=32) * 1024 ** 2,
+                                            cache_dir=config.get('RENDER', 'cache_dir', fallback=None) or None,
+                                            disk_size=config.getint('RENDER', 'disk_mb', fallback=256) * 1024 ** 2)
 
         super().__init__(command_prefix=get_prefix)
 
@@ -125,36 +136,90 @@ class Botto(commands.Bot):
     async def async_init(self):
         """Async Initializer."""
         self.remove_command('help')
-        self.pool = await asyncpg.create_pool(f'postgres://postgres:{config.get("DB", "_pass")}@localhost:5432/eviee')
+        # The statement cache holds every registered query, so each is prepared once per connection.
+        self.pool = await asyncpg.create_pool(f'postgres://postgres:{config.get("DB", "_pass")}@localhost:5432/eviee',
+                                              min_size=config.getint('DB', 'pool_min', fallback=4),
+                                              max_size=config.getint('DB', 'pool_max', fallback=16),
+                                              statement_cache_size=max(256, len(utils.Query.registry) * 2),
+                                              max_cached_statement_lifetime=0,
+                                              max_inactive_connection_lifetime=300)
+        self.db = utils.Database(self.pool)
         self.session = aiohttp.ClientSession(loop=self.loop)
 
+        self.scheduler.start()
+
+        await self.run_migrations()
         await self.load_cache()
+        await self.prepare_partitions()
+        await self.load_blocks()
+        await self.load_leaderboards()
         await self.load_modules()
         await self.load_abstractors()
 
-        self.loop.create_task(self.wspings())
-        self.loop.create_task(self.rttpings())
+        self.latency_sampler.start()
+        self.loop.create_task(self.renderer.warm())
+        self.scheduler.schedule('pings-flush', self.flush_pings, interval=600, delay=600,
+                                pause_on_reconnect=False, wait_until_ready=False)
+        self.scheduler.schedule('rollups', self.leaderboards.persist, interval=300, delay=300,
+                                pause_on_reconnect=False, wait_until_ready=False)
 
-    @utils.backoff_loop()
-    async def wspings(self):
-        await asyncio.sleep(60)
-        self._wspings.append(self.latency * 1000)
+    async def flush_pings(self):
+        self.pings.flush()
 
-    @utils.backoff_loop()
-    async def rttpings(self):
-        chan = self.get_channel(434972274467274762)
+    @utils.evieeloads
+    async def run_migrations(self):
+        """Create or upgrade the database schema from /migrations."""
+        for migration in await utils.Migrator(self.pool).migrate():
+            print(f'Applied migration {migration.version:04d}_{migration.name}')
 
-        ts = time.time()
-        msg = await chan.send('Ping!')
-        rtt = (time.time() - ts) * 1000
+    @utils.evieeloads
+    async def load_cache(self):
+        """Bulk load every guilds settings into memory."""
+        async with self.db.acquire() as conn:
+            ret = await conn.fetch(utils.queries.guilds_load)
+            missing = self.guild_settings.load(ret)
 
-        self._rtts.append(rtt)
-        await msg.delete()
+            if missing:
+                await conn.execute(utils.queries.guilds_fix_prefixes, list(self.defaults), missing)
 
-        await asyncio.sleep(60)
+    @utils.evieeloads
+    async def prepare_partitions(self):
+        """Convert the message archive to daily partitions on first run and create upcoming partitions."""
+        if self.message_partitions is None:
+            return
 
-    async def load_cache(self):
-        pass
+        if await self.message_partitions.convert():
+            print('Converted the messages table to daily partitions.')
+        await self.message_partitions.maintain()
+
+    @utils.evieeloads
+    async def load_blocks(self):
+        """Bulk load every global block into memory and arm the expiry timer."""
+        ret = await self.db.fetch(utils.queries.blocks_load)
+        self.blocks.load(ret)
+
+    @utils.evieeloads
+    async def load_leaderboards(self):
+        """Load the about command leaderboards and totals."""
+        await self.leaderboards.load()
+
+    def get_matcher(self, message):
+        """Return the compiled prefix matcher for a message. Unknown guilds are given default settings."""
+        if not message.guild:
+            if self._default_matcher is None:
+                self._default_matcher = utils.PrefixMatcher(self.defaults, user_id=self.user.id)
+            return self._default_matcher
+
+        settings = self.guild_settings.get(message.guild.id)
+        if settings is None:
+            settings = self.guild_settings.create(message.guild.id)
+            self.loop.create_task(self.insert_guild(settings))
+
+        return settings.matcher(self.user.id)
+
+    async def insert_guild(self, settings):
+        """Persist default settings for a guild which was not loaded at startup."""
+        await self.db.execute(utils.queries.guilds_insert, settings.id, settings.prefixes)
 
     def load_extension(self, name):
         """Default lib load_extension with a custom exception for better handling."""
@@ -194,7 +259,7 @@ class Botto(commands.Bot):
 
         # A bit messy(but hey it works)
         modules = [f'{p.parent}.{p.stem}' for p in pathlib.Path('.').rglob('*.py')
-                   if not str(p.parent).startswith('venv') and not p.stem.startswith(('main', '__'))]
+                   if not str(p.parent).startswith(('venv', 'benchmarks')) and not p.stem.startswith(('main', '__'))]
         failed = []
 
         for extension in modules:
@@ -216,18 +281,53 @@ class Botto(commands.Bot):
 
         Without this coroutine the bot will essentially break.
         Read /utils/core for more info."""
-        self._abstract_commands = {c.name: [] for c in self.commands if isinstance(c, utils.AbstractorCommand)}
+        self._abstract_commands = {}
 
         for command in self.commands:
-            if not isinstance(command, utils.AbstractorGroup):
+            self.add_abstractors(command)
+
+    def add_abstractors(self, command):
+        """Map each (abstractor, trigger) pair of an AbstractorGroup directly to its sub-command."""
+        if not isinstance(command, utils.AbstractorGroup):
+            return
+
+        for abstractor in command.abstractors:
+            if not isinstance(self.all_commands.get(abstractor), utils.AbstractorCommand):
+                raise utils.AbstractorException(f'Failed to add abstractor to group <{command.name}>.'
+                                                f' No abstractor named "{abstractor}" exists.')
+
+            # Groups need not define every abstractor they accept. Undefined ones fall through to CommandNotFound.
+            sub = command.all_commands.get(abstractor)
+            if sub is None:
                 continue
 
-            for abstractor in command.abstractors:
-                if abstractor in self._abstract_commands:
-                    self._abstract_commands[abstractor].extend([command.name, *command.aliases])
-                else:
-                    raise utils.AbstractorException(f'Failed to add abstractor to group <{command.name}>.'
-                                                    f' No abstractor named "{abstractor}" exists.')
+            for trigger in (command.name, *command.aliases):
+                self._abstract_commands[(abstractor, trigger)] = sub
+
+    def remove_abstractors(self, command):
+        """Remove an AbstractorGroups entries from the abstractor map."""
+        if not isinstance(command, utils.AbstractorGroup):
+            return
+
+        for abstractor in command.abstractors:
+            for trigger in (command.name, *command.aliases):
+                self._abstract_commands.pop((abstractor, trigger), None)
+
+    def add_command(self, command):
+        """Override add_command to keep the abstractor map up to date when modules are (re)loaded."""
+        super().add_command(command)
+
+        if self._abstract_commands is not None:
+            self.add_abstractors(command)
+
+    def remove_command(self, name):
+        """Override remove_command to keep the abstractor map up to date when modules are unloaded."""
+        command = super().remove_command(name)
+
+        # Removing an alias does not remove the command itself.
+        if command is not None and name == command.name and self._abstract_commands is not None:
+            self.remove_abstractors(command)
+        return command
 
     async def process_commands(self, ctx):
         """Override process commands.
@@ -236,7 +336,7 @@ class Botto(commands.Bot):
         if not ctx.command:
             raise commands.CommandNotFound('Command "{}" is not found'.format(ctx.invoked_with))
 
-        if ctx.command.name in self._abstract_commands:
+        if isinstance(ctx.command, utils.AbstractorCommand):
             view = ctx.view
             view.skip_ws()
 
@@ -246,16 +346,16 @@ class Botto(commands.Bot):
             if not trigger:
                 raise utils.MissingCommand(f'Missing command for abstractor "{ctx.command.name}".')
 
-            abstractors = self._abstract_commands[ctx.command.name]
-
-            if trigger in abstractors:
-                command = self.get_command(f'{trigger} {ctx.command.name}')
-            else:
-                raise utils.InvalidCommand(f'Command "{trigger}" is invalid for abstractor "{ctx.command.name}".')
+            command = self._abstract_commands.get((ctx.command.name, trigger))
 
             if not command:
-                raise commands.CommandNotFound(f'Command "{trigger} {ctx.command.name}" was not found while trying '
-                                               f'to invoke abstractor "{ctx.command.name} {trigger}".')
+                group = self.all_commands.get(trigger)
+
+                # The group accepts this abstractor but does not define it.
+                if isinstance(group, utils.AbstractorGroup) and ctx.command.name in group.abstractors:
+                    raise commands.CommandNotFound(f'Command "{trigger} {ctx.command.name}" was not found while '
+                                                   f'trying to invoke abstractor "{ctx.command.name} {trigger}".')
+                raise utils.InvalidCommand(f'Command "{trigger}" is invalid for abstractor "{ctx.command.name}".')
 
             return command
         return
@@ -267,6 +367,10 @@ class Botto(commands.Bot):
         if message.author.bot:
             return
 
+        # Reject messages without a prefix before building any Context.
+        if not self.get_matcher(message).match(message.content):
+            return
+
         ctx = await self.get_context(message, cls=utils.EvieeContext)
 
         if not ctx.prefix:
@@ -412,7 +516,23 @@ bot = Botto()
 
 async def shutdown(*, reason=None):
     """Somewhat clean shutdown with basic debug info."""
+    bot.scheduler.stop()
+
+    # Write anything still buffered before the pool goes away.
+    for writer in list(bot.batch_writers.values()):
+        await writer.close()
+
+    # A stalled or failing database must not stop the rest of shutdown.
+    try:
+        await bot.leaderboards.persist(timeout=5)
+    except Exception as e:
+        print('Failed to persist the leaderboards on shutdown.', file=sys.stderr)
+        traceback.print_exception(etype=type(e), tb=e.__traceback__, value=e)
+
+    bot.pings.flush()
+
     await bot.logout()
+    bot.executors.shutdown(wait=False)
 
     print(f'\n\nShutting down due to {type(reason).__name__}...\n{"="*30}\n')
     print(f'{datetime.datetime.utcnow()} || UTC\n\nPython: {sys.version}\nPlatform: {sys.platform}/{os.name}\n'
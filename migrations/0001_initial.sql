@@ -0,0 +1,57 @@
+-- The schema the bot has always used. Every statement is IF NOT EXISTS, so existing databases are adopted as is.
+
+CREATE TABLE IF NOT EXISTS guilds (
+    id bigint PRIMARY KEY,
+    prefixes text[],
+    autoroom bigint,
+    twitch bigint
+);
+
+-- No primary key, so the table can be converted to daily partitions on expiry. See utils.DailyPartitions.
+CREATE TABLE IF NOT EXISTS messages (
+    mid bigint NOT NULL,
+    aid bigint,
+    cid bigint,
+    gid bigint,
+    ts timestamp,
+    content text,
+    attachment text,
+    expiry timestamp NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS blocks (
+    id bigint PRIMARY KEY,
+    reason text,
+    start timestamp,
+    ends timestamp
+);
+
+CREATE TABLE IF NOT EXISTS tempchannels (
+    cid bigint PRIMARY KEY,
+    gid bigint,
+    mid bigint,
+    ts timestamp
+);
+
+CREATE TABLE IF NOT EXISTS commands (
+    name text,
+    ts timestamp,
+    gid bigint,
+    uid bigint,
+    cid bigint
+);
+
+CREATE TABLE IF NOT EXISTS stats (
+    item text PRIMARY KEY,
+    value bigint
+);
+
+CREATE TABLE IF NOT EXISTS osu (
+    id bigint PRIMARY KEY,
+    username text
+);
+
+CREATE TABLE IF NOT EXISTS twitch (
+    uid bigint PRIMARY KEY,
+    channel text
+);
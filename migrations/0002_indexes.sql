@@ -0,0 +1,22 @@
+-- Indexes for every lookup the bot makes which is not by primary key.
+
+-- get_quote. A partitioned messages table gets this index per partition instead.
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE relname = 'messages') = 'r' THEN
+        CREATE INDEX IF NOT EXISTS messages_mid_idx ON messages (mid);
+        CREATE INDEX IF NOT EXISTS messages_expiry_idx ON messages (expiry);
+    END IF;
+END
+$$;
+
+-- Block expiry, in order of end time.
+CREATE INDEX IF NOT EXISTS blocks_ends_idx ON blocks (ends);
+
+-- A members existing temp channel, on joining the auto room.
+CREATE INDEX IF NOT EXISTS tempchannels_mid_idx ON tempchannels (mid);
+
+-- Leaderboards and per user/guild/command history.
+CREATE INDEX IF NOT EXISTS commands_uid_idx ON commands (uid);
+CREATE INDEX IF NOT EXISTS commands_gid_idx ON commands (gid);
+CREATE INDEX IF NOT EXISTS commands_name_idx ON commands (name);
@@ -0,0 +1,8 @@
+-- Persisted about command leaderboards. See utils.Leaderboards.
+
+CREATE TABLE IF NOT EXISTS rollups (
+    kind text,
+    key text,
+    count bigint,
+    PRIMARY KEY (kind, key)
+);
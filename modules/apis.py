@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 
-import asyncio
 import importlib
 import inspect
 import itertools
@@ -143,7 +142,8 @@ class Source(metaclass=utils.MetaCog, category='API', thumbnail='https://i.imgur
         self.rtfs_anchors = None
         self.rtfs_revision = None
 
-        bot.loop.create_task(self._update_rtfs())
+        bot.scheduler.schedule('rtfs', self._update_rtfs, interval=3600, pause_on_reconnect=False,
+                               wait_until_ready=False)
 
     async def get_rtfs_revision(self):
         cmd = r'git ls-remote https://github.com/Rapptz/discord.py --tags rewrite HEAD~1..HEAD --format="%s (%cr)"'
@@ -168,33 +168,31 @@ class Source(metaclass=utils.MetaCog, category='API', thumbnail='https://i.imgur
         return embed
 
     async def _update_rtfs(self):
-        while not self.bot.is_closed():
-            try:
-                revision = await self.get_rtfs_revision()
-            except Exception:
-                await asyncio.sleep(600)
-                continue
+        """Scheduled job. Returns the delay until the next revision check."""
+        try:
+            revision = await self.get_rtfs_revision()
+        except Exception:
+            return 600
 
-            if not self.rtfs_revision:
-                pass
-            elif self.rtfs_revision == revision:
-                await asyncio.sleep(3600)
-                continue
+        if self.rtfs_revision and self.rtfs_revision == revision:
+            return 3600
 
-            if os.name == 'nt':
-                await self._rtfs_load()
-                return
+        if os.name == 'nt':
+            await self._rtfs_load()
+            self.bot.scheduler.cancel('rtfs')
+            return
 
-            try:
-                cmd = 'python3.6 -m pip install -U git+https://github.com/Rapptz/discord.py.git@rewrite'
-                process = subprocess.Popen(cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            cmd = 'python3.6 -m pip install -U git+https://github.com/Rapptz/discord.py.git@rewrite'
+            process = subprocess.Popen(cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-                output, error = process.communicate()
-                process.kill()
-            except Exception:
-                pass
+            output, error = process.communicate()
+            process.kill()
+        except Exception:
+            pass
 
-            await self._rtfs_load()
+        await self._rtfs_load()
+        return 3600
 
     async def _rtfs_load(self):
         self.rtfs_revision = await self.get_rtfs_revision()
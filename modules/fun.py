@@ -6,7 +6,6 @@ import enum
 import io
 import numpy
 import random
-from PIL import Image, ImageSequence, ImageFont, ImageDraw, ImageColor
 
 import utils
 
@@ -16,193 +15,51 @@ class Fun(metaclass=utils.MetaCog, category='Fun', thumbnail='https://i.imgur.co
 
     def __init__(self, bot):
         self.bot = bot
-
-    @property
-    def hug_colour(self):
-        return ImageColor.getcolor('#e94573', 'L')
+        self.renderer = bot.renderer
 
     @property
     def _licks(self):
         return {'lick1': self.make_lick, 'lick2': self.make_lick2}
 
-    async def make_hug(self, a, b):
-        font = ImageFont.truetype('resources/fonts/Playtime.ttf', 12)
-
-        invalid = (6, 8, 9, 10, 11)
-        values = {12: 45, 14: 10, 17: 5, 20: 5, 23: 5}
-
-        frames = []
-
-        def generate():
-            hugbase = 45
-
-            with Image.open('resources/hug.gif') as base:
-                for index, frame in enumerate(ImageSequence.Iterator(base)):
-                    draw = ImageDraw.Draw(frame)
+    async def render(self, name: str, filename: str, **texts):
+        """Render the template name with texts, keyed by slot, as a GIF file. Drawn and encoded in the render pool.
 
-                    if index in invalid:
-                        pass
-                    else:
-                        hugbase += values.get(index, 15)
-
-                    draw.text((hugbase, 115), f'{a.display_name}', font=font, fill=self.hug_colour)
-                    draw.text((170, 250), f'{b.display_name}', font=font, fill=self.hug_colour)
+        Raises MissingInstance when the templates GIF was not found at startup.
+        """
+        if name not in self.renderer:
+            raise utils.MissingInstance(f'The <{name}> template is not loaded.')
 
-                    frames.append(frame.copy())
-                    del draw
+        data = await self.renderer.render(name, texts)
+        return discord.File(io.BytesIO(data), filename)
 
-        await utils.evieecutor(generate, None, loop=self.bot.loop)
+    async def send_render(self, ctx, maker, *args):
+        """Send the file made by maker(*args), or tell the user why it could not be made."""
+        try:
+            file = await maker(*args)
+        except utils.ExecutorSaturated:
+            return await ctx.send("I'm drawing for a lot of people right now. Please try again in a moment!")
+        except utils.MissingInstance:
+            return await ctx.send('This command is not available right now, sorry!')
 
-        f = io.BytesIO()
-        frames[0].save(f, 'gif', save_all=True, duration=0, loop=0, append_images=frames[1:])
-        f.seek(0)
+        await ctx.send(file=file)
 
-        return discord.File(f, f'{a.id}{b.id}_hug.gif')
+    async def make_hug(self, a, b):
+        return await self.render('hug', f'{a.id}{b.id}_hug.gif', a=a.display_name, b=b.display_name)
 
     async def make_bn(self, user, msg: str):
-        font = ImageFont.truetype('resources/fonts/Playtime.ttf', 16)
-
-        msg = ' '.join(msg.split())
-        w, h = font.getsize(msg)
-
-        frames = []
-
-        def generate():
-            with Image.open('resources/bn.gif') as base:
-                for index, frame in enumerate(ImageSequence.Iterator(base)):
-                    if index >= 7:
-                        draw = ImageDraw.Draw(frame)
-                        draw.fontmode = '1'
-                        draw.text(((500 - w) / 2, (285 - h) / 2), msg, font=font, align='center', fill=99)
-                        del draw
-                        
-                    frames.append(frame.copy())
-
-        await utils.evieecutor(generate, None, loop=self.bot.loop)
-
-        last_frame = frames[-1]
-
-        for x in range(25):
-            frames.append(last_frame.copy())
-
-        f = io.BytesIO()
-        frames[0].save(f, 'gif', save_all=True, duration=0.1, loop=0, append_images=frames[1:])
-        f.seek(0)
-
-        return discord.File(f, f'{user.id}_bn.gif')
+        return await self.render('bn', f'{user.id}_bn.gif', msg=' '.join(msg.split()))
 
     async def make_lick2(self, a, b):
-        font = ImageFont.truetype('resources/fonts/Playtime.ttf', 30)
-
-        aw, ah = font.getsize(a.display_name)
-        bw, bh = font.getsize(b.display_name)
-
-        frames = []
-
-        def generate():
-            with Image.open('resources/lick2.gif') as base:
-                for index, frame in enumerate(ImageSequence.Iterator(base)):
-                    draw = ImageDraw.Draw(frame)
-                    draw.text(((420 - bw) / 2, 400), b.display_name, font=font, fill=self.hug_colour)
-                    draw.text(((730 - aw) / 2, 60), a.display_name, font=font, fill=99)
-
-                    frames.append(frame.copy())
-                    del draw
-
-        await utils.evieecutor(generate, None, loop=self.bot.loop)
-
-        f = io.BytesIO()
-        frames[0].save(f, 'gif', save_all=True, duration=0.1, loop=0, append_images=frames[1:])
-        f.seek(0)
-
-        return discord.File(f, f'{a.id}{b.id}_licks2.gif')
+        return await self.render('lick2', f'{a.id}{b.id}_licks2.gif', a=a.display_name, b=b.display_name)
 
     async def make_lick(self, a, b):
-        font = ImageFont.truetype('resources/fonts/Playtime.ttf', 30)
-
-        aw, ah = font.getsize(a.display_name)
-        bw, bh = font.getsize(b.display_name)
-
-        frames = []
-
-        def generate():
-            with Image.open('resources/lick.gif') as base:
-                for index, frame in enumerate(ImageSequence.Iterator(base)):
-                    draw = ImageDraw.Draw(frame)
-                    draw.text(((500 - bw) / 2, 450), b.display_name, font=font, fill=self.hug_colour)
-
-                    if index >= 60 or index <= 8:
-                        pass
-                    else:
-                        draw.text(((450 - aw) / 2, 150), a.display_name, font=font, align='center', fill=99)
-                        # draw.text(((500 - w) / 2, (285 - h) / 2), msg, font=font, align='center', fill=99)
-
-                    frames.append(frame.copy())
-                    del draw
-
-        await utils.evieecutor(generate, None, loop=self.bot.loop)
-        last_frame = frames[-1]
-
-        for x in range(25):
-            frames.append(last_frame.copy())
-
-        f = io.BytesIO()
-        frames[0].save(f, 'gif', save_all=True, duration=0.1, loop=0, append_images=frames[1:])
-        f.seek(0)
-
-        return discord.File(f, f'{a.id}{b.id}_lick.gif')
+        return await self.render('lick', f'{a.id}{b.id}_lick.gif', a=a.display_name, b=b.display_name)
 
     async def make_hearts(self, a, b):
-        font = ImageFont.truetype('resources/fonts/Playtime.ttf', 20)
-
-        aw, ah = font.getsize(a.display_name)
-        bw, bh = font.getsize(b.display_name)
-
-        frames = []
-
-        def generate():
-            with Image.open('resources/heart.gif') as base:
-                for index, frame in enumerate(ImageSequence.Iterator(base)):
-                    draw = ImageDraw.Draw(frame)
-                    draw.text(((270 - bw) / 2, 70), b.display_name, font=font, fill=self.hug_colour)
-                    draw.text(((730 - aw) / 2, 70), a.display_name, font=font, fill=99)
-
-                    frames.append(frame.copy())
-                    del draw
-
-        await utils.evieecutor(generate, None, loop=self.bot.loop)
-
-        f = io.BytesIO()
-        frames[0].save(f, 'gif', save_all=True, duration=0.1, loop=0, append_images=frames[1:])
-        f.seek(0)
-
-        return discord.File(f, f'{a.id}{b.id}_hearts.gif')
+        return await self.render('heart', f'{a.id}{b.id}_hearts.gif', a=a.display_name, b=b.display_name)
 
     async def make_kiss(self, a, b):
-        font = ImageFont.truetype('resources/fonts/Playtime.ttf', 15)
-
-        aw, ah = font.getsize(a.display_name)
-        bw, bh = font.getsize(b.display_name)
-
-        frames = []
-
-        def generate():
-            with Image.open('resources/kiss.gif') as base:
-                for index, frame in enumerate(ImageSequence.Iterator(base)):
-                    draw = ImageDraw.Draw(frame)
-                    draw.text(((240 - aw) / 2, 50), a.display_name, font=font, fill=99)
-                    draw.text(((425 - bw) / 2, 275), b.display_name, font=font, fill=99)
-
-                    frames.append(frame.copy())
-                    del draw
-
-        await utils.evieecutor(generate, None, loop=self.bot.loop)
-
-        f = io.BytesIO()
-        frames[0].save(f, 'gif', save_all=True, duration=0.1, loop=0, append_images=frames[1:])
-        f.seek(0)
-
-        return discord.File(f, f'{a.id}{b.id}_kiss.gif')
+        return await self.render('kiss', f'{a.id}{b.id}_kiss.gif', a=a.display_name, b=b.display_name)
 
     @commands.command(name='kiss', aliases=['x'], cls=utils.EvieeCommand)
     @commands.cooldown(4, 90, commands.BucketType.user)
@@ -224,7 +81,7 @@ class Fun(metaclass=utils.MetaCog, category='Fun', thumbnail='https://i.imgur.co
             return await ctx.send("You can't kiss the air... **`xD`**")
 
         await ctx.trigger_typing()
-        await ctx.send(file=await self.make_kiss(ctx.author, member))
+        await self.send_render(ctx, self.make_kiss, ctx.author, member)
 
     @commands.command(name='heart', aliases=['<3'], cls=utils.EvieeCommand)
     @commands.cooldown(4, 90, commands.BucketType.user)
@@ -246,7 +103,7 @@ class Fun(metaclass=utils.MetaCog, category='Fun', thumbnail='https://i.imgur.co
             return await ctx.send("You can't heart the air... **`xD`**")
 
         await ctx.trigger_typing()
-        await ctx.send(file=await self.make_hearts(ctx.author, member))
+        await self.send_render(ctx, self.make_hearts, ctx.author, member)
 
     @commands.command(name='hug', cls=utils.AbstractorGroup, abstractors=['give'])
     @commands.cooldown(3, 90, commands.BucketType.user)
@@ -268,7 +125,7 @@ class Fun(metaclass=utils.MetaCog, category='Fun', thumbnail='https://i.imgur.co
             return await ctx.send("You can't hug the air... **`xD`**")
 
         await ctx.trigger_typing()
-        await ctx.send(file=await self.make_hug(ctx.author, member))
+        await self.send_render(ctx, self.make_hug, ctx.author, member)
 
     @give_hug.command(name='give')
     async def _give_hug(self, ctx, *, member: discord.Member = None):
@@ -302,7 +159,7 @@ class Fun(metaclass=utils.MetaCog, category='Fun', thumbnail='https://i.imgur.co
             return await ctx.send('The length of your breaking news can not be longer than 50 characters long!')
 
         await ctx.trigger_typing()
-        await ctx.send(file=await self.make_bn(ctx.author, msg))
+        await self.send_render(ctx, self.make_bn, ctx.author, msg)
 
     @commands.command(name='lick', aliases=['licky'], cls=utils.EvieeCommand)
     @commands.cooldown(3, 90, commands.BucketType.user)
@@ -332,7 +189,7 @@ class Fun(metaclass=utils.MetaCog, category='Fun', thumbnail='https://i.imgur.co
         await ctx.trigger_typing()
 
         n = random.randint(1, 2)
-        await ctx.send(file=await self._licks[f'lick{n}'](ctx.author, member))
+        await self.send_render(ctx, self._licks[f'lick{n}'], ctx.author, member)
 
     @commands.command(name='dab', cls=utils.EvieeCommand)
     async def do_dab(self, ctx):
@@ -0,0 +1,337 @@
+from aiohttp import web
+
+import asyncio
+import collections
+import json
+import math
+import sys
+import time
+import traceback
+
+import utils
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Eviee - Live</title>
+<style>
+  body { font-family: sans-serif; background: #2c2f33; color: #eee; margin: 2em; }
+  .panel { display: inline-block; margin: 0 2em 2em 0; }
+  .value { font-size: 1.6em; }
+  canvas { background: #23272a; display: block; margin-top: .5em; }
+</style>
+</head>
+<body>
+<h2>Eviee - Live</h2>
+<div id="panels"></div>
+<script>
+const SERIES = {ws: 'WS Latency (ms)', rtt: 'REST Latency (ms)', messages: 'Messages / min', commands: 'Commands / min',
+                events: 'Gateway Events / min', players: 'Players'};
+const RATES = ['messages', 'commands', 'events'];
+let history = [];
+
+for (const [key, title] of Object.entries(SERIES)) {
+  document.getElementById('panels').insertAdjacentHTML('beforeend',
+    `<div class="panel"><div>${title}</div><div class="value" id="v-${key}">-</div>` +
+    `<canvas id="c-${key}" width="420" height="90"></canvas></div>`);
+}
+
+function points(key) {
+  if (!RATES.includes(key)) return history.map(s => s[key]);
+  return history.slice(1).map((s, i) => (s[key] - history[i][key]) * 60 / Math.max(1, s.ts - history[i].ts));
+}
+
+function draw() {
+  for (const key of Object.keys(SERIES)) {
+    const ys = points(key).filter(y => y !== null);
+    const canvas = document.getElementById(`c-${key}`), ctx = canvas.getContext('2d');
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    if (!ys.length) continue;
+
+    document.getElementById(`v-${key}`).textContent = ys[ys.length - 1].toFixed(RATES.includes(key) ? 0 : 1);
+    const lo = Math.min(...ys), hi = Math.max(...ys), span = (hi - lo) || 1;
+
+    ctx.strokeStyle = '#b28dff';
+    ctx.beginPath();
+    ys.forEach((y, i) => {
+      const x = i * canvas.width / Math.max(1, ys.length - 1);
+      ctx.lineTo(x, canvas.height - 5 - (y - lo) / span * (canvas.height - 10));
+    });
+    ctx.stroke();
+  }
+}
+
+const source = new EventSource('events');
+source.addEventListener('history', e => { history = JSON.parse(e.data); draw(); });
+source.onmessage = e => { history.push(JSON.parse(e.data)); history = history.slice(-720); draw(); };
+</script>
+</body>
+</html>
+"""
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Exposition:
+    """Builds a Prometheus text format exposition."""
+
+    __slots__ = ('lines', )
+
+    def __init__(self):
+        self.lines = []
+
+    def __str__(self):
+        return '\n'.join(self.lines) + '\n'
+
+    def add(self, name: str, kind: str, help_: str, samples):
+        """Add a metric. samples is an iterable of (labels, value) or a single value."""
+        if not isinstance(samples, (list, tuple)):
+            samples = [({}, samples)]
+
+        self.lines.append(f'# HELP eviee_{name} {help_}')
+        self.lines.append(f'# TYPE eviee_{name} {kind}')
+
+        for labels, value in samples:
+            if value is None or (isinstance(value, float) and not math.isfinite(value)):
+                continue
+
+            if labels:
+                fmt = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                self.lines.append(f'eviee_{name}{{{fmt}}} {value}')
+            else:
+                self.lines.append(f'eviee_{name} {value}')
+
+    def histogram(self, name: str, help_: str, histograms: dict, label: str):
+        """Add LatencyHistograms as a summary, one series per key of histograms."""
+        quantiles = []
+        sums = []
+        counts = []
+
+        for key, hist in histograms.items():
+            for q in (0.5, 0.95, 0.99):
+                quantiles.append(({label: key, 'quantile': q}, hist.percentile(q * 100)))
+            sums.append(({label: key}, hist.total))
+            counts.append(({label: key}, hist.count))
+
+        self.lines.append(f'# HELP eviee_{name} {help_}')
+        self.lines.append(f'# TYPE eviee_{name} summary')
+
+        for suffix, samples in (('', quantiles), ('_sum', sums), ('_count', counts)):
+            for labels, value in samples:
+                fmt = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                self.lines.append(f'eviee_{name}{suffix}{{{fmt}}} {value}')
+
+
+class Metrics(metaclass=utils.MetaCog, private=True, hidden=True):
+    """Prometheus metrics and a live page, served by aiohttp on the bots loop.
+
+    A snapshot is taken every few seconds into a ring buffer. Every live page client is sent the same serialized
+    snapshot, and the buffered history when it connects, so clients never cause any work of their own.
+    """
+
+    INTERVAL = 5
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.events = collections.Counter()
+
+        # An hour of snapshots, already serialized to JSON.
+        self.history = collections.deque(maxlen=720)
+        self.clients = set()
+        self.runner = None
+
+        bot.loop.create_task(self.start()).add_done_callback(self._started)
+        bot.scheduler.schedule('metrics-snapshot', self.snapshot, interval=self.INTERVAL, pause_on_reconnect=False)
+
+    def __unload(self):
+        self.bot.scheduler.cancel('metrics-snapshot')
+        self.bot.loop.create_task(self.stop())
+
+    async def start(self):
+        config = self.bot._config
+
+        app = web.Application()
+        app.router.add_get('/', self.page)
+        app.router.add_get('/events', self.stream)
+        app.router.add_get('/metrics', self.metrics)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+
+        site = web.TCPSite(runner, config.get('METRICS', 'host', fallback='127.0.0.1'),
+                           config.getint('METRICS', 'port', fallback=6969))
+        try:
+            await site.start()
+        except BaseException:
+            await runner.cleanup()
+            raise
+
+        self.runner = runner
+
+    def _started(self, task):
+        if task.cancelled() or task.exception() is None:
+            return
+
+        e = task.exception()
+        self.runner = None
+
+        print('Failed to start the metrics server:', file=sys.stderr)
+        traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
+
+    async def stop(self):
+        try:
+            for queue in self.clients:
+                # Lagging clients may have a full queue. Their backlog is dropped, they only need to see the end.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+        finally:
+            if self.runner is not None:
+                await self.runner.cleanup()
+                self.runner = None
+
+    async def on_socket_response(self, msg):
+        self.events[msg.get('t') or f'OP {msg.get("op")}'] += 1
+
+    def players(self):
+        client = getattr(self.bot, 'wavelink', None)
+        if client is None:
+            return 0, 0
+
+        players = client.players.values()
+        return len(players), sum(1 for p in players if getattr(p, 'is_playing', False))
+
+    async def snapshot(self):
+        pings = self.bot.pings
+        boards = self.bot.leaderboards
+
+        data = json.dumps({'ts': round(time.time(), 1),
+                           'ws': pings.latest('ws'),
+                           'rtt': pings.latest('rtt'),
+                           'messages': boards.totals['messages'],
+                           'commands': boards.totals['commands'],
+                           'events': sum(self.events.values()),
+                           'players': self.players()[0]})
+
+        self.history.append(data)
+
+        for queue in self.clients:
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # A client which can't keep up skips snapshots, rather than buffering them.
+                pass
+
+    async def page(self, request):
+        return web.Response(text=PAGE, content_type='text/html')
+
+    async def stream(self, request):
+        resp = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await resp.prepare(request)
+
+        queue = asyncio.Queue(maxsize=8)
+        self.clients.add(queue)
+
+        try:
+            await resp.write(f'event: history\ndata: [{",".join(self.history)}]\n\n'.encode())
+
+            while True:
+                data = await queue.get()
+                if data is None:
+                    break
+
+                await resp.write(f'data: {data}\n\n'.encode())
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.discard(queue)
+
+        return resp
+
+    async def metrics(self, request):
+        bot = self.bot
+        out = Exposition()
+
+        # Latency
+        out.add('websocket_latency_seconds', 'gauge', 'Gateway heartbeat ACK latency.', bot.latency)
+        rtt = bot.pings.latest('rtt')
+        out.add('rest_latency_seconds', 'gauge', 'Median REST request latency over the last sample window.',
+                rtt / 1000 if rtt is not None else None)
+        out.add('latency_probes_total', 'counter', 'Synthetic REST latency probes sent.', bot.latency_sampler.probes)
+
+        # Events
+        out.add('gateway_events_total', 'counter', 'Gateway events received.',
+                [({'event': k}, v) for k, v in self.events.items()])
+        out.add('messages_total', 'counter', 'Messages seen.', bot.leaderboards.totals['messages'])
+        out.add('commands_total', 'counter', 'Command invocations.',
+                [({'command': k}, v) for k, v in bot.telemetry.invocations.items()])
+        out.add('command_errors_total', 'counter', 'Failed command invocations.',
+                [({'command': k}, v) for k, v in bot.telemetry.errors.items()])
+        out.histogram('command_latency_seconds', 'Command latency.', bot.telemetry.histograms, 'command')
+        out.add('guilds', 'gauge', 'Guilds the bot is in.', len(bot.guilds))
+
+        # Music
+        players, playing = self.players()
+        out.add('players', 'gauge', 'Connected music players.', players)
+        out.add('players_playing', 'gauge', 'Music players currently playing.', playing)
+
+        # Caches
+        caches = sorted(utils.caches, key=lambda c: c.name)
+        out.add('cache_items', 'gauge', 'Items in cache.', [({'cache': c.name}, c.size) for c in caches])
+        out.add('cache_hits_total', 'counter', 'Cache hits.', [({'cache': c.name}, c.hits) for c in caches])
+        out.add('cache_misses_total', 'counter', 'Cache misses.', [({'cache': c.name}, c.misses) for c in caches])
+        out.add('cache_evictions_total', 'counter', 'Cache evictions.',
+                [({'cache': c.name}, c.evictions) for c in caches])
+
+        # Database
+        db = bot.db
+        out.add('db_connections_in_use', 'gauge', 'Pool connections currently acquired.', db.in_use)
+        out.add('db_acquire_timeouts_total', 'counter', 'Pool acquires which timed out.', db.acquire_timeouts)
+        out.histogram('db_acquire_wait_seconds', 'Time spent waiting for a pool connection.',
+                      {'all': db.acquire_wait}, 'pool')
+        out.add('db_query_calls_total', 'counter', 'Query executions.',
+                [({'query': s.name}, s.calls) for s in db.stats.values()])
+        out.add('db_query_errors_total', 'counter', 'Failed query executions.',
+                [({'query': s.name}, s.errors) for s in db.stats.values()])
+        out.add('db_query_seconds_total', 'counter', 'Time spent executing queries.',
+                [({'query': s.name}, s.total) for s in db.stats.values()])
+
+        # Batch writers
+        writers = list(bot.batch_writers.values())
+        out.add('batch_buffered_rows', 'gauge', 'Rows buffered in memory.',
+                [({'writer': w.name}, len(w)) for w in writers])
+        out.add('batch_journal_rows', 'gauge', 'Rows waiting in the journal to be replayed.',
+                [({'writer': w.name}, w.journal_depth) for w in writers])
+        out.add('batch_rows_written_total', 'counter', 'Rows written.',
+                [({'writer': w.name}, w.rows_written) for w in writers])
+        out.add('batch_rows_dropped_total', 'counter', 'Rows dropped.',
+                [({'writer': w.name}, w.dropped) for w in writers])
+
+        # Executors
+        executors = list(bot.executors)
+        out.add('executor_in_flight', 'gauge', 'Calls submitted and not finished.',
+                [({'executor': e.name}, e.in_flight) for e in executors])
+        out.add('executor_rejected_total', 'counter', 'Calls rejected because the executor was saturated.',
+                [({'executor': e.name}, e.rejected) for e in executors])
+        out.add('executor_restarts_total', 'counter', 'Pools rebuilt after a worker died.',
+                [({'executor': e.name}, e.restarts) for e in executors])
+        out.add('executor_queue_depth', 'gauge', 'Calls waiting for a free worker.',
+                [({'executor': e.name}, e.queue_depth) for e in executors])
+
+        # Fun renders
+        renderer = bot.renderer
+        out.add('renders_total', 'counter', 'GIFs rendered.',
+                [({'template': n}, c) for n, c in sorted(renderer.rendered.items())])
+        out.add('renders_rejected_total', 'counter', 'Renders turned away as busy.', renderer.rejected)
+        out.add('render_bytes_total', 'counter', 'Bytes of rendered GIFs.', renderer.bytes_out)
+        out.add('render_disk_hits_total', 'counter', 'Renders served from the disk cache.', renderer.disk_hits)
+        out.add('render_coalesced_total', 'counter', 'Requests which waited on an identical render in progress.',
+                renderer.coalesced)
+        out.add('render_disk_bytes', 'gauge', 'Bytes of renders kept on disk.', renderer.disk_bytes)
+
+        return web.Response(body=str(out).encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
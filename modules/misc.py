@@ -47,7 +47,7 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
         with open('./resources/MBTI.json') as f:
             self.questions = json.load(f)
 
-        bot.loop.create_task(self.temp_checker())
+        bot.scheduler.schedule('temp-channels', self.temp_checker, interval=120, delay=120)
 
     async def __error(self, ctx, error):
         if isinstance(error, commands.CommandOnCooldown):
@@ -75,12 +75,10 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
         if not after.channel:
             return
 
-        async with self.bot.pool.acquire() as conn:
-            chan = await conn.fetchval("""SELECT autoroom FROM guilds WHERE guilds.id IN ($1)""", mem.guild.id)
+        settings = self.bot.guild_settings.get(mem.guild.id)
 
-        if after.channel.id == chan:
-            async with self.bot.pool.acquire() as conn:
-                old = await conn.fetchval("""SELECT cid FROM tempchannels WHERE mid IN ($1)""", mem.id)
+        if settings and after.channel.id == settings.autoroom:
+            old = await self.bot.db.fetchval(utils.queries.tempchannels_for_member, mem.id)
             if old:
                 chan = self.bot.get_channel(old)
                 try:
@@ -186,9 +184,8 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
             if not cat:
                 cat = await ctx.guild.create_category(name='TEMP CHANNELS')
 
-            async with self.bot.pool.acquire() as conn:
-                chan = await conn.fetchval("""SELECT autoroom FROM guilds WHERE id IN ($1)""", ctx.guild.id)
-                chan = self.bot.get_channel(chan)
+            settings = self.bot.guild_settings[ctx.guild.id]
+            chan = self.bot.get_channel(settings.autoroom)
 
             if chan:
                 return await ctx.send('Your guild already has an Auto Temp Room.')
@@ -207,8 +204,9 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
         except discord.HTTPException:
             return await ctx.send('Something went wrong while trying to create your channel. Please try again.')
 
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""UPDATE guilds SET autoroom = $1 WHERE guilds.id IN ($2)""", chan.id, ctx.guild.id)
+        await self.bot.db.execute(utils.queries.guilds_set_autoroom, chan.id, ctx.guild.id)
+
+        settings.autoroom = chan.id
 
         await ctx.send('Your Auto Room has been setup!')
 
@@ -278,19 +276,15 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
                                                 category=cat,
                                                 reason='Temp Channel.')
 
-        async with self.bot.pool.acquire() as conn:
-            query = """INSERT INTO tempchannels(cid, gid, mid, ts) VALUES($1, $2, $3, $4)"""
-            await conn.execute(query, chan.id, guild.id, mem.id, datetime.datetime.utcnow())
+        await self.bot.db.execute(utils.queries.tempchannels_insert, chan.id, guild.id, mem.id,
+                                  datetime.datetime.utcnow())
 
         return chan
 
-    @utils.backoff_loop()
     async def temp_checker(self):
-        await asyncio.sleep(120)
-
-        async with self.bot.pool.acquire() as conn:
-            temps = await conn.fetch("""SELECT * FROM tempchannels""")
-            query = """DELETE FROM tempchannels WHERE cid IN ($1)"""
+        async with self.bot.db.acquire() as conn:
+            temps = await conn.fetch(utils.queries.tempchannels_all)
+            query = utils.queries.tempchannels_remove
 
             for c in temps:
                 ts = c['ts']
@@ -441,8 +435,7 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
 
             {ctx.prefix}quote 439045167790686208
         """
-        async with self.bot.pool.acquire() as conn:
-            msg = await conn.fetch("""SELECT * FROM messages WHERE mid IN($1)""", mid)
+        msg = await self.bot.db.fetch(utils.queries.messages_get, mid)
 
         if not msg:
             return await ctx.send('I could not find this message.')
@@ -452,7 +445,7 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
         user = self.bot.get_user(msg['aid'])
         guild = self.bot.get_guild(msg['gid'])
 
-        content = self.bot.fkey.decrypt(msg['content'].encode()).decode()
+        content = await self.bot.crypto.decrypt(msg['content'])
         embed = discord.Embed(title=str(user) if user else 'Unknown User', description=content, colour=0x36393E)
 
         if user:
@@ -528,11 +521,10 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
             user = ctx.author
 
         if isinstance(user, discord.Member):
-            async with self.bot.pool.acquire() as conn:
-                osu = await conn.fetchval("""SELECT username FROM osu WHERE id IN($1)""", user.id)
-                if not osu:
-                    return await ctx.send(f'{user} does not have an osu! account linked.\n'
-                                          f'`Set one with: {ctx.prefix}setosu osu_username`')
+            osu = await self.bot.db.fetchval(utils.queries.osu_get, user.id)
+            if not osu:
+                return await ctx.send(f'{user} does not have an osu! account linked.\n'
+                                      f'`Set one with: {ctx.prefix}setosu osu_username`')
         else:
             osu = user
 
@@ -565,10 +557,7 @@ class Misc(metaclass=utils.MetaCog, category='Misc', colour=0xa5d8d8, thumbnail=
 
     @commands.command(name='setosu', cls=utils.EvieeCommand)
     async def set_osu(self, ctx, *, name: str):
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""INSERT INTO osu(id, username) VALUES($1, $2)
-                                  ON CONFLICT(id) DO UPDATE SET username = $2 WHERE osu.id IN($1)""",
-                               ctx.author.id, name)
+        await self.bot.db.execute(utils.queries.osu_set, ctx.author.id, name)
 
         await ctx.send(f'Successfully set your osu! account to: `{name}`')
 
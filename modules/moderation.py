@@ -68,20 +68,18 @@ class Moderation(metaclass=utils.MetaCog, colour=0xffd0b5, thumbnail='https://i.
             {ctx.prefix}add prefix "eviee pls "
             {ctx.prefix}prefix add ?!
         """
-        lru = self.bot.lru_prefix[ctx.guild.id]
+        settings = self.bot.guild_settings[ctx.guild.id]
 
         prefix = prefix.strip('"').strip("'")
 
         if len(prefix) > 50:
             return await ctx.error(info='The prefix can not be over 50 characters long. Please try again.')
-        if prefix in lru:
+        if prefix in settings.prefixes:
             return await ctx.error(info=f'`"{prefix}"` is already an assigned prefix.')
 
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""UPDATE guilds SET prefixes = prefixes || $1::text WHERE id IN ($2)""",
-                               prefix, ctx.guild.id)
+        await self.bot.db.execute(utils.queries.guilds_add_prefix, prefix, ctx.guild.id)
 
-        lru.append(prefix)
+        settings.add_prefix(prefix)
         await ctx.send(f'The prefix `"{prefix}"` has successfully been added.')
 
     @prefix.command(name='remove')
@@ -96,16 +94,15 @@ class Moderation(metaclass=utils.MetaCog, colour=0xffd0b5, thumbnail='https://i.
             {ctx.prefix}remove prefix "eviee pls "
             {ctx.prefix}prefix remove ?!
         """
-        lru = self.bot.lru_prefix[ctx.guild.id]
+        settings = self.bot.guild_settings[ctx.guild.id]
 
         prefix = prefix.strip('"').strip("'")
 
-        if prefix not in lru:
+        if prefix not in settings.prefixes:
             return await ctx.error(info=f'`"{prefix}"` is not currently assigned to me.')
 
-        lru.remove(prefix)
-        await self.bot.pool.execute("""UPDATE guilds SET prefixes = array_remove(prefixes, $1::text) WHERE id IN ($2)""",
-                                    prefix, ctx.guild.id)
+        settings.remove_prefix(prefix)
+        await self.bot.db.execute(utils.queries.guilds_remove_prefix, prefix, ctx.guild.id)
 
         await ctx.send(f'Successfully removed `"{prefix}"` from my assigned prefixes.')
 
@@ -121,7 +118,8 @@ class Moderation(metaclass=utils.MetaCog, colour=0xffd0b5, thumbnail='https://i.
             {ctx.prefix}prefix list
             {ctx.prefix}list prefix
         """
-        await ctx.paginate(title=f'Prefixes for {ctx.guild.name}', entries=self.bot.lru_prefix[ctx.guild.id],
+        settings = self.bot.guild_settings[ctx.guild.id]
+        await ctx.paginate(title=f'Prefixes for {ctx.guild.name}', entries=settings.prefixes,
                            fmt='`"', footer='You may also mention me.')
 
     @commands.command(name='prefixes', cls=utils.EvieeCommand)
@@ -134,7 +132,8 @@ class Moderation(metaclass=utils.MetaCog, colour=0xffd0b5, thumbnail='https://i.
 
             {ctx.prefix}prefixes
         """
-        await ctx.paginate(title=f'Prefixes for {ctx.guild.name}', entries=self.bot.lru_prefix[ctx.guild.id],
+        settings = self.bot.guild_settings[ctx.guild.id]
+        await ctx.paginate(title=f'Prefixes for {ctx.guild.name}', entries=settings.prefixes,
                            fmt='`"', footer='You may also mention me.')
 
     @commands.command(name='ban', cls=utils.EvieeCommand)
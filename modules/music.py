@@ -35,7 +35,8 @@ class Music(metaclass=utils.MetaCog, thumbnail='https://i.imgur.com/8eJgtrh.png'
         self.bot = bot
         bot.wavelink = wavelink.Client(self.bot)
 
-        bot.loop.create_task(self.refresh_token())
+        bot.scheduler.schedule('spotify-token', self.refresh_token, interval=3500, pause_on_reconnect=False,
+                               wait_until_ready=False)
         bot.loop.create_task(self.initiate_nodes())
 
     async def initiate_nodes(self):
@@ -194,16 +195,13 @@ class Music(metaclass=utils.MetaCog, thumbnail='https://i.imgur.com/8eJgtrh.png'
         headers = {'Authorization': f'Basic {auth.decode()}',
                    'Content-Type': "application/x-www-form-urlencoded"}
 
-        while True:
-            async with self.bot.session.post('https://accounts.spotify.com/api/token', headers=headers,
-                                             data='grant_type=client_credentials') as resp:
-                value = await resp.json()
+        async with self.bot.session.post('https://accounts.spotify.com/api/token', headers=headers,
+                                         data='grant_type=client_credentials') as resp:
+            value = await resp.json()
 
-                self.bot._config.set('SPOTIFY', 'value', value['access_token'])
-                with open('config.ini', 'w') as configfile:
-                    self.bot._config.write(configfile)
-
-            await asyncio.sleep(3500)
+            self.bot._config.set('SPOTIFY', 'value', value['access_token'])
+            with open('config.ini', 'w') as configfile:
+                self.bot._config.write(configfile)
 
     async def get_spotify(self, id_):
         headers = {f'Accept': 'application/json', 'Content-Type': 'application/json',
@@ -1,22 +1,20 @@
 import discord
 from discord.ext import commands
 
-import asyncio
 import datetime
 import dbl
 import functools
 import humanize
 import inspect
-import itertools
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import psutil
 import numpy as np
+import psutil
 import os
 import pathlib
+import time
 from io import BytesIO
-from matplotlib.ticker import MultipleLocator
 from more_itertools import ilen, with_iter
 from PIL import Image, ImageSequence, ImageFont, ImageDraw, ImageColor
 from typing import Union
@@ -53,8 +51,23 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
 
         self.dbl = dbl.Client(self.bot, self.bot._config.get("DBL", "value"))
 
-        self.bot.loop.create_task(self.update_dbl())
-        self.bot.loop.create_task(self.expiry_check())
+        # Every message seen is archived and counted through one buffered writer, instead of two queries each.
+        self.archive = utils.BatchWriter(bot, 'messages', table='messages', prepare=self.encrypt_rows,
+                                         columns=('mid', 'aid', 'cid', 'gid', 'ts', 'content', 'attachment', 'expiry'),
+                                         journal=os.path.join(bot.journal_dir, 'messages.journal'))
+        self.command_log = utils.BatchWriter(bot, 'commands', table='commands',
+                                             columns=('name', 'ts', 'gid', 'uid', 'cid'),
+                                             journal=os.path.join(bot.journal_dir, 'commands.journal'))
+
+        # Rendered latency graphs, keyed by series and latency store version.
+        self.ping_plots = utils.EvieeLRU(name='Ping Plots', limit=4)
+
+        bot.scheduler.schedule('dbl', self.update_dbl, interval=1000, jitter=30)
+        bot.scheduler.schedule('message-expiry', self.expiry_check, interval=10300)
+
+    def __unload(self):
+        self.bot.loop.create_task(self.archive.close())
+        self.bot.loop.create_task(self.command_log.close())
 
     async def get_perms(self, ctx, target: Union[discord.Member, discord.Role], *, previous=None):
 
@@ -326,287 +339,58 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
         pages = await self.get_perms(ctx, target=target)
         await ctx.paginate(extras=pages)
 
-    def pager(self, entries, chunk: int):
-        for x in range(0, len(entries), chunk):
-            yield entries[x:x + chunk]
-
-    def hilo(self, numbers, indexm: int=1):
-        highest = [index * indexm for index, val in enumerate(numbers) if val == max(numbers)]
-        lowest = [index * indexm for index, val in enumerate(numbers) if val == min(numbers)]
-
-        return highest, lowest
-
-    def datetime_range(self, start, end, delta):
-        current = start
-        while current < end:
-            yield current
-            current += delta
-
-    def get_times(self):
-        # todo this is really bad so fix soon pls thanks kk weeeew
-
-        fmt = '%H%M'
-        current = datetime.datetime.utcnow()
-        times = []
-        times2 = []
-        times3 = []
-        tcount = 0
-
-        rcurrent = current - datetime.timedelta(minutes=60)
-        rcurrent2 = current - datetime.timedelta(minutes=30)
-        for x in range(7):
-            times.append(rcurrent + datetime.timedelta(minutes=tcount))
-            tcount += 10
+    async def ping_plot(self, ctx, series: str, name: str):
+        """Render the last hour of a latency series to PNG bytes, or None if less than half of it has samples.
 
-        tcount = 0
-        for x in range(7):
-            times2.append(rcurrent2 + datetime.timedelta(minutes=tcount))
-            tcount += 5
-
-        tcount = 0
-        for t3 in range(26):
-            times3.append(rcurrent + datetime.timedelta(minutes=tcount))
-            tcount += 60/25
+        Only finished minutes are drawn. Minutes without a sample are interpolated from their neighbours.
+        Renders are cached by the latency stores version, so repeat calls between samples are not re-rendered.
+        """
+        store = self.bot.pings
+        key = (series, store.version)
 
-        times = [t.strftime(fmt) for t in times]
-        times2 = [t.strftime(fmt) for t in times2]
-        times3 = [t.strftime(fmt) for t in times3]
+        png = self.ping_plots.get(key)
+        if png is not None:
+            return png
 
-        return times, times2, times3, current
+        # Any time in the last finished minute, so the current, usually empty, minute is not part of the hour.
+        minute = time.time() // 60 * 60
+        times, buckets = store.query(series, '1m', count=60, now=minute - 60)
+        if len(buckets) < 30:
+            return None
 
-    def ping_plotter(self, *, name, data: (tuple, list)=None):
+        await ctx.channel.trigger_typing()
 
-        # Base Data
-        if data is None:
-            numbers = list(self.bot._wspings)
-        else:
-            numbers = list(data)
-
-        long_num = list(itertools.chain.from_iterable(itertools.repeat(num, 2) for num in numbers))
-        chunks = tuple(self.pager(numbers, 4))
-
-        avg = list(itertools.chain.from_iterable(itertools.repeat(np.average(x), 8) for x in chunks))
-        mean = [np.mean(numbers)] * 60
-        prange = int(max(numbers)) - int(min(numbers))
-        plog = np.log(numbers)
-
-        t = np.sin(np.array(numbers) * np.pi*2 / 180.)
-        xnp = np.linspace(-np.pi, np.pi, 60)
-        # tmean = [np.mean(t)] * 60
-
-        # Spacing/Figure/Subs
-        plt.style.use('ggplot')
-        fig = plt.figure(figsize=(15, 7.5))
-        ax = fig.add_subplot(2, 2, 2, facecolor='aliceblue', alpha=0.3)   # Right
-        ax2 = fig.add_subplot(2, 2, 1, facecolor='thistle', alpha=0.2)  # Left
-        ax3 = fig.add_subplot(2, 1, 2, facecolor='aliceblue', alpha=0.3)  # Bottom
-        ml = MultipleLocator(5)
-        ml2 = MultipleLocator(1)
-
-        # Times
-        times, times2, times3, current = self.get_times()
-
-        # Axis's/Labels
-        plt.title(f'Latency over Time ({name}) | {current} UTC')
-        ax.set_xlabel(' ')
-        ax.set_ylabel('Network Stability')
-        ax2.set_xlabel(' ')
-        ax2.set_ylabel('Milliseconds(ms)')
-        ax3.set_xlabel('Time(HHMM) UTC')
-        ax3.set_ylabel('Latency(ms)')
-
-        if min(numbers) > 100:
-            ax3.set_yticks(np.arange(min(int(min(numbers)), 2000) - 100,
-                                     max(range(0, int(max(numbers)) + 100)) + 50, max(numbers) / 12))
-        else:
-            ax3.set_yticks(np.arange(min(0, 1), max(range(0, int(max(numbers)) + 100)) + 50, max(numbers) / 12))
-
-        # Labels
-        ax.yaxis.set_minor_locator(ml2)
-        ax2.xaxis.set_minor_locator(ml2)
-        ax3.yaxis.set_minor_locator(ml)
-        ax3.xaxis.set_major_locator(ml)
-
-        ax.set_ylim([-1, 1])
-        ax.set_xlim([0, np.pi])
-        ax.yaxis.set_ticks_position('right')
-        ax.set_xticklabels(times2)
-        ax.set_xticks(np.linspace(0, np.pi, 7))
-        ax2.set_ylim([min(numbers) - prange/4, max(numbers) + prange/4])
-        ax2.set_xlim([0, 60])
-        ax2.set_xticklabels(times)
-        ax3.set_xlim([0, 120])
-        ax3.set_xticklabels(times3, rotation=45)
-        plt.minorticks_on()
-        ax3.tick_params()
-
-        highest, lowest = self.hilo(numbers, 2)
-
-        mup = []
-        mdw = []
-        count = 0
-        p10 = mean[0] * (1 + 0.5)
-        m10 = mean[0] * (1 - 0.5)
-
-        for x in numbers:
-            if x > p10:
-                mup.append(count)
-            elif x < m10:
-                mdw.append(count)
-            count += 1
-
-        # Axis 2 - Left
-        ax2.plot(range(0, 60), list(itertools.repeat(p10, 60)), '--', c='indianred',
-                 linewidth=1.0,
-                 markevery=highest,
-                 label='+10%')
-        ax2.plot(range(0, 60), list(itertools.repeat(m10, 60)), '--', c='indianred',
-                 linewidth=1.0,
-                 markevery=highest,
-                 label='+-10%')
-        ax2.plot(range(0, 60), numbers, '-', c='blue',
-                 linewidth=1.0,
-                 label='Mark Up',
-                 alpha=.8,
-                 drawstyle='steps-post')
-        ax2.plot(range(0, 60), numbers, ' ', c='red',
-                 linewidth=1.0,
-                 markevery=mup,
-                 label='Mark Up',
-                 marker='^')
-        """ax2.plot(range(0, 60), numbers, ' ', c='green',
-                 linewidth=1.0, markevery=mdw,
-                 label='Mark Down',
-                 marker='v')"""
-        ax2.plot(range(0, 60), mean, label='Mean', c='blue',
-                linestyle='--',
-                linewidth=.75)
-        ax2.plot(list(range(0, 60)), plog, 'darkorchid',
-                 alpha=.9,
-                 linewidth=1,
-                 drawstyle='default',
-                 label='Ping')
-
-        # Axis 3 - Bottom
-        ax3.plot(list(range(0, 120)), long_num, 'darkorchid',
-                 alpha=.9,
-                 linewidth=1.25,
-                 drawstyle='default',
-                 label='Ping')
-        ax3.fill_between(list(range(0, 120)), long_num, 0, facecolors='darkorchid', alpha=0.3)
-        ax3.plot(range(0, 120), long_num, ' ', c='indianred',
-                 linewidth=1.0,
-                 markevery=highest,
-                 marker='^',
-                 markersize=12)
-        ax3.text(highest[0], max(long_num) - 10, f'{round(max(numbers))}ms', fontsize=12)
-        ax3.plot(range(0, 120), long_num, ' ', c='lime',
-                 linewidth=1.0,
-                 markevery=lowest,
-                 marker='v',
-                 markersize=12)
-        ax3.text(lowest[0], min(long_num) - 10, f'{round(min(numbers))}ms', fontsize=12)
-        ax3.plot(list(range(0, 120)), long_num, 'darkorchid',
-                 alpha=.5,
-                 linewidth=.75,
-                 drawstyle='steps-pre',
-                 label='Steps')
-        ax3.plot(range(0, 120), avg, c='forestgreen',
-                 linewidth=1.25,
-                 markevery=.5,
-                 label='Average')
-
-        # Axis - Right
-        """ax.plot(list(range(0, 60)), plog1, 'darkorchid',
-                 alpha=.9,
-                 linewidth=1,
-                 drawstyle='default',
-                 label='Ping')
-        ax.plot(list(range(0, 60)), plog2, 'darkorchid',
-                 alpha=.9,
-                 linewidth=1,
-                 drawstyle='default',
-                 label='Ping')
-        ax.plot(list(range(0, 60)), plog10, 'darkorchid',
-                 alpha=.9,
-                 linewidth=1,
-                 drawstyle='default',
-                 label='Ping')"""
-
-        ax.fill_between(list(range(0, 120)), .25, 1, facecolors='lime', alpha=0.2)
-        ax.fill_between(list(range(0, 120)), .25, -.25, facecolors='dodgerblue', alpha=0.2)
-        ax.fill_between(list(range(0, 120)), -.25, -1, facecolors='crimson', alpha=0.2)
-        ax.fill_between(xnp, t, 1, facecolors='darkred')
-
-        """ax.plot(list(range(0, 60)), t, 'darkred',
-                linewidth=1.0,
-                alpha=1,
-                label='Stability')
-        ax.plot(list(range(0, 60)), tmean, 'purple',
-                linewidth=1.0,
-                alpha=1,
-                linestyle=' ')
-        ax.plot(list(range(0, 60)), tp10, 'limegreen',
-                linewidth=1.0,
-                alpha=1,
-                linestyle=' ')
-        ax.plot(list(range(0, 60)), tm10, 'limegreen',
-                linewidth=1.0,
-                alpha=1,
-                linestyle=' ')"""
-
-        # Legend
-        ax.legend(bbox_to_anchor=(.905, .97), bbox_transform=plt.gcf().transFigure)
-        ax3.legend(loc='best', bbox_transform=plt.gcf().transFigure)
-
-        # Grid
-        ax.grid(which='minor')
-        ax2.grid(which='both')
-        ax3.grid(which='both')
-        plt.grid(True, alpha=0.25)
-
-        # Inverts
-        ax.invert_yaxis()
-
-        f = BytesIO()
-        plt.savefig(f, bbox_inches='tight')
-        f.seek(0)
+        hour = np.arange(minute - 3600, minute, 60)
+        numbers = np.interp(hour, times, buckets['sum'] / buckets['count']).tolist()
+        current = datetime.datetime.utcfromtimestamp(minute)
 
-        plt.clf()
-        plt.close()
-        return f
+        png = await utils.evieecutor(utils.render_ping_plot, 'cpu', self.bot.loop, name, numbers, current)
+        self.ping_plots[key] = png
+        return png
 
     @commands.command(name='wsping', cls=utils.EvieeCommand)
     @commands.cooldown(1, 45, commands.BucketType.user)
     async def ws_ping(self, ctx):
         """WebSocket Pings, shown as a pretty graph."""
-        if len(self.bot._wspings) < 60:
+        png = await self.ping_plot(ctx, 'ws', 'Websocket')
+        if png is None:
             return await ctx.send(f'WS Latency: **`{self.bot.latency * 1000}`ms**')
 
-        await ctx.channel.trigger_typing()
-
-        to_do = functools.partial(self.ping_plotter, name='Websocket')
-        pfile = await utils.evieecutor(to_do, loop=self.bot.loop)
-
-        await ctx.send(content=f'```ini\nLatest WS Ping: [{self.bot._wspings[-1]}]\n```\n'
+        await ctx.send(content=f'```ini\nLatest WS Ping: [{self.bot.pings.latest("ws")}]\n```\n'
                                f'Live Updates >> http://graphs.mysterial.me',
-                       file=discord.File(pfile, 'wsping.png'))
+                       file=discord.File(BytesIO(png), 'wsping.png'))
 
     @commands.command(name='rttping', cls=utils.EvieeCommand)
     @commands.cooldown(1, 45, commands.BucketType.user)
     async def rtt_ping(self, ctx):
         """RTT Pings, shown as a pretty graph."""
-        if len(self.bot._rtts) < 60:
-            return await ctx.send(f'Latest RTT: **`{self.bot._rtts[-1]}`ms**')
+        png = await self.ping_plot(ctx, 'rtt', 'RTT')
+        if png is None:
+            return await ctx.send(f'Latest RTT: **`{self.bot.pings.latest("rtt")}`ms**')
 
-        await ctx.channel.trigger_typing()
-
-        to_do = functools.partial(self.ping_plotter, data=self.bot._rtts, name='RTT')
-        pfile = await utils.evieecutor(to_do, loop=self.bot.loop)
-
-        await ctx.send(content=f'```ini\nLatest RTT: [{self.bot._rtts[-1]}]ms\n```\n'
+        await ctx.send(content=f'```ini\nLatest RTT: [{self.bot.pings.latest("rtt")}]ms\n```\n'
                                f'Live Updates >> http://graphs.mysterial.me',
-                       file=discord.File(pfile, 'rttping.png'))
+                       file=discord.File(BytesIO(png), 'rttping.png'))
 
     @commands.command(name='ping')
     @commands.cooldown(1, 45, commands.BucketType.user)
@@ -614,11 +398,8 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
         await ctx.invoke(self.ws_ping)
 
     async def on_message(self, msg):
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""INSERT INTO stats(item, value) VALUES('messages', 1)
-                                  ON CONFLICT(item)
-                                    DO UPDATE SET value = COALESCE(stats.value, 0)::int + 1
-                                    WHERE stats.item IN('messages')""")
+        self.archive.incr('messages')
+        self.bot.leaderboards.totals['messages'] += 1
 
         if msg.author.bot or not msg.guild:
             return
@@ -632,27 +413,39 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
             attachment = None
 
         expiry = datetime.datetime.utcnow() + datetime.timedelta(days=14)
-        content = self.bot.fkey.encrypt(msg.content.encode()).decode()
 
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""INSERT INTO messages(mid, aid, cid, gid, ts, content, attachment, expiry)
-                                  VALUES($1, $2, $3, $4, $5, $6, $7, $8)""",
-                               msg.id, msg.author.id, msg.channel.id, msg.guild.id, msg.created_at, content,
-                               attachment, expiry)
+        # Content is encrypted in bulk when the archive is flushed. See encrypt_rows.
+        await self.archive.put((msg.id, msg.author.id, msg.channel.id, msg.guild.id, msg.created_at, msg.content,
+                                attachment, expiry))
+
+    async def encrypt_rows(self, rows):
+        contents = await self.bot.crypto.encrypt_many([r[5] for r in rows])
+        return [(*r[:5], content, *r[6:]) for r, content in zip(rows, contents)]
 
     async def on_command_completion(self, ctx):
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""INSERT INTO stats(item, value) VALUES('commands', 1)
-                                  ON CONFLICT(item)
-                                    DO UPDATE SET value = COALESCE(stats.value, 0)::int + 1
-                                    WHERE stats.item IN('commands')""")
+        await self.log_command(ctx, failed=False)
+
+    async def on_command_error(self, ctx, error):
+        await self.log_command(ctx, failed=True)
+
+    async def log_command(self, ctx, *, failed: bool):
+        event = self.bot.telemetry.finish(ctx, failed=failed)
+        if event is None:
+            return
+
+        if not failed:
+            self.command_log.incr('commands')
+            self.bot.leaderboards.totals['commands'] += 1
+
+        self.bot.leaderboards.record(event)
+        await self.command_log.put((event.name, event.ts, event.gid, event.uid, event.cid))
 
-    @utils.backoff_loop()
     async def expiry_check(self):
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute("""DELETE FROM messages WHERE now() >= messages.expiry""")
+        if self.bot.message_partitions is not None:
+            await self.bot.message_partitions.maintain()
+            return
 
-        await asyncio.sleep(10300)
+        await self.bot.db.execute(utils.queries.messages_expire)
 
     @commands.command(name='linecount', cls=utils.EvieeCommand)
     async def lc(self, ctx, target=None):
@@ -673,32 +466,25 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
 
         await ctx.send(f'**{target} Lines:** `{length}`')
 
+    def podium(self, entries):
+        entries = [*entries, *[('N/A', 0)] * (3 - len(entries))]
+        return ''.join(f'{medal} {name} ({count})\n' for medal, (name, count) in zip(('🥇', '🥈', '🥉'), entries))
+
     @commands.command(name='about', cls=utils.EvieeCommand, aliases=['info'])
     async def about_(self, ctx):
-        async with self.bot.pool.acquire() as conn:
-            coms = await conn.fetchval("""SELECT value FROM stats WHERE item IN('commands')""")
-            messages = await conn.fetchval("""SELECT value FROM stats WHERE item IN('messages')""")
-
-            command_count = await conn.fetch("""SELECT name, count(*) AS count FROM commands
-                                                GROUP BY 1 ORDER BY count DESC""")
+        # Maintained in memory as commands run. See utils.Leaderboards.
+        boards = self.bot.leaderboards
+        coms = boards.totals['commands']
+        messages = boards.totals['messages']
 
-            ucount = await conn.fetch("""SELECT uid, count(*) AS count FROM commands GROUP BY uid
-                                          ORDER BY count DESC""")
-            gcount = await conn.fetch("""SELECT gid,count(*) AS count FROM commands GROUP BY gid
-                                          ORDER BY count DESC""")
-
-        uc1 = self.bot.get_user(ucount[0]['uid']) if self.bot.get_user(ucount[0]['uid']) else "N/A"
-        uc2 = self.bot.get_user(ucount[1]['uid']) if self.bot.get_user(ucount[1]['uid']) else "N/A"
-        uc3 = self.bot.get_user(ucount[2]['uid']) if self.bot.get_user(ucount[2]['uid']) else "N/A"
-
-        gc1 = self.bot.get_guild(gcount[0]['gid']).name if self.bot.get_guild(gcount[0]['gid']) else "N/A"
-        gc2 = self.bot.get_guild(gcount[1]['gid']).name if self.bot.get_guild(gcount[1]['gid']) else "N/A"
-        gc3 = self.bot.get_guild(gcount[2]['gid']).name if self.bot.get_guild(gcount[2]['gid']) else "N/A"
+        command_count = boards.commands.most_common(3)
+        ucount = [(self.bot.get_user(uid) or 'N/A', count) for uid, count in boards.users.top(3)]
+        gcount = [(getattr(self.bot.get_guild(gid), 'name', 'N/A'), count) for gid, count in boards.guilds.top(3)]
 
         uptime = format_delta(delta=datetime.datetime.utcnow() - self.bot.starttime, brief=False)
         memory = self.bot.proc.memory_full_info().uss / 1024 ** 2
         cpu = self.bot.proc.cpu_percent() / psutil.cpu_count()
-        ping = np.average(list(self.bot._wspings))
+        ping = self.bot.pings.mean('ws', 3600) or self.bot.latency * 1000
 
         embed = discord.Embed(colour=0xff6961,
                               description=f'**Useful Links:**\n'
@@ -731,18 +517,9 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
         gembed = discord.Embed(title='Latest Revisions:', description=revision, colour=0xff6961)
 
         cembed = discord.Embed(title='Command Stats', colour=0xff6961)
-        cembed.add_field(name='Top commands', value=f'🥇 {command_count[0]["name"]} ({command_count[0]["count"]})\n'
-                                                    f'🥈 {command_count[1]["name"]} ({command_count[1]["count"]})\n'
-                                                    f'🥉 {command_count[2]["name"]} ({command_count[2]["count"]})\n')
-        cembed.add_field(name='Top command users (Users)',
-                         value=f'🥇 {str(uc1)} ({ucount[0]["count"]})\n'
-                               f'🥈 {str(uc2)} ({ucount[1]["count"]})\n'
-                               f'🥉 {str(uc3)} ({ucount[2]["count"]})\n',
-                         inline=False)
-        cembed.add_field(name='Top command users (Guilds)',
-                         value=f'🥇 {gc1} ({gcount[0]["count"]})\n'
-                               f'🥈 {gc2} ({gcount[1]["count"]})\n'
-                               f'🥉 {gc3} ({gcount[2]["count"]})\n')
+        cembed.add_field(name='Top commands', value=self.podium(command_count))
+        cembed.add_field(name='Top command users (Users)', value=self.podium(ucount), inline=False)
+        cembed.add_field(name='Top command users (Guilds)', value=self.podium(gcount))
 
         await ctx.paginate(extras=[embed, gembed, cembed])
 
@@ -788,17 +565,11 @@ class Stats(metaclass=utils.MetaCog, colour=0xffebba, thumbnail='https://i.imgur
         await self.bot.user.edit(avatar=data)
 
     async def update_dbl(self):
-        while True:
-            try:
-                await self.dbl.post_server_count()
-            except Exception:
-                pass
-
-            await asyncio.sleep(1000)
+        try:
+            await self.dbl.post_server_count()
+        except Exception:
+            pass
 
     async def on_command(self, ctx):
-        async with self.bot.pool.acquire() as conn:
-            query = """INSERT INTO commands(name, ts, gid, uid, cid) VALUES($1, $2, $3, $4, $5)"""
-            await conn.execute(query, ctx.command.qualified_name, datetime.datetime.utcnow(),
-                               ctx.guild.id, ctx.author.id, ctx.channel.id)
+        self.bot.telemetry.start(ctx)
 
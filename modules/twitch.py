@@ -26,8 +26,7 @@ class TwitchCog(tcommands.TwitchBot):
         elif not isinstance(after.activity, discord.Streaming):
             return
 
-        async with self.dbot.pool.acquire() as conn:
-            data = await conn.fetchval("""SELECT twitch FROM guilds WHERE id = $1""", before.guild.id)
+        data = await self.dbot.db.fetchval(utils.queries.guilds_get_twitch, before.guild.id)
 
         if not data:
             return
@@ -63,8 +62,7 @@ class TwitchCog(tcommands.TwitchBot):
         if channel is None:
             channel = ctx.channel
 
-        async with self.dbot.pool.acquire() as conn:
-            await conn.execute("""UPDATE guilds SET twitch = $1 WHERE guilds.id = $2""", channel.id, ctx.guild.id)
+        await self.dbot.db.execute(utils.queries.guilds_set_twitch, channel.id, ctx.guild.id)
 
         role = discord.utils.get(ctx.guild.roles, name='Stream Announcements')
         if not role:
@@ -78,12 +76,11 @@ class TwitchCog(tcommands.TwitchBot):
     @twitch.command(name='subscribe', aliases=['sub'])
     @commands.bot_has_permissions(manage_roles=True)
     async def twitch_subscribe(self, ctx):
-        async with self.dbot.pool.acquire() as conn:
-            data = await conn.fetchval("""SELECT twitch FROM guilds WHERE id = $1""", ctx.guild.id)
+        data = await self.dbot.db.fetchval(utils.queries.guilds_get_twitch, ctx.guild.id)
 
-            if not data:
-                return await ctx.send('Your twitch announcement channel has not been setup yet.\n'
-                                      'Please run: `twitch channel` in your desired announcement channel.')
+        if not data:
+            return await ctx.send('Your twitch announcement channel has not been setup yet.\n'
+                                  'Please run: `twitch channel` in your desired announcement channel.')
 
         role = discord.utils.get(ctx.guild.roles, name='Stream Announcements')
         await ctx.author.add_roles(role, reason='Stream Announcements')
@@ -94,14 +91,13 @@ class TwitchCog(tcommands.TwitchBot):
     async def twitch_setup(self, ctx, *, channel: str):
         """Setup your Twitch channel for announcements.
         """
-        async with self.dbot.pool.acquire() as conn:
-            data = await conn.fetchval("""SELECT twitch FROM guilds WHERE id = $1""", ctx.guild.id)
+        async with self.dbot.db.acquire() as conn:
+            data = await conn.fetchval(utils.queries.guilds_get_twitch, ctx.guild.id)
 
             if not data:
                 return await ctx.send('Your twitch announcement channel has not been setup yet.\n'
                                       'Please run: `twitch channel` in your desired announcement channel.')
 
-            await conn.execute("""INSERT INTO twitch(uid, channel) VALUES($1, $2)
-                                  ON CONFLICT(uid) DO UPDATE SET channel = $2""", ctx.author.id, channel)
+            await conn.execute(utils.queries.twitch_set, ctx.author.id, channel)
 
         await ctx.send(f'Thanks. Your Twitch channel has been set to: `{channel}`')
@@ -56,9 +56,10 @@ class Player(wavelink.Player):
         self.was_back = False
 
         self._player_loop = bot.loop.create_task(self.player_loop())
-        self._manual_updater = bot.loop.create_task(self.manual_updater())
+        self._tasks = [self._player_loop]
 
-        self._tasks = [self._player_loop, self._manual_updater]
+        # One shared scheduler timer instead of a sleeping task per player.
+        bot.scheduler.schedule(f'player-updater:{guild_id}', self.manual_updater, interval=10, jitter=1)
 
         self.controls = {'⏯': 'rp',
                          '⏮': 'back',
@@ -79,12 +80,13 @@ class Player(wavelink.Player):
         self.backs = set()
 
     async def manual_updater(self):
-        while not self.bot.is_closed():
-            if self.update and not self.updating:
-                self.update = False
-                await self.invoke_controller()
+        if self.bot.wavelink.players.get(self.guild_id) is not self:
+            self.bot.scheduler.cancel(f'player-updater:{self.guild_id}')
+            return
 
-            await asyncio.sleep(10)
+        if self.update and not self.updating:
+            self.update = False
+            await self.invoke_controller()
 
     async def player_loop(self):
         await self.bot.wait_until_ready()
@@ -1,6 +1,23 @@
-from .cache import EvieeLRU
+from .cache import EvieeLRU, LFUCache, TinyLFUCache, caches
+from .settings import PrefixMatcher, GuildSettings, SettingsStore
+from .blocks import BlockIndex
 from .core import *
 from .errors import *
+from .executor import ManagedExecutor, ExecutorRegistry, executors
+from .scheduler import Job, Scheduler
+from .journal import Journal
+from .timeseries import Tier, TimeSeriesStore
+from .latency import LatencySampler
+from .plots import render_ping_plot
+from .templates import TextSlot, GifTemplate, TemplateRegistry, text_size
+from .render import RenderService
+from .batch import BatchWriter
+from .partitions import DailyPartitions
+from .db import Query, QueryStats, Database, DBConnection
+from . import queries
+from .migrations import Migration, Migrator, explain_check
+from .crypto import CryptoService
+from .telemetry import LatencyHistogram, CommandEvent, CommandTelemetry, SpaceSaving, Leaderboards
 from .paginators import *
 from .time import UserFriendlyTime
 from .fuzzy import finder as fuzzyfinder
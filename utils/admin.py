@@ -26,18 +26,6 @@ class Admin(metaclass=utils.MetaCog, private=True):
         self.bot = bot
 
         bot.add_check(self.block_check)
-        bot.loop.create_task(self.block_task())
-
-    @utils.backoff_loop()
-    async def block_task(self):
-        await asyncio.sleep(30)
-
-        ret = await self.bot.pool.fetch("""SELECT id FROM blocks WHERE now() >= blocks.ends""")
-
-        if ret:
-            await self.bot.pool.execute("""DELETE FROM blocks WHERE now() >= blocks.ends""")
-            for value in ret:
-                del self.bot.lru_blocks[value['id']]
 
     async def __local_check(self, ctx):
         if ctx.author.id not in self.bot.owners:
@@ -51,15 +39,10 @@ class Admin(metaclass=utils.MetaCog, private=True):
     async def block_check(self, ctx):
         if ctx.author.id in self.bot.owners:
             return True
-        elif ctx.author.id in self.bot.lru_blocks:
+        elif ctx.author.id in self.bot.blocks:
             raise utils.GloballyBlocked
 
-        ret = await self.bot.pool.fetchval("""SELECT id FROM blocks WHERE id IN ($1)""", ctx.author.id)
-        if ret:
-            self.bot.lru_blocks[ret] = None
-            raise utils.GloballyBlocked
-        else:
-            return True
+        return True
 
     @commands.command(name='load', cls=utils.EvieeCommand)
     async def cog_load(self, ctx, *, cog: str):
@@ -106,15 +89,12 @@ class Admin(metaclass=utils.MetaCog, private=True):
     async def block_add(self, ctx, target: typing.Union[discord.Member, discord.User], *,
                         when: utils.UserFriendlyTime(commands.clean_content, default='something')):
 
-        ret = await self.bot.pool.fetchval("""SELECT id FROM blocks WHERE id IN ($1)""", target.id)
-        if ret:
+        if target.id in self.bot.blocks:
             return await ctx.send(f'{target} is already blocked.')
 
-        await self.bot.pool.execute("""INSERT INTO blocks(id, reason, start, ends) VALUES ($1, $2, now(), $3)
-                              ON CONFLICT (id)
-                              DO NOTHING """, target.id, when.arg, when.dt)
+        await self.bot.db.execute(utils.queries.blocks_insert, target.id, when.arg, when.dt)
 
-        self.bot.lru_blocks[target.id] = None
+        self.bot.blocks.add(target.id, when.dt)
 
         await ctx.error(title=f'Blocked - {target}', info=f'User       : `{target}(ID: {target.id})`\n'
                                                           f'Reason  : `{when.arg}`\n'
@@ -127,17 +107,17 @@ class Admin(metaclass=utils.MetaCog, private=True):
 
     @blocks.command(name='remove')
     async def block_remove(self, ctx, *, target: typing.Union[discord.Member, discord.User]):
-        count = await self.bot.pool.execute("""DELETE FROM blocks WHERE id IN ($1)""", target.id)
+        count = await self.bot.db.execute(utils.queries.blocks_remove, target.id)
 
         if count == 'DELETE 0':
             return await ctx.send(f'Could not unblock {target}. They are probably not blocked?')
 
-        del self.bot.lru_blocks[target.id]
+        self.bot.blocks.remove(target.id)
         await ctx.send(f'Successfully removed {target} from global blocks.')
 
     @blocks.command(name='list')
     async def block_list(self, ctx):
-        ret = await self.bot.pool.fetch("""SELECT * FROM blocks""")
+        ret = await self.bot.db.fetch(utils.queries.blocks_list)
 
         if not ret:
             return await ctx.send('Currently no blocks to show.')
@@ -286,6 +266,128 @@ class Admin(metaclass=utils.MetaCog, private=True):
         pages = [embed] + pages
         await ctx.paginate(extras=pages)
 
+    @commands.command(name='executors', aliases=['pools'], cls=utils.EvieeCommand)
+    @commands.is_owner()
+    async def get_executors(self, ctx):
+        """Show queue depth and latency metrics for the bots executors."""
+        fmt = []
+
+        for executor in self.bot.executors:
+            fmt.append(f'[{executor.name}] ({executor.kind} x{executor.max_workers})\n'
+                       f'In Flight : {executor.in_flight} | Queued: {executor.queue_depth}/{executor.max_queue}\n'
+                       f'Submitted : {executor.submitted} | Completed: {executor.completed} | '
+                       f'Failed: {executor.failed}\n'
+                       f'Rejected  : {executor.rejected} | Timeouts: {executor.timeouts} | '
+                       f'Cancelled: {executor.cancelled} | Restarts: {executor.restarts}\n'
+                       f'Latency   : avg {executor.avg_latency * 1000:.2f}ms | max {executor.max_latency * 1000:.2f}ms')
+
+        await ctx.send('```ini\n{}\n```'.format('\n\n'.join(fmt) or 'No executors registered.'))
+
+    @commands.command(name='jobs', aliases=['scheduler'], cls=utils.EvieeCommand)
+    @commands.is_owner()
+    async def get_jobs(self, ctx):
+        """List every scheduled job with its next run, last duration and failure count."""
+        now = self.bot.loop.time()
+        entries = []
+
+        for job in self.bot.scheduler.jobs:
+            state = 'running' if job.running else f'in {job.next_run - now:.0f}s'
+            duration = f'{job.last_duration * 1000:.0f}ms' if job.last_duration is not None else 'N/A'
+            every = f'every {job.interval}s' if not job.one_shot else 'once'
+
+            entries.append(f'`{job.name}` ({every}) - Next: {state} | Last: {duration} | '
+                           f'Runs: {job.runs} | Failures: {job.failures}')
+
+        if not entries:
+            return await ctx.send('No jobs are currently scheduled.')
+
+        await ctx.paginate(title='Scheduled Jobs', entries=entries)
+
+    @commands.command(name='perf', cls=utils.EvieeCommand)
+    @commands.is_owner()
+    async def get_perf(self, ctx, *, command: str=None):
+        """Show latency percentiles per command, busiest first. Optionally for a single command."""
+        telemetry = self.bot.telemetry
+
+        if command:
+            names = [command] if command in telemetry.histograms else []
+        else:
+            names = [name for name, _ in telemetry.invocations.most_common()]
+
+        entries = []
+        for name in names:
+            hist = telemetry.histograms[name]
+            p50, p95, p99 = (hist.percentile(p) * 1000 for p in (50, 95, 99))
+
+            entries.append(f'`{name}` - Runs: {telemetry.invocations[name]} | Errors: {telemetry.errors[name]}\n'
+                           f'p50 `{p50:.0f}ms` | p95 `{p95:.0f}ms` | p99 `{p99:.0f}ms` | max `{hist.max * 1000:.0f}ms`')
+
+        if not entries:
+            return await ctx.send('No command telemetry to show.')
+
+        await ctx.paginate(title='Command Latency', entries=entries)
+
+    @commands.command(name='queries', cls=utils.EvieeCommand)
+    @commands.is_owner()
+    async def get_queries(self, ctx, *, query: str=None):
+        """Show latency percentiles per database query, by total time spent. Optionally for a single query."""
+        stats = self.bot.db.stats
+
+        if query:
+            found = [stats[query]] if query in stats else []
+        else:
+            found = sorted(stats.values(), key=lambda s: s.total, reverse=True)
+
+        entries = []
+        for qs in found:
+            hist = qs.histogram
+            p50, p95, p99 = (hist.percentile(p) * 1000 for p in (50, 95, 99))
+
+            entries.append(f'`{qs.name}` - Calls: {qs.calls} | Errors: {qs.errors} | Rows: {qs.rows} | '
+                           f'Total: `{qs.total:.2f}s`\n'
+                           f'p50 `{p50:.1f}ms` | p95 `{p95:.1f}ms` | p99 `{p99:.1f}ms` | max `{hist.max * 1000:.1f}ms`')
+
+        if not entries:
+            return await ctx.send('No query stats to show.')
+
+        await ctx.paginate(title='Query Latency', entries=entries)
+
+    @commands.command(name='caches', cls=utils.EvieeCommand)
+    @commands.is_owner()
+    async def get_caches(self, ctx):
+        """Show hit, miss and eviction statistics for every live cache."""
+        fmt = []
+
+        for cache in sorted(utils.caches, key=lambda c: c.name):
+            fmt.append(f'[{cache.name}] ; {type(cache).__name__}\n'
+                       f'Items     : {cache.size}/{cache.limit}\n'
+                       f'Hits      : {cache.hits} | Misses: {cache.misses} | Rate: {cache.hit_rate:.2%}\n'
+                       f'Evictions : {cache.evictions} | Expirations: {cache.expirations}')
+
+        await ctx.send('```ini\n{}\n```'.format('\n\n'.join(fmt) or 'No caches.'))
+
+    @commands.command(name='writers', cls=utils.EvieeCommand)
+    @commands.is_owner()
+    async def get_writers(self, ctx):
+        """Show buffer, journal and replay statistics for every batch writer."""
+        fmt = []
+
+        for writer in sorted(self.bot.batch_writers.values(), key=lambda w: w.name):
+            if writer.journal is not None:
+                rate = f'{writer.replay_rate:,.0f} rows/s' if writer.replay_rate else 'N/A'
+                journal = f'Journal   : {writer.journal_depth} rows | {writer.journal.size / 1024:.1f} KiB\n' \
+                          f'Spilled   : {writer.spilled} | Replayed: {writer.replayed} | Rate: {rate}\n'
+            else:
+                journal = ''
+
+            fmt.append(f'[{writer.name}] ; {writer.table} {"(failing)" if writer.failing else ""}\n'
+                       f'Buffered  : {len(writer)}/{writer.max_buffer}\n'
+                       f'Written   : {writer.rows_written} | Flushes: {writer.flushes} | Dropped: {writer.dropped}\n'
+                       f'{journal}'
+                       f'Errors    : {writer.errors} | Last: {writer.last_error}')
+
+        await ctx.send('```ini\n{}\n```'.format('\n\n'.join(fmt) or 'No batch writers.'))
+
     @commands.command(name='respond', cls=utils.EvieeCommand)
     @commands.is_owner()
     async def respond(self, ctx, user: typing.Union[discord.Member, discord.User], *, info: str):
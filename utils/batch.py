@@ -0,0 +1,313 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import asyncio
+import collections
+import functools
+import sys
+import time
+import traceback
+
+import utils
+from . import queries
+from .journal import Journal
+
+
+__all__ = ('BatchWriter', )
+
+
+class BatchWriter:
+    """A write behind buffer for high volume inserts and counter updates.
+
+    Rows are buffered in memory and written with a single COPY, and counter deltas are summed and written with a
+    single upsert, every max_rows rows or every interval seconds, whichever comes first.
+
+    With a journal, a batch which can not be written because the database is down, or no pool connection is free
+    within acquire_timeout, is appended to a local journal file instead. While writes are failing, full buffers are
+    spilled straight to the journal and only the periodic flush tries the database. Once a write succeeds the
+    journal is replayed in bulk, replay_rows rows per transaction.
+
+    Parameters
+    ------------
+    bot:
+        The bot. The writer is registered in bot.batch_writers under its name and flushed on shutdown.
+    name: str
+        A unique name for this writer. An existing writer with the same name is closed and replaced.
+    table: str
+        The table rows are copied into.
+    columns: tuple
+        The column names of each row, in order.
+    counters: Query [Optional]
+        The upsert counter deltas are written with, taking an array of keys and an array of deltas.
+        Defaults to queries.stats_add.
+    prepare: [Optional]
+        A coroutine function called with the buffered rows before each write, returning the rows to write.
+        Use this to do expensive per row work in bulk, off the put path. Rows are prepared before being journaled.
+    journal: str [Optional]
+        The path of the journal file. Without one, rows which fail to write are kept in memory and retried.
+    max_rows: int
+        Flush once this many rows are buffered. Defaults to 500.
+    interval: float
+        Flush at least this often, in seconds. Defaults to 2.
+    max_buffer: int
+        The max amount of buffered rows. When full, put waits up to max_wait seconds for a flush to make room and
+        then drops the row. Defaults to 20,000.
+    max_wait: float
+        Defaults to 5.
+    acquire_timeout: float
+        Seconds to wait for a pool connection before treating the write as failed. Defaults to 2.
+    replay_rows: int
+        Defaults to 5,000.
+    """
+
+    __slots__ = ('bot', 'name', 'table', 'columns', 'counters', 'prepare', 'journal', 'max_rows', 'interval',
+                 'max_buffer', 'max_wait', 'acquire_timeout', 'replay_rows',
+                 '_rows', '_deltas', '_lock', '_drained', '_flusher', '_closed', '_failing',
+                 'flushes', 'rows_written', 'dropped', 'errors', 'last_flush', 'last_error',
+                 'spilled', 'replayed', 'replay_rate')
+
+    def __init__(self, bot, name: str, *, table: str, columns: tuple, counters=queries.stats_add, prepare=None,
+                 journal: str=None, max_rows: int=500, interval: float=2, max_buffer: int=20_000, max_wait: float=5,
+                 acquire_timeout: float=2, replay_rows: int=5000):
+        self.bot = bot
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.counters = counters
+        self.prepare = prepare
+        self.journal = Journal(journal) if journal else None
+        self.max_rows = max_rows
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self.max_wait = max_wait
+        self.acquire_timeout = acquire_timeout
+        self.replay_rows = replay_rows
+
+        self._rows = []
+        self._deltas = collections.Counter()
+        self._lock = asyncio.Lock()
+        self._drained = asyncio.Event()
+        self._flusher = None
+        self._closed = False
+        self._failing = False
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_flush = None
+        self.last_error = None
+
+        self.spilled = 0
+        self.replayed = 0
+        self.replay_rate = None
+
+        old = bot.batch_writers.get(name)
+        if old is not None:
+            bot.loop.create_task(old.close())
+
+        bot.batch_writers[name] = self
+        bot.scheduler.schedule(f'batch:{name}', self.flush, interval=interval, delay=interval,
+                               pause_on_reconnect=False, wait_until_ready=False)
+
+    def __repr__(self):
+        return f'<BatchWriter name={self.name} table={self.table} buffered={len(self._rows)} ' \
+               f'written={self.rows_written} dropped={self.dropped} journaled={self.journal_depth}>'
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def pending_counters(self):
+        return dict(self._deltas)
+
+    @property
+    def failing(self):
+        """Whether the last write failed. Only the periodic flush retries the database while failing."""
+        return self._failing
+
+    @property
+    def journal_depth(self):
+        """Rows waiting in the journal to be replayed."""
+        return self.journal.rows if self.journal is not None else 0
+
+    def incr(self, key: str, amount: int=1):
+        """Add to a counter. Deltas are summed in memory and written once per flush."""
+        self._deltas[key] += amount
+
+    async def put(self, row: tuple):
+        """Buffer a row, applying backpressure when the buffer is full."""
+        if self._closed:
+            self.dropped += 1
+            return
+
+        if len(self._rows) >= self.max_buffer:
+            self._trigger(force=True)
+            self._drained.clear()
+
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+
+            if len(self._rows) >= self.max_buffer:
+                self.dropped += 1
+                return
+
+        self._rows.append(row)
+
+        if len(self._rows) >= self.max_rows:
+            self._trigger()
+
+    def _trigger(self, *, force: bool=False):
+        # While the database is failing only the periodic flush retries, so we don't retry on every row.
+        # A full buffer can still be spilled to the journal, which does not touch the database.
+        if self._failing and not (force and self.journal is not None):
+            return
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = self.bot.loop.create_task(self.flush(spill=self._failing))
+
+    async def _journal_io(self, func, *args):
+        try:
+            return await utils.executors['io'].run(func, *args)
+        except (utils.ExecutorSaturated, utils.MissingInstance):
+            return func(*args)
+
+    async def flush(self, *, spill: bool=False):
+        """Write every buffered row and counter delta, then replay the journal if it has anything in it.
+
+        With spill, buffered rows go straight to the journal without trying the database.
+        """
+        async with self._lock:
+            try:
+                written = await self._flush(spill and self.journal is not None)
+
+                # Replaying also retries the database after a failure, when there were no new rows to write.
+                if written and self.journal is not None and not (self._closed or spill):
+                    await self._replay()
+            finally:
+                self._drained.set()
+
+    async def _flush(self, spill: bool) -> bool:
+        # Returns whether the buffer was written to the database, or was empty.
+        rows, self._rows = self._rows, []
+        deltas, self._deltas = self._deltas, collections.Counter()
+
+        if not rows and not deltas:
+            return True
+
+        started = time.perf_counter()
+        prepared = None
+        try:
+            prepared = await self.prepare(rows) if self.prepare and rows else rows
+            if spill:
+                if not await self._spill(prepared, deltas):
+                    self._restore(rows, deltas)
+                return False
+
+            await self._write(prepared, deltas)
+        except Exception as e:
+            self.errors += 1
+            self._failing = True
+            self.last_error = f'{type(e).__name__}: {e}'
+
+            print(f'Failed to flush BatchWriter <{self.name}> ({len(rows)} rows):', file=sys.stderr)
+            traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
+
+            if prepared is None or self.journal is None or not await self._spill(prepared, deltas):
+                self._restore(rows, deltas)
+            return False
+
+        self._failing = False
+        self.flushes += 1
+        self.rows_written += len(rows)
+        self.last_flush = time.perf_counter() - started
+        return True
+
+    def _restore(self, rows, deltas):
+        # Keep the unprepared rows for the next flush, without growing past the buffer limit.
+        self._rows[:0] = rows
+        self._deltas.update(deltas)
+
+        overflow = len(self._rows) - self.max_buffer
+        if overflow > 0:
+            del self._rows[:overflow]
+            self.dropped += overflow
+
+    async def _spill(self, rows, deltas) -> bool:
+        try:
+            await self._journal_io(self.journal.append, rows, dict(deltas))
+        except Exception as e:
+            print(f'Failed to journal BatchWriter <{self.name}> ({len(rows)} rows):', file=sys.stderr)
+            traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
+            return False
+
+        self.spilled += len(rows)
+        return True
+
+    async def _replay(self):
+        started = time.perf_counter()
+        replayed = 0
+
+        while self.journal.frames:
+            rows, deltas, frames, offset = await self._journal_io(self.journal.read, self.replay_rows)
+
+            try:
+                await self._write(rows, deltas)
+            except Exception as e:
+                self.errors += 1
+                self._failing = True
+                self.last_error = f'{type(e).__name__}: {e}'
+                break
+
+            self._failing = False
+
+            await self._journal_io(functools.partial(self.journal.commit, offset, rows=len(rows), frames=frames))
+            replayed += len(rows)
+
+            # Let buffered rows and other tasks through between replay transactions.
+            await asyncio.sleep(0)
+
+        if replayed:
+            self.replayed += replayed
+            self.rows_written += replayed
+            self.replay_rate = replayed / (time.perf_counter() - started)
+
+    async def _write(self, rows, deltas):
+        async with self.bot.db.acquire(timeout=self.acquire_timeout) as conn:
+            async with conn.transaction():
+                if rows:
+                    await conn.copy_records_to_table(self.table, records=rows, columns=self.columns)
+
+                if deltas:
+                    await conn.execute(self.counters, list(deltas.keys()), list(deltas.values()))
+
+    async def close(self):
+        """Stop the periodic flush and write everything which is left."""
+        self._closed = True
+
+        if self.bot.batch_writers.get(self.name) is self:
+            del self.bot.batch_writers[self.name]
+            self.bot.scheduler.cancel(f'batch:{self.name}')
+
+        await self.flush()
@@ -0,0 +1,138 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import datetime
+import heapq
+
+from . import queries
+
+__all__ = ('BlockIndex', )
+
+
+class BlockIndex:
+    """Every global block, held in memory and keyed by user ID.
+
+    This is bulk loaded once at startup and written through by anything which blocks or unblocks a user,
+    so checking a user is a dict lookup. Expiry is a single one-shot scheduler job armed for the earliest end time,
+    instead of polling the table.
+
+    End times are naive UTC datetimes, the same as the blocks table. Blocks without an end time never expire.
+    """
+
+    __slots__ = ('bot', '_ends', '_heap', '_armed')
+
+    JOB = 'block-expiry'
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self._ends = {}
+        self._heap = []
+        self._armed = None
+
+    def __repr__(self):
+        return f'<BlockIndex blocks: {len(self._ends)} next expiry: {self.next_expiry}>'
+
+    def __contains__(self, user_id: int):
+        return user_id in self._ends
+
+    def __len__(self):
+        return len(self._ends)
+
+    def get(self, user_id: int, default=None):
+        """Return when a users block ends."""
+        return self._ends.get(user_id, default)
+
+    @property
+    def next_expiry(self):
+        self._prune()
+
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def load(self, records):
+        """Populate the index from blocks table records and arm the expiry timer."""
+        self._ends.clear()
+        self._heap.clear()
+
+        for record in records:
+            self._ends[record['id']] = record['ends']
+
+            if record['ends'] is not None:
+                self._heap.append((record['ends'], record['id']))
+
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def add(self, user_id: int, ends: datetime.datetime=None):
+        self._ends[user_id] = ends
+
+        if ends is not None:
+            heapq.heappush(self._heap, (ends, user_id))
+        self._arm()
+
+    def remove(self, user_id: int):
+        ends = self._ends.pop(user_id, None)
+        self._arm()
+
+        return ends
+
+    def _prune(self):
+        # Entries are left in the heap when a user is unblocked or blocked again, and skipped here.
+        heap = self._heap
+        while heap and self._ends.get(heap[0][1], None) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _arm(self):
+        when = self.next_expiry
+
+        if when == self._armed:
+            return
+
+        self._armed = when
+        if when is None:
+            self.bot.scheduler.cancel(self.JOB)
+            return
+
+        delay = (when - datetime.datetime.utcnow()).total_seconds()
+        self.bot.scheduler.schedule(self.JOB, self._expire, delay=max(0, delay),
+                                    pause_on_reconnect=False, wait_until_ready=False)
+
+    async def _expire(self):
+        now = datetime.datetime.utcnow()
+        expired = []
+
+        self._prune()
+        while self._heap and self._heap[0][0] <= now:
+            ends, user_id = heapq.heappop(self._heap)
+            del self._ends[user_id]
+            expired.append(user_id)
+            self._prune()
+
+        self._armed = None
+
+        try:
+            if expired:
+                await self.bot.db.execute(queries.blocks_expire, expired, now)
+        finally:
+            self._arm()
@@ -21,69 +21,91 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 import datetime
+import random
+import sys
+import time
+import weakref
 from collections import OrderedDict
 
 import utils
 
 
-class LRUNode:
-
-    __slots__ = ('key', 'value', 'last_accessed')
+# Every live cache, for the owner caches command.
+caches = weakref.WeakSet()
 
-    def __init__(self, key, value, last_accessed):
-        self.key = key
-        self.value = value
-        self.last_accessed = last_accessed
 
+class BaseCache:
+    """The mapping interface, statistics and tracing shared by every cache.
 
-class EvieeLRU:
+    Subclasses implement the policy via _get_node, set, pop, clear, _evict and the container methods.
+    Nodes returned by _get_node must have value and expires attributes.
+    """
 
-    __slots__ = ('_limit', '_name', '_created', '_cache')
+    __slots__ = ('_limit', '_name', '_created', '_ttl', '_trace', 'hits', 'misses', 'evictions', 'expirations',
+                 '__weakref__')
 
-    def __init__(self, *, name, **kwargs):
+    def __init__(self, *, name, limit: int=100, ttl: float=None):
         self._created = datetime.datetime.utcnow()
-        self._limit = kwargs.get('limit', 100)
+        self._limit = limit
         self._name = name
+        self._ttl = ttl
+        self._trace = None
 
-        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        caches.add(self)
 
     def __repr__(self):
-        return f'<{self.__class__}, limit: {self._limit}, items: {self.size}, created: {self._created}>'
+        return f'<{self.__class__.__name__} name: {self._name}, limit: {self._limit}, items: {self.size}, ' \
+               f'hits: {self.hits}, misses: {self.misses}, hit rate: {self.hit_rate:.2%}, ' \
+               f'evictions: {self.evictions}, expirations: {self.expirations}, created: {self._created}>'
 
     def __str__(self):
         return f'{self._name}'
 
     def __getitem__(self, item):
-        node = self._cache[item]
-        node.last_accessed = datetime.datetime.utcnow()
+        node = self._lookup(item)
+        if node is None:
+            raise KeyError(item)
 
         return node.value
 
     def __setitem__(self, key, value):
-        if len(self._cache) >= self._limit:
-            del self._cache[self.get_oldest().key]
+        self.set(key, value)
 
-        try:
-            node = self._cache[key]
-            node.last_accessed = datetime.datetime.utcnow()
-            node.value = value
-        except KeyError:
-            node = LRUNode(key, value, datetime.datetime.utcnow())
+    def _lookup(self, key):
+        if self._trace is not None:
+            self._trace.write(f'{key}\n')
 
-        self._cache[key] = node
+        node = self._get_node(key)
+        if node is None:
+            self.misses += 1
+        else:
+            self.hits += 1
 
-    def __delitem__(self, key):
-        del self._cache[key]
+        return node
 
-    def __contains__(self, item):
-        return item in self._cache
+    def _expires(self, ttl):
+        ttl = ttl if ttl is not None else self._ttl
+        return time.monotonic() + ttl if ttl is not None else None
 
-    def __len__(self):
-        return len(self._cache)
+    @property
+    def name(self):
+        return self._name
 
     @property
     def size(self):
-        return len(self._cache)
+        return len(self)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / total
 
     @property
     def limit(self):
@@ -94,51 +116,185 @@ class EvieeLRU:
         if value <= 2:
             raise utils.InvalidCacheLimit('Limit must be greater than 2.')
         self._limit = value
+        self._evict()
+
+    def get(self, item, default=None):
+        node = self._lookup(item)
+        if node is None:
+            return default
+
+        return node.value
+
+    def start_trace(self, path: str):
+        """Append every looked up key to path, one per line, to be replayed by benchmarks.cache_policies."""
+        self.stop_trace()
+        self._trace = open(path, 'a', encoding='utf-8')
+
+    def stop_trace(self):
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+
+class LRUNode:
+
+    __slots__ = ('key', 'value', 'expires', 'size')
+
+    def __init__(self, key, value, expires, size):
+        self.key = key
+        self.value = value
+        self.expires = expires
+        self.size = size
+
+
+class EvieeLRU(BaseCache):
+    """An LRU cache with O(1) get, set and evict.
+
+    Recency is the order of the underlying OrderedDict, with the least recently used entry first.
+
+    Parameters
+    ------------
+    name: str
+        The name of this cache, shown in the owner caches command.
+    limit: int
+        The max amount of entries. Defaults to 100.
+    ttl: float [Optional]
+        The default time to live for entries, in seconds. Entries never expire if this is None.
+    max_size: int [Optional]
+        The max total size of all values, as measured by sizeof.
+    sizeof: [Optional]
+        A callable returning the size of a value. Defaults to sys.getsizeof. Only used when max_size is set.
+    """
+
+    __slots__ = ('_cache', '_max_size', '_sizeof', '_size')
+
+    def __init__(self, *, name, **kwargs):
+        super().__init__(name=name, limit=kwargs.get('limit', 100), ttl=kwargs.get('ttl', None))
+
+        self._max_size = kwargs.get('max_size', None)
+        self._sizeof = kwargs.get('sizeof', sys.getsizeof)
+        self._size = 0
+
+        self._cache = OrderedDict()
+
+    def __delitem__(self, key):
+        node = self._cache.pop(key)
+        self._size -= node.size
+
+    def __contains__(self, item):
+        node = self._cache.get(item)
+        if node is None:
+            return False
+
+        if node.expires is not None and node.expires <= time.monotonic():
+            self._expire(node)
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _get_node(self, key):
+        try:
+            node = self._cache[key]
+        except KeyError:
+            return None
+
+        if node.expires is not None and node.expires <= time.monotonic():
+            self._expire(node)
+            return None
+
+        self._cache.move_to_end(key)
+        return node
+
+    def _expire(self, node):
+        del self._cache[node.key]
+        self._size -= node.size
+        self.expirations += 1
+
+    def _evict(self):
+        while self._cache and (len(self._cache) > self._limit
+                               or (self._max_size is not None and self._size > self._max_size)):
+            key, node = self._cache.popitem(last=False)
+            self._size -= node.size
+
+            if node.expires is not None and node.expires <= time.monotonic():
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    @property
+    def total_size(self):
+        """The total size of all values. Only tracked when max_size is set."""
+        return self._size
 
     @property
     def items(self):
-        return self._cache.items()
+        return [(k, n.value) for k, n in self._cache.items()]
 
     @property
     def values(self):
-        return self._cache.values()
+        return [n.value for n in self._cache.values()]
 
     @property
     def keys(self):
         return self._cache.keys()
 
     def get_oldest(self):
-        return min(self._cache.values(), key=lambda _: _.last_accessed)
+        """Return the least recently used node."""
+        return next(iter(self._cache.values()))
 
-    def get(self, item, default=None):
-        try:
-            node = self._cache[item]
-        except KeyError:
+    def set(self, key, value, *, ttl: float=None):
+        """Set a value, optionally with a time to live in seconds which overrides the caches default."""
+        expires = self._expires(ttl)
+        size = self._sizeof(value) if self._max_size is not None else 0
+
+        node = self._cache.get(key)
+        if node is not None:
+            self._size += size - node.size
+            node.value = value
+            node.expires = expires
+            node.size = size
+            self._cache.move_to_end(key)
+        else:
+            self._cache[key] = LRUNode(key, value, expires, size)
+            self._size += size
+
+        self._evict()
+
+    def pop(self, key, default=None):
+        node = self._cache.pop(key, None)
+        if node is None:
             return default
 
-        node.last_accessed = datetime.datetime.utcnow()
+        self._size -= node.size
         return node.value
 
+    def clear(self):
+        self._cache.clear()
+        self._size = 0
+
 
 class LFUNode:
 
-    __slots__ = ('key', 'value', 'freqnode', 'previous', 'next')
+    __slots__ = ('key', 'value', 'expires', 'freqnode', 'previous', 'next')
 
-    def __init__(self, key, value, freqnode, previous, next_):
+    def __init__(self, key, value, expires, freqnode, previous, next_):
         self.key = key
         self.value = value
+        self.expires = expires
         self.freqnode = freqnode
 
         self.previous = previous
         self.next = next_
 
     def free_myself(self):
-        if self.freqnode.cache_head == self.freqnode.cache_tail:
+        if self.freqnode.cache_head is self.freqnode.cache_tail:
             self.freqnode.cache_head = self.freqnode.cache_tail = None
-        elif self.freqnode.cache_head == self:
+        elif self.freqnode.cache_head is self:
             self.next.previous = None
             self.freqnode.cache_head = self.next
-        elif self.freqnode.cache_tail == self:
+        elif self.freqnode.cache_tail is self:
             self.previous.next = None
             self.freqnode.cache_tail = self.previous
         else:
@@ -154,10 +310,10 @@ class FreqNode:
 
     __slots__ = ('freq', 'previous', 'next', 'cache_head', 'cache_tail')
 
-    def __init__(self, freq, previous, next):
+    def __init__(self, freq, previous, next_):
         self.freq = freq
         self.previous = previous
-        self.next = next
+        self.next = next_
 
         self.cache_head = None
         self.cache_tail = None
@@ -165,7 +321,7 @@ class FreqNode:
     def count_caches(self):
         if self.cache_head is None and self.cache_tail is None:
             return 0
-        elif self.cache_head == self.cache_tail:
+        elif self.cache_head is self.cache_tail:
             return 1
         else:
             return '2+'
@@ -185,15 +341,16 @@ class FreqNode:
     def pop_head_cache(self):
         if self.cache_head is None and self.cache_tail is None:
             return None
-        elif self.cache_head == self.cache_tail:
+        elif self.cache_head is self.cache_tail:
             cache_head = self.cache_head
             self.cache_head = self.cache_tail = None
-            return cache_head
         else:
             cache_head = self.cache_head
             self.cache_head.next.previous = None
             self.cache_head = self.cache_head.next
-            return cache_head
+
+        cache_head.previous = cache_head.next = cache_head.freqnode = None
+        return cache_head
 
     def append_cache_to_tail(self, cache_node):
         cache_node.freqnode = self
@@ -224,66 +381,119 @@ class FreqNode:
         self.previous = freq_node
 
 
-class LFUCache(object):
+class LFUCache(BaseCache):
+    """An LFU cache with O(1) get, set and evict. A drop in replacement for EvieeLRU.
+
+    Entries are kept in a linked list of frequency nodes, each holding its entries in insertion order.
+    The least frequently used entry is evicted first, with ties broken by the least recently added.
 
-    __slots__ = ('cache', 'limit', 'freq_link_head')
+    Parameters
+    ------------
+    name: str
+        The name of this cache, shown in the owner caches command.
+    limit: int
+        The max amount of entries. Defaults to 100.
+    ttl: float [Optional]
+        The default time to live for entries, in seconds. Entries never expire if this is None.
+    """
 
-    def __init__(self, limit=1000):
-        self.cache = {}
-        self.limit = limit
+    __slots__ = ('_cache', 'freq_link_head')
+
+    def __init__(self, *, name, **kwargs):
+        super().__init__(name=name, limit=kwargs.get('limit', 100), ttl=kwargs.get('ttl', None))
+
+        self._cache = {}
         self.freq_link_head = None
 
+    def __delitem__(self, key):
+        self._remove(self._cache[key])
+
+    def __contains__(self, item):
+        node = self._cache.get(item)
+        if node is None:
+            return False
+
+        if node.expires is not None and node.expires <= time.monotonic():
+            self._remove(node)
+            self.expirations += 1
+            return False
+        return True
+
     def __len__(self):
-        return len(self.cache)
+        return len(self._cache)
 
-    def __repr__(self):
-        return f'<LFU CACHE(LIMIT: {self.limit} ENTRIES: {len(self)})>'
+    def _get_node(self, key):
+        try:
+            node = self._cache[key]
+        except KeyError:
+            return None
 
-    def __str__(self):
-        return f'Items({[(k, v.value) for k, v in self.cache.items()]})'
+        if node.expires is not None and node.expires <= time.monotonic():
+            self._remove(node)
+            self.expirations += 1
+            return None
 
-    def __getitem__(self, item):
-        return self.get(item)
+        self.move_forward(node, node.freqnode)
+        return node
 
-    def __setitem__(self, key, value):
-        return self.set(key=key, value=value)
+    def _remove(self, node):
+        del self._cache[node.key]
 
-    def __delitem__(self, key):
-        lfunode = self.cache[key]
-        lfunode.free_myself()
+        freqnode = node.freqnode
+        node.free_myself()
+
+        if freqnode.count_caches() == 0:
+            if self.freq_link_head is freqnode:
+                self.freq_link_head = freqnode.next
+            freqnode.remove()
 
-        del self.cache[key]
+    def _evict(self):
+        while len(self._cache) > self._limit:
+            self.dump_cache()
 
-    def __contains__(self, item):
-        return item in self.cache
+    @property
+    def items(self):
+        return [(k, n.value) for k, n in self._cache.items()]
 
-    def get(self, key):
-        if key in self.cache:
-            cache_node = self.cache[key]
-            freqnode = cache_node.freqnode
-            value = cache_node.value
+    @property
+    def values(self):
+        return [n.value for n in self._cache.values()]
 
-            self.move_forward(cache_node, freqnode)
+    @property
+    def keys(self):
+        return self._cache.keys()
 
-            return value
-        else:
-            return -1
+    def frequency(self, key) -> int:
+        """Return how many times key has been used since it was added, without counting as a use."""
+        return self._cache[key].freqnode.freq
 
-    def set(self, key, value):
-        if self.limit <= 0:
-            return -1
+    def set(self, key, value, *, ttl: float=None):
+        """Set a value, optionally with a time to live in seconds which overrides the caches default."""
+        expires = self._expires(ttl)
 
-        if key not in self.cache:
-            if len(self.cache) >= self.limit:
+        node = self._cache.get(key)
+        if node is None:
+            if len(self._cache) >= self._limit:
                 self.dump_cache()
 
-            self.create_cache(key, value)
+            self.create_cache(key, value, expires)
         else:
-            cache_node = self.cache[key]
-            freq_node = cache_node.freq_node
-            cache_node.value = value
+            node.value = value
+            node.expires = expires
 
-            self.move_forward(cache_node, freq_node)
+            self.move_forward(node, node.freqnode)
+
+    def pop(self, key, default=None):
+        node = self._cache.get(key)
+        if node is None:
+            return default
+
+        self._remove(node)
+        return node.value
+
+    def clear(self):
+        self._cache.clear()
+        self.freq_link_head = None
 
     def move_forward(self, cache_node, freqnode):
         if freqnode.next is None or freqnode.next.freq != freqnode.freq + 1:
@@ -300,23 +510,28 @@ class LFUCache(object):
             freqnode.insert_after_me(target_freq_node)
 
         if freqnode.count_caches() == 0:
-            if self.freq_link_head == freqnode:
+            if self.freq_link_head is freqnode:
                 self.freq_link_head = target_freq_node
 
             freqnode.remove()
 
     def dump_cache(self):
         head_freq_node = self.freq_link_head
-        self.cache.pop(head_freq_node.cache_head.key)
-        head_freq_node.pop_head_cache()
+        node = head_freq_node.pop_head_cache()
+        del self._cache[node.key]
+
+        if node.expires is not None and node.expires <= time.monotonic():
+            self.expirations += 1
+        else:
+            self.evictions += 1
 
         if head_freq_node.count_caches() == 0:
-            self.freq_link_head = head_freq_node.nxt
+            self.freq_link_head = head_freq_node.next
             head_freq_node.remove()
 
-    def create_cache(self, key, value):
-        cache_node = LFUNode(key, value, None, None, None)
-        self.cache[key] = cache_node
+    def create_cache(self, key, value, expires=None):
+        cache_node = LFUNode(key, value, expires, None, None, None)
+        self._cache[key] = cache_node
 
         if self.freq_link_head is None or self.freq_link_head.freq != 0:
             new_freq_node = FreqNode(0, None, None)
@@ -328,3 +543,178 @@ class LFUCache(object):
             self.freq_link_head = new_freq_node
         else:
             self.freq_link_head.append_cache_to_tail(cache_node)
+
+
+class CountMinSketch:
+    """A fixed size, approximate frequency counter with periodic aging.
+
+    Counters are halved every sample_size increments, so old popularity fades instead of pinning keys forever.
+    """
+
+    __slots__ = ('width', 'depth', 'sample_size', 'additions', '_mask', '_rows', '_seeds')
+
+    def __init__(self, width: int, *, depth: int=4, sample_size: int=None):
+        # A power of two width lets the index be a mask instead of a modulo.
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.depth = depth
+        self.sample_size = sample_size or self.width * 10
+        self.additions = 0
+
+        self._mask = self.width - 1
+        self._rows = [[0] * self.width for _ in range(depth)]
+        self._seeds = [random.Random(i).getrandbits(32) for i in range(depth)]
+
+    def _indexes(self, key):
+        h = hash(key)
+        mask = self._mask
+        return [((h ^ seed) * 0x9E3779B1 >> 7) & mask for seed in self._seeds]
+
+    def estimate(self, key) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def increment(self, key):
+        for row, i in zip(self._rows, self._indexes(key)):
+            row[i] += 1
+
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def reset(self):
+        for row in self._rows:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+
+        self.additions >>= 1
+
+
+class TinyLFUCache(BaseCache):
+    """An LRU cache guarded by a TinyLFU admission filter. A drop in replacement for EvieeLRU.
+
+    New entries go into a small LRU window. When they fall out of the window they are only admitted to the main LRU
+    if the sketch estimates they are used more often than the main LRU's next victim. This keeps one off scans from
+    flushing keys which are used often, which plain LRU does not.
+
+    Parameters
+    ------------
+    name: str
+        The name of this cache, shown in the owner caches command.
+    limit: int
+        The max amount of entries. Defaults to 100.
+    ttl: float [Optional]
+        The default time to live for entries, in seconds. Entries never expire if this is None.
+    window: float
+        The fraction of limit given to the admission window. Defaults to 0.01, with at least one entry.
+    """
+
+    __slots__ = ('_window', '_main', '_window_limit', '_window_ratio', 'sketch', 'rejections')
+
+    def __init__(self, *, name, **kwargs):
+        super().__init__(name=name, limit=kwargs.get('limit', 100), ttl=kwargs.get('ttl', None))
+
+        self._window_ratio = kwargs.get('window', 0.01)
+        self._window_limit = max(1, int(self._limit * self._window_ratio))
+
+        self._window = OrderedDict()
+        self._main = OrderedDict()
+
+        self.sketch = CountMinSketch(self._limit)
+        self.rejections = 0
+
+    def __delitem__(self, key):
+        try:
+            del self._window[key]
+        except KeyError:
+            del self._main[key]
+
+    def __contains__(self, item):
+        node = self._window.get(item) or self._main.get(item)
+        if node is None:
+            return False
+
+        if node.expires is not None and node.expires <= time.monotonic():
+            self.pop(item)
+            self.expirations += 1
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._window) + len(self._main)
+
+    def _get_node(self, key):
+        self.sketch.increment(key)
+
+        for segment in (self._window, self._main):
+            node = segment.get(key)
+            if node is not None:
+                break
+        else:
+            return None
+
+        if node.expires is not None and node.expires <= time.monotonic():
+            del segment[key]
+            self.expirations += 1
+            return None
+
+        segment.move_to_end(key)
+        return node
+
+    def _evict(self):
+        self._window_limit = max(1, int(self._limit * self._window_ratio))
+
+        while len(self._window) > self._window_limit:
+            key, candidate = self._window.popitem(last=False)
+
+            if len(self._main) < self._limit - self._window_limit:
+                self._main[key] = candidate
+                continue
+
+            victim_key = next(iter(self._main))
+            if self.sketch.estimate(key) > self.sketch.estimate(victim_key):
+                del self._main[victim_key]
+                self._main[key] = candidate
+            else:
+                self.rejections += 1
+            self.evictions += 1
+
+        while self._main and len(self) > self._limit:
+            self._main.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def items(self):
+        return [(k, n.value) for k, n in (*self._window.items(), *self._main.items())]
+
+    @property
+    def values(self):
+        return [n.value for n in (*self._window.values(), *self._main.values())]
+
+    @property
+    def keys(self):
+        return [*self._window.keys(), *self._main.keys()]
+
+    def set(self, key, value, *, ttl: float=None):
+        """Set a value, optionally with a time to live in seconds which overrides the caches default."""
+        expires = self._expires(ttl)
+
+        for segment in (self._window, self._main):
+            node = segment.get(key)
+            if node is not None:
+                node.value = value
+                node.expires = expires
+                segment.move_to_end(key)
+                return
+
+        self._window[key] = LRUNode(key, value, expires, 0)
+        self._evict()
+
+    def pop(self, key, default=None):
+        node = self._window.pop(key, None) or self._main.pop(key, None)
+        if node is None:
+            return default
+
+        return node.value
+
+    def clear(self):
+        self._window.clear()
+        self._main.clear()
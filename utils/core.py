@@ -27,8 +27,8 @@ from discord.ext import commands
 from discord.ext.commands.core import hooked_wrapped_callback
 
 import asyncio
-import concurrent.futures
 import datetime
+import functools
 import inspect
 import re
 import sys
@@ -124,6 +124,7 @@ class EvieeContext(commands.Context):
 
     def __init__(self, **attrs):
         self.colours = {'warn': 0xFFCC00, 'alert': 0xF31431}
+        self.started = None  # Set by CommandTelemetry when the command is invoked.
         super().__init__(**attrs)
 
     @property
@@ -514,16 +515,19 @@ def backoff_loop(until_ready=True):
 
 # Custom Executor
 async def evieecutor(func, executor=None, loop=None, *args, **kwargs):
-    if not executor:
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    """Run a blocking function on one of the bots long lived executors.
 
-    future = executor.submit(func, *args, **kwargs)
-    future = asyncio.wrap_future(future)
+    executor may be a ManagedExecutor, the name of a registered executor or None for the "io" thread pool.
+    """
+    if kwargs:
+        func = functools.partial(func, **kwargs)
 
-    result = await asyncio.wait_for(future, timeout=None, loop=loop or asyncio.get_event_loop())
-    executor.shutdown(wait=False)
+    if executor is None:
+        executor = 'io'
+    if isinstance(executor, str):
+        executor = utils.executors[executor]
 
-    return result
+    return await executor.run(func, *args, loop=loop)
 
 
 # Checks
@@ -0,0 +1,128 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import asyncio
+import concurrent.futures
+
+from cryptography.fernet import Fernet
+
+import utils
+
+__all__ = ('CryptoService', 'encrypt_batch', 'decrypt_batch')
+
+
+# Fernet instances per key, so each worker process only builds one.
+_fernets = {}
+
+
+def _fernet(key: bytes) -> Fernet:
+    try:
+        return _fernets[key]
+    except KeyError:
+        fernet = _fernets[key] = Fernet(key)
+        return fernet
+
+
+def encrypt_batch(key: bytes, texts: list) -> list:
+    """Encrypt a batch of strings, returning Fernet tokens as strings. Runs in a worker process."""
+    fernet = _fernet(key)
+    return [fernet.encrypt(t.encode()).decode() for t in texts]
+
+
+def decrypt_batch(key: bytes, tokens: list) -> list:
+    """Decrypt a batch of Fernet token strings. Runs in a worker process."""
+    fernet = _fernet(key)
+    return [fernet.decrypt(t.encode()).decode() for t in tokens]
+
+
+class CryptoService:
+    """Encrypts and decrypts archived message content off the event loop.
+
+    Batches are handed to a process executor as a whole, so the pickling cost is paid once per batch.
+    Batches smaller than min_batch are cheaper to run inline than to send to another process, and are.
+
+    Parameters
+    ------------
+    key: bytes
+        The Fernet key.
+    executor: str
+        The name of the registered executor to use. Defaults to cpu.
+    batch_size: int
+        The max amount of items sent to a worker in one call. Defaults to 512.
+    min_batch: int
+        Defaults to 8.
+    """
+
+    __slots__ = ('_key', 'executor', 'batch_size', 'min_batch', 'encrypted', 'decrypted', 'inline', 'fallbacks')
+
+    def __init__(self, key: bytes, *, executor: str='cpu', batch_size: int=512, min_batch: int=8):
+        self._key = key
+        self.executor = executor
+        self.batch_size = batch_size
+        self.min_batch = min_batch
+
+        self.encrypted = 0
+        self.decrypted = 0
+        self.inline = 0
+        self.fallbacks = 0
+
+        # Fail at startup, not on the first flush, if the key is invalid.
+        _fernet(key)
+
+    def __repr__(self):
+        return f'<CryptoService executor={self.executor} encrypted={self.encrypted} decrypted={self.decrypted}>'
+
+    async def _run(self, func, items: list) -> list:
+        if len(items) < self.min_batch:
+            self.inline += len(items)
+            return func(self._key, items)
+
+        executor = utils.executors[self.executor]
+        results = []
+
+        for i in range(0, len(items), self.batch_size):
+            chunk = items[i:i + self.batch_size]
+
+            try:
+                results.extend(await executor.run(func, self._key, chunk))
+            except (utils.ExecutorSaturated, concurrent.futures.BrokenExecutor, asyncio.TimeoutError):
+                # Archived content must not be lost, so fall back to the loop rather than fail the batch.
+                self.fallbacks += 1
+                results.extend(func(self._key, chunk))
+
+        return results
+
+    async def encrypt_many(self, texts: list) -> list:
+        ret = await self._run(encrypt_batch, texts)
+        self.encrypted += len(ret)
+        return ret
+
+    async def decrypt_many(self, tokens: list) -> list:
+        ret = await self._run(decrypt_batch, tokens)
+        self.decrypted += len(ret)
+        return ret
+
+    async def encrypt(self, text: str) -> str:
+        return (await self.encrypt_many([text]))[0]
+
+    async def decrypt(self, token: str) -> str:
+        return (await self.decrypt_many([token]))[0]
@@ -0,0 +1,230 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import asyncio
+import time
+
+from .telemetry import LatencyHistogram
+
+__all__ = ('Query', 'QueryStats', 'Database', 'DBConnection')
+
+
+class Query:
+    """A SQL statement declared once in utils.queries.
+
+    Executed statements are prepared per connection and reused through asyncpg's statement cache, which is sized on
+    pool creation to hold every registered query.
+
+    Parameters
+    ------------
+    name: str
+        A unique, dotted name. E.g "guilds.load". Used for stats and the EXPLAIN check.
+    sql: str
+        The statement.
+    example: tuple
+        Example arguments, used to EXPLAIN the statement.
+    scan_ok: bool
+        Whether this statement reads a whole table by design, so a sequential scan is expected.
+    """
+
+    __slots__ = ('name', 'sql', 'example', 'scan_ok')
+
+    registry = {}
+
+    def __init__(self, name: str, sql: str, *, example: tuple=(), scan_ok: bool=False):
+        if name in Query.registry:
+            raise ValueError(f'A query named <{name}> is already registered.')
+
+        self.name = name
+        self.sql = sql
+        self.example = example
+        self.scan_ok = scan_ok
+
+        Query.registry[name] = self
+
+    def __repr__(self):
+        return f'<Query name={self.name}>'
+
+
+class QueryStats:
+
+    __slots__ = ('name', 'calls', 'errors', 'rows', 'histogram')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.histogram = LatencyHistogram()
+
+    def __repr__(self):
+        return f'<QueryStats name={self.name} calls={self.calls} errors={self.errors} rows={self.rows}>'
+
+    @property
+    def total(self):
+        return self.histogram.total
+
+
+def _rowcount(method: str, ret):
+    if method == 'execute':
+        # A status string, e.g. "UPDATE 3". Statements without a count report 0.
+        count = ret.rsplit(' ', 1)[-1] if ret else ''
+        return int(count) if count.isdigit() else 0
+    elif method == 'fetch':
+        return len(ret)
+    return 0 if ret is None else 1
+
+
+class DBConnection:
+    """A pool connection which runs registered queries and records their stats."""
+
+    __slots__ = ('db', 'conn')
+
+    def __init__(self, db, conn):
+        self.db = db
+        self.conn = conn
+
+    def transaction(self, **kwargs):
+        return self.conn.transaction(**kwargs)
+
+    async def _run(self, method: str, query: Query, args, timeout):
+        stats = self.db.stats_for(query.name)
+        started = time.perf_counter()
+
+        try:
+            ret = await getattr(self.conn, method)(query.sql, *args, timeout=timeout)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.calls += 1
+            stats.histogram.record(time.perf_counter() - started)
+
+        stats.rows += _rowcount(method, ret)
+        return ret
+
+    async def execute(self, query: Query, *args, timeout: float=None):
+        return await self._run('execute', query, args, timeout)
+
+    async def fetch(self, query: Query, *args, timeout: float=None):
+        return await self._run('fetch', query, args, timeout)
+
+    async def fetchrow(self, query: Query, *args, timeout: float=None):
+        return await self._run('fetchrow', query, args, timeout)
+
+    async def fetchval(self, query: Query, *args, timeout: float=None):
+        return await self._run('fetchval', query, args, timeout)
+
+    async def copy_records_to_table(self, table: str, *, records, columns, timeout: float=None):
+        stats = self.db.stats_for(f'copy.{table}')
+        started = time.perf_counter()
+
+        try:
+            ret = await self.conn.copy_records_to_table(table, records=records, columns=columns, timeout=timeout)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.calls += 1
+            stats.histogram.record(time.perf_counter() - started)
+
+        stats.rows += len(records)
+        return ret
+
+
+class _Acquire:
+
+    __slots__ = ('db', 'timeout', '_ctx')
+
+    def __init__(self, db, timeout):
+        self.db = db
+        self.timeout = timeout
+        self._ctx = None
+
+    async def __aenter__(self):
+        db = self.db
+        started = time.perf_counter()
+
+        self._ctx = db.pool.acquire(timeout=self.timeout)
+        try:
+            conn = await self._ctx.__aenter__()
+        except asyncio.TimeoutError:
+            db.acquire_timeouts += 1
+            raise
+        finally:
+            db.acquire_wait.record(time.perf_counter() - started)
+
+        db.in_use += 1
+        return DBConnection(db, conn)
+
+    async def __aexit__(self, *exc):
+        self.db.in_use -= 1
+        await self._ctx.__aexit__(*exc)
+
+
+class Database:
+    """The bots query interface. Wraps the asyncpg pool, recording latency and row counts for every query.
+
+    Single statements can be run directly, which acquires and releases a connection for the call.
+    Use acquire() for transactions or several statements on one connection.
+
+    Time spent waiting for a pool connection is recorded separately in acquire_wait.
+    """
+
+    __slots__ = ('pool', 'stats', 'in_use', 'acquire_wait', 'acquire_timeouts')
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.stats = {}
+
+        self.in_use = 0
+        self.acquire_wait = LatencyHistogram()
+        self.acquire_timeouts = 0
+
+    def __repr__(self):
+        return f'<Database queries={len(self.stats)} calls={sum(s.calls for s in self.stats.values())}>'
+
+    def stats_for(self, name: str) -> QueryStats:
+        try:
+            return self.stats[name]
+        except KeyError:
+            stats = self.stats[name] = QueryStats(name)
+            return stats
+
+    def acquire(self, *, timeout: float=None):
+        return _Acquire(self, timeout)
+
+    async def execute(self, query: Query, *args, timeout: float=None):
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: Query, *args, timeout: float=None):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: Query, *args, timeout: float=None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: Query, *args, timeout: float=None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, timeout=timeout)
@@ -8,7 +8,7 @@ import utils
 
 
 __all__ = ('EvieeBaseException', 'InvalidCacheLimit', 'InvalidCommand', 'MissingCommand', 'AbstractorException',
-           'ImportFailure', 'StartupFailure', 'GloballyBlocked', 'MissingInstance')
+           'ImportFailure', 'StartupFailure', 'GloballyBlocked', 'MissingInstance', 'ExecutorSaturated')
 
 
 class EvieeBaseException(Exception):
@@ -47,6 +47,10 @@ class MissingInstance(EvieeBaseException):
     pass
 
 
+class ExecutorSaturated(EvieeBaseException):
+    pass
+
+
 class ErrorHandler(metaclass=utils.MetaCog, private=True):
     """Error Handler Cog."""
     __slots__ = ('bot', 'debug', 'lru_errors', 'spam', 'counter_cmdf')
@@ -73,6 +77,15 @@ class ErrorHandler(metaclass=utils.MetaCog, private=True):
         hook = discord.Webhook.partial(id=wh_id, token=wh_token, adapter=discord.AsyncWebhookAdapter(self.bot.session))
         return hook
 
+    async def spam_block(self, ctx):
+        """Block a user for 5 minutes, writing through to the in memory block index."""
+        await ctx.error(level='alert', title='Blocked - Excessive Spam',
+                        info='You have been blocked for 5 minutes.', content=ctx.author.mention)
+
+        ends = datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
+        await self.bot.db.execute(utils.queries.blocks_insert, ctx.author.id, 'Spam', ends)
+        self.bot.blocks.add(ctx.author.id, ends)
+
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.CommandNotFound):
             return
@@ -84,19 +97,10 @@ class ErrorHandler(metaclass=utils.MetaCog, private=True):
             if not retry_after:
                 return await ctx.send(f'The command {ctx.command} is an owner only command!', delete_after=20)
 
-            if ctx.author.id in self.bot.lru_blocks:
+            if ctx.author.id in self.bot.blocks:
                 return
 
-            await ctx.error(level='alert', title='Blocked - Excessive Spam',
-                            info='You have been blocked for 5 minutes.', content=ctx.author.mention)
-
-            async with self.bot.pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute("""INSERT INTO blocks(id, reason, start, ends) VALUES ($1, 'Spam', now(), $2)
-                                          ON CONFLICT (id)
-                                          DO NOTHING """,
-                                       ctx.author.id, datetime.datetime.utcnow() + datetime.timedelta(minutes=5))
-                    self.bot.lru_blocks[ctx.author.id] = None
+            await self.spam_block(ctx)
 
         elif isinstance(error, commands.CommandOnCooldown):
             bucket = self.spam.get_bucket(ctx.message)
@@ -105,19 +109,10 @@ class ErrorHandler(metaclass=utils.MetaCog, private=True):
             if not retry_after:
                 return await ctx.send(f'You are on cooldown. Try again in {error.retry_after:.2f}s')
 
-            if ctx.author.id in self.bot.lru_blocks:
+            if ctx.author.id in self.bot.blocks:
                 return
 
-            await ctx.error(level='alert', title='Blocked - Excessive Spam',
-                            info='You have been blocked for 5 minutes.', content=ctx.author.mention)
-
-            async with self.bot.pool.acquire() as conn:
-                async with conn.transaction():
-                    await conn.execute("""INSERT INTO blocks(id, reason, start, ends) VALUES ($1, 'Spam', now(), $2)
-                                          ON CONFLICT (id)
-                                          DO NOTHING """,
-                                       ctx.author.id, datetime.datetime.utcnow() + datetime.timedelta(minutes=5))
-                    self.bot.lru_blocks[ctx.author.id] = None
+            await self.spam_block(ctx)
 
         self.counter_cmdf += 1
         # await self.bot.pool.execute(self.bot.query.on_cmd_fail)
@@ -0,0 +1,218 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import asyncio
+import concurrent.futures
+import time
+
+import utils
+
+
+__all__ = ('ManagedExecutor', 'ExecutorRegistry', 'executors')
+
+
+class ManagedExecutor:
+    """A long lived, named executor with a bounded queue, timeouts and basic metrics.
+
+    Parameters
+    ------------
+    name: str
+        The name this executor is registered under.
+    kind: str
+        Either "thread" or "process". Process pools require picklable, module level functions.
+    max_workers: int
+        The amount of workers in the pool.
+    max_queue: int
+        How many calls may wait for a worker before new calls are rejected with ExecutorSaturated.
+    timeout: float [Optional]
+        The default per call timeout in seconds.
+    """
+
+    __slots__ = ('name', 'kind', 'max_workers', 'max_queue', 'timeout', '_executor', '_pending',
+                 'submitted', 'completed', 'failed', 'rejected', 'timeouts', 'cancelled', 'restarts', 'total_latency',
+                 'max_latency')
+
+    def __init__(self, name: str, *, kind: str='thread', max_workers: int=4, max_queue: int=64,
+                 timeout: float=None):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        if kind not in ('thread', 'process'):
+            raise ValueError(f'Invalid executor kind <{kind}>. Expected "thread" or "process".')
+
+        self._executor = self._build()
+        self._pending = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def __repr__(self):
+        return f'<ManagedExecutor name={self.name} kind={self.kind} workers={self.max_workers} ' \
+               f'in_flight={self._pending} queued={self.queue_depth}>'
+
+    @property
+    def in_flight(self):
+        """Calls which have been submitted and have not finished yet. Includes calls waiting for a worker."""
+        return self._pending
+
+    @property
+    def queue_depth(self):
+        """Calls waiting for a free worker."""
+        return max(0, self._pending - self.max_workers)
+
+    @property
+    def avg_latency(self):
+        """Average time in seconds from submission to completion."""
+        finished = self.completed + self.failed
+        if not finished:
+            return 0.0
+        return self.total_latency / finished
+
+    @property
+    def saturated(self):
+        return self._pending >= self.max_workers + self.max_queue
+
+    def _build(self):
+        if self.kind == 'process':
+            return concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                     thread_name_prefix=f'eviee-{self.name}')
+
+    def _restart(self, broken):
+        # A pool whose worker died rejects every call from then on. Only replace it once, whoever notices first.
+        if self._executor is not broken:
+            return
+
+        self.restarts += 1
+        broken.shutdown(wait=False)
+        self._executor = self._build()
+
+    def _done(self, started, future):
+        self._pending -= 1
+
+        if future.cancelled():
+            return
+
+        latency = time.perf_counter() - started
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+        if future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    async def run(self, func, *args, timeout: float=None, loop=None):
+        """Run func(*args) on this executor and return the result.
+
+        Raises ExecutorSaturated when the queue is full, and asyncio.TimeoutError when the call takes longer than
+        timeout. On timeout or cancellation a call which has not started yet is removed from the queue.
+
+        If a worker has died the pool is replaced. A call rejected by the broken pool is sent to the new one, a call
+        which was running when its worker died raises BrokenExecutor.
+        """
+        if self.saturated:
+            self.rejected += 1
+            raise utils.ExecutorSaturated(f'Executor <{self.name}> is saturated with {self._pending} calls.')
+
+        loop = loop or asyncio.get_event_loop()
+        started = time.perf_counter()
+
+        executor = self._executor
+        try:
+            cfuture = executor.submit(func, *args)
+        except concurrent.futures.BrokenExecutor:
+            # The call never started, so it is safe to hand it to the new pool.
+            self._restart(executor)
+            executor = self._executor
+            cfuture = executor.submit(func, *args)
+
+        self._pending += 1
+        self.submitted += 1
+
+        # Counters are only ever touched from the event loop thread.
+        cfuture.add_done_callback(lambda f: loop.call_soon_threadsafe(self._done, started, f))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cfuture, loop=loop), timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except concurrent.futures.BrokenExecutor:
+            # This call may be what killed the worker, so it is not retried. Later calls get a working pool.
+            self._restart(executor)
+            raise
+
+    def shutdown(self, wait: bool=True):
+        self._executor.shutdown(wait=wait)
+
+
+class ExecutorRegistry:
+    """The bots named executors. Registered by the bot on startup and used by evieecutor."""
+
+    __slots__ = ('_executors', )
+
+    def __init__(self):
+        self._executors = {}
+
+    def __getitem__(self, name: str) -> ManagedExecutor:
+        try:
+            return self._executors[name]
+        except KeyError:
+            raise utils.MissingInstance(f'No executor named <{name}> has been registered.')
+
+    def __iter__(self):
+        return iter(self._executors.values())
+
+    def __len__(self):
+        return len(self._executors)
+
+    def get(self, name: str, default=None):
+        return self._executors.get(name, default)
+
+    def register(self, executor: ManagedExecutor) -> ManagedExecutor:
+        old = self._executors.get(executor.name)
+        if old is not None:
+            old.shutdown(wait=False)
+
+        self._executors[executor.name] = executor
+        return executor
+
+    def shutdown(self, wait: bool=False):
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+
+
+executors = ExecutorRegistry()
@@ -0,0 +1,183 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import os
+import pickle
+import struct
+
+__all__ = ('Journal', )
+
+
+# Each frame is a header of (payload length, row count) followed by a pickled (rows, counter deltas) payload.
+_HEADER = struct.Struct('>II')
+
+
+class Journal:
+    """A local, append only file of batches which could not be written to the database.
+
+    Batches are appended as frames and read back in order for replay. The replay position is kept in a small
+    sidecar file, so a restart mid replay does not write the same rows twice. Once every frame has been replayed
+    both files are removed.
+
+    A frame cut short by a crash while appending is ignored, and overwritten by the next append.
+
+    This class does blocking file IO. BatchWriter calls it on the io executor.
+
+    Parameters
+    ------------
+    path: str
+        The journal file. Its directory is created if it does not exist.
+    """
+
+    __slots__ = ('path', '_pos_path', '_offset', '_end', 'rows', 'frames')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pos_path = f'{path}.pos'
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._offset = 0
+        self._end = 0
+        self.rows = 0
+        self.frames = 0
+
+        self._scan()
+
+    def __repr__(self):
+        return f'<Journal path={self.path} rows={self.rows} frames={self.frames} size={self.size}>'
+
+    @property
+    def size(self):
+        """Bytes waiting to be replayed."""
+        return self._end - self._offset
+
+    def _scan(self):
+        try:
+            with open(self._pos_path, 'rb') as fp:
+                self._offset = int(fp.read() or 0)
+        except (FileNotFoundError, ValueError):
+            self._offset = 0
+
+        try:
+            fp = open(self.path, 'rb')
+        except FileNotFoundError:
+            self._offset = 0
+            return
+
+        with fp:
+            size = os.fstat(fp.fileno()).st_size
+            if self._offset > size:
+                self._offset = 0
+
+            fp.seek(self._offset)
+            end = self._offset
+
+            while True:
+                header = fp.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+
+                length, rows = _HEADER.unpack(header)
+                fp.seek(length, os.SEEK_CUR)
+                if fp.tell() > size:
+                    break
+
+                end = fp.tell()
+                self.rows += rows
+                self.frames += 1
+
+        self._end = end
+
+    def append(self, rows: list, deltas: dict) -> int:
+        """Append a batch, returning the amount of bytes written."""
+        payload = pickle.dumps((rows, deltas), protocol=pickle.HIGHEST_PROTOCOL)
+
+        with open(self.path, 'r+b' if os.path.exists(self.path) else 'wb') as fp:
+            # Overwrite any partial frame left by a crash.
+            fp.seek(self._end)
+            fp.write(_HEADER.pack(len(payload), len(rows)))
+            fp.write(payload)
+            fp.truncate()
+            fp.flush()
+            os.fsync(fp.fileno())
+
+            self._end = fp.tell()
+
+        self.rows += len(rows)
+        self.frames += 1
+        return _HEADER.size + len(payload)
+
+    def read(self, max_rows: int):
+        """Read frames from the replay position until at least max_rows rows are read.
+
+        Returns the rows, the summed counter deltas, the amount of frames read and the offset to pass to commit.
+        """
+        rows = []
+        deltas = {}
+        frames = 0
+
+        with open(self.path, 'rb') as fp:
+            fp.seek(self._offset)
+
+            while fp.tell() < self._end and len(rows) < max_rows:
+                length, _ = _HEADER.unpack(fp.read(_HEADER.size))
+                frame_rows, frame_deltas = pickle.loads(fp.read(length))
+
+                rows.extend(frame_rows)
+                for key, value in frame_deltas.items():
+                    deltas[key] = deltas.get(key, 0) + value
+                frames += 1
+
+            return rows, deltas, frames, fp.tell()
+
+    def commit(self, offset: int, *, rows: int, frames: int):
+        """Mark everything before offset as replayed."""
+        self.rows -= rows
+        self.frames -= frames
+
+        if offset >= self._end:
+            self._remove()
+            return
+
+        self._offset = offset
+
+        tmp = f'{self._pos_path}.tmp'
+        with open(tmp, 'wb') as fp:
+            fp.write(str(offset).encode())
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, self._pos_path)
+
+    def _remove(self):
+        for path in (self.path, self._pos_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        self._offset = 0
+        self._end = 0
+        self.rows = 0
+        self.frames = 0
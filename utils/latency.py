@@ -0,0 +1,122 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import aiohttp
+
+import math
+import statistics
+
+__all__ = ('LatencySampler', )
+
+
+class LatencySampler:
+    """Samples websocket and REST latency without sending any messages of its own.
+
+    Websocket latency is the gateway heartbeat ACK time discord.py already tracks. REST latency is measured
+    passively, by timing every request the bots HTTP client makes through aiohttp's request tracing, and the median
+    of each window is recorded. Only when no REST request completed during a window is a single GET /gateway sent
+    to measure it.
+
+    Requests which were ratelimited are not counted, as their time is mostly waiting.
+
+    Parameters
+    ------------
+    bot:
+        The bot. Samples are recorded to bot.pings as "ws" and "rtt".
+    window: float
+        Seconds between samples. Defaults to 60.
+    """
+
+    __slots__ = ('bot', 'window', '_trace', '_samples', '_probing', 'organic', 'probes', 'last_probe')
+
+    JOB = 'latency'
+
+    def __init__(self, bot, *, window: float=60):
+        self.bot = bot
+        self.window = window
+
+        self._samples = []
+        self._probing = False
+
+        self.organic = 0
+        self.probes = 0
+        self.last_probe = None
+
+        self._trace = aiohttp.TraceConfig()
+        self._trace.on_request_start.append(self._on_request_start)
+        self._trace.on_request_end.append(self._on_request_end)
+        self._trace.freeze()
+
+    def __repr__(self):
+        return f'<LatencySampler window={self.window} organic={self.organic} probes={self.probes}>'
+
+    def start(self):
+        self.install()
+        self.bot.scheduler.schedule(self.JOB, self.sample, interval=self.window, delay=self.window)
+
+    def install(self):
+        """Attach the request trace to the bots HTTP session. Safe to call again after the session is recreated."""
+        # discord.py does not take trace configs, so they are added to its session after creation.
+        session = getattr(self.bot.http, '_session', None)
+        if session is None:
+            return
+
+        configs = session._trace_configs
+        if self._trace not in configs:
+            configs.append(self._trace)
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.started = self.bot.loop.time()
+
+    async def _on_request_end(self, session, ctx, params):
+        if params.response.status == 429:
+            return
+
+        self._samples.append((self.bot.loop.time() - ctx.started) * 1000)
+
+        if not self._probing:
+            self.organic += 1
+
+    async def probe(self):
+        self._probing = True
+        try:
+            await self.bot.http.get_gateway()
+        finally:
+            self._probing = False
+
+        self.probes += 1
+        self.last_probe = self.bot.loop.time()
+
+    async def sample(self):
+        # A new session is created when the bot reconnects after its old one was closed.
+        self.install()
+
+        ws = self.bot.latency
+        if math.isfinite(ws):
+            self.bot.pings.record('ws', ws * 1000)
+
+        if not self._samples:
+            await self.probe()
+
+        samples, self._samples = self._samples, []
+        if samples:
+            self.bot.pings.record('rtt', statistics.median(samples))
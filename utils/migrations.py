@@ -0,0 +1,180 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import asyncio
+import configparser
+import json
+import pathlib
+import re
+import sys
+
+import asyncpg
+
+from . import queries  # Registers every query for explain_check.
+from .db import Query
+
+__all__ = ('Migration', 'Migrator', 'explain_check')
+
+
+MIGRATIONS = pathlib.Path(__file__).resolve().parent.parent / 'migrations'
+
+# Held while migrating, so two instances starting at once can't apply the same migration twice.
+LOCK_KEY = 0x45766965
+
+
+class Migration:
+    """A single migrations/NNNN_name.sql file."""
+
+    __slots__ = ('version', 'name', 'path')
+
+    FILENAME = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+    def __init__(self, path: pathlib.Path):
+        match = self.FILENAME.match(path.name)
+        if not match:
+            raise ValueError(f'Invalid migration filename <{path.name}>. Expected NNNN_name.sql')
+
+        self.version = int(match.group(1))
+        self.name = match.group(2)
+        self.path = path
+
+    def __repr__(self):
+        return f'<Migration version={self.version} name={self.name}>'
+
+    @property
+    def sql(self):
+        return self.path.read_text(encoding='utf-8')
+
+
+class Migrator:
+    """Applies pending migrations in order, each in its own transaction, recording them in schema_version."""
+
+    __slots__ = ('pool', 'directory')
+
+    def __init__(self, pool, *, directory: pathlib.Path=MIGRATIONS):
+        self.pool = pool
+        self.directory = directory
+
+    def discover(self):
+        migrations = sorted((Migration(p) for p in self.directory.glob('*.sql')), key=lambda m: m.version)
+
+        versions = [m.version for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError(f'Duplicate migration versions in {self.directory}.')
+
+        return migrations
+
+    async def current(self, conn) -> int:
+        return await conn.fetchval("""SELECT COALESCE(max(version), 0) FROM schema_version""")
+
+    async def migrate(self):
+        """Apply every pending migration. Returns the migrations which were applied."""
+        applied = []
+
+        async with self.pool.acquire() as conn:
+            await conn.execute("""CREATE TABLE IF NOT EXISTS schema_version(version int PRIMARY KEY, name text,
+                                                                          applied timestamp DEFAULT now())""")
+            await conn.execute("""SELECT pg_advisory_lock($1)""", LOCK_KEY)
+
+            try:
+                current = await self.current(conn)
+
+                for migration in self.discover():
+                    if migration.version <= current:
+                        continue
+
+                    async with conn.transaction():
+                        await conn.execute(migration.sql)
+                        await conn.execute("""INSERT INTO schema_version(version, name) VALUES($1, $2)""",
+                                           migration.version, migration.name)
+
+                    applied.append(migration)
+            finally:
+                await conn.execute("""SELECT pg_advisory_unlock($1)""", LOCK_KEY)
+
+        return applied
+
+
+def _seq_scans(plan):
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan.get('Relation Name')
+
+    for child in plan.get('Plans', ()):
+        yield from _seq_scans(child)
+
+
+async def explain_check(conn, registered=None):
+    """EXPLAIN every registered query and return (name, relations) for each which plans a sequential scan
+    and is not marked scan_ok.
+
+    Sequential scans are disabled for the session first, so the planner only picks one when no index can be used,
+    not because a table is small.
+    """
+    failures = []
+
+    await conn.execute("""SET enable_seqscan = off""")
+    try:
+        for query in registered or Query.registry.values():
+            ret = await conn.fetchval(f'EXPLAIN (FORMAT JSON) {query.sql}', *query.example)
+            plan = json.loads(ret)[0]['Plan']
+
+            scans = sorted(set(_seq_scans(plan)))
+            if scans and not query.scan_ok:
+                failures.append((query.name, scans))
+    finally:
+        await conn.execute("""RESET enable_seqscan""")
+
+    return failures
+
+
+async def _main(dsn: str, check: bool):
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=1)
+
+    for migration in await Migrator(pool).migrate():
+        print(f'Applied migration {migration.version:04d}_{migration.name}')
+
+    if not check:
+        return 0
+
+    async with pool.acquire() as conn:
+        failures = await explain_check(conn)
+
+    for name, scans in failures:
+        print(f'[FAIL] {name}: sequential scan on {", ".join(scans)}')
+
+    total = len(Query.registry)
+    print(f'{total - len(failures)}/{total} queries use an index or may scan.')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    # python -m utils.migrations [--check] [dsn]
+    args = [a for a in sys.argv[1:] if a != '--check']
+
+    if args:
+        dsn = args[0]
+    else:
+        config = configparser.RawConfigParser()
+        config.read('config.ini')
+        dsn = f'postgres://postgres:{config.get("DB", "_pass")}@localhost:5432/eviee'
+
+    sys.exit(asyncio.get_event_loop().run_until_complete(_main(dsn, '--check' in sys.argv)))
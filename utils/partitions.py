@@ -0,0 +1,154 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import datetime
+
+__all__ = ('DailyPartitions', )
+
+
+class DailyPartitions:
+    """Manages a table range partitioned by day on a timestamp column.
+
+    Rows are expired by dropping whole partitions once every row in them has expired, instead of a DELETE over the
+    whole table. Partitions are created ahead of time, so inserts never find a missing partition. Each partition
+    gets its own index on the index columns.
+
+    Parameters
+    ------------
+    bot:
+        The bot.
+    table: str
+        The table to partition.
+    column: str
+        The timestamp column to partition by. Partitions are dropped once this is in the past for every row.
+    index: tuple
+        Columns which get a per partition index.
+    ahead: int
+        How many days of partitions to create past the latest value of column a new row can have.
+    horizon: datetime.timedelta
+        How far in the future column is for a new row. E.g 14 days for the messages expiry.
+    """
+
+    __slots__ = ('bot', 'table', 'column', 'index', 'ahead', 'horizon', 'created', 'dropped')
+
+    def __init__(self, bot, *, table: str, column: str, index: tuple=(), ahead: int=3,
+                 horizon: datetime.timedelta=datetime.timedelta()):
+        self.bot = bot
+        self.table = table
+        self.column = column
+        self.index = index
+        self.ahead = ahead
+        self.horizon = horizon
+
+        self.created = 0
+        self.dropped = 0
+
+    def __repr__(self):
+        return f'<DailyPartitions table={self.table} column={self.column} created={self.created} ' \
+               f'dropped={self.dropped}>'
+
+    def partition_name(self, day: datetime.date):
+        return f'{self.table}_p{day:%Y%m%d}'
+
+    async def is_partitioned(self, conn):
+        return await conn.fetchval("""SELECT EXISTS(SELECT 1 FROM pg_partitioned_table pt
+                                                    JOIN pg_class c ON c.oid = pt.partrelid
+                                                    WHERE c.relname = $1)""", self.table)
+
+    async def partitions(self, conn):
+        """Return {day: name} for every existing partition."""
+        ret = await conn.fetch("""SELECT c.relname FROM pg_inherits i
+                                  JOIN pg_class c ON c.oid = i.inhrelid
+                                  JOIN pg_class p ON p.oid = i.inhparent
+                                  WHERE p.relname = $1""", self.table)
+
+        prefix = f'{self.table}_p'
+        found = {}
+
+        for record in ret:
+            name = record['relname']
+            if name.startswith(prefix):
+                found[datetime.datetime.strptime(name[len(prefix):], '%Y%m%d').date()] = name
+
+        return found
+
+    async def create_partition(self, conn, day: datetime.date):
+        name = self.partition_name(day)
+        start, end = day, day + datetime.timedelta(days=1)
+
+        await conn.execute(f"""CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.table}
+                               FOR VALUES FROM ('{start}') TO ('{end}')""")
+
+        for column in self.index:
+            await conn.execute(f"""CREATE INDEX IF NOT EXISTS {name}_{column}_idx ON {name} ({column})""")
+
+        self.created += 1
+        return name
+
+    async def convert(self):
+        """Convert an existing, unpartitioned table in place. Does nothing if the table is already partitioned.
+
+        Unexpired rows are copied into the new partitions in one transaction, and the old table is dropped.
+        """
+        async with self.bot.pool.acquire() as conn:
+            if await self.is_partitioned(conn):
+                return False
+
+            async with conn.transaction():
+                legacy = f'{self.table}_legacy'
+
+                await conn.execute(f"""ALTER TABLE {self.table} RENAME TO {legacy}""")
+                await conn.execute(f"""CREATE TABLE {self.table} (LIKE {legacy} INCLUDING DEFAULTS)
+                                       PARTITION BY RANGE ({self.column})""")
+
+                now = datetime.datetime.utcnow()
+                day = now.date()
+
+                while day <= (now + self.horizon).date() + datetime.timedelta(days=self.ahead):
+                    await self.create_partition(conn, day)
+                    day += datetime.timedelta(days=1)
+
+                await conn.execute(f"""INSERT INTO {self.table} SELECT * FROM {legacy}
+                                       WHERE {self.column} > now()""")
+                await conn.execute(f"""DROP TABLE {legacy}""")
+
+        return True
+
+    async def maintain(self):
+        """Create any missing upcoming partitions and drop partitions where every row has expired."""
+        now = datetime.datetime.utcnow()
+        today = now.date()
+
+        async with self.bot.pool.acquire() as conn:
+            existing = await self.partitions(conn)
+
+            day = today
+            while day <= (now + self.horizon).date() + datetime.timedelta(days=self.ahead):
+                if day not in existing:
+                    await self.create_partition(conn, day)
+                day += datetime.timedelta(days=1)
+
+            # A partition for day holds values before day + 1, so it is fully expired once today is past it.
+            for day, name in existing.items():
+                if day < today:
+                    await conn.execute(f"""DROP TABLE IF EXISTS {name}""")
+                    self.dropped += 1
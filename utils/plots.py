@@ -0,0 +1,191 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import MultipleLocator
+import matplotlib
+import matplotlib.style
+import numpy as np
+
+import datetime
+import itertools
+import threading
+from io import BytesIO
+
+__all__ = ('render_ping_plot', )
+
+
+# rcParams are process global. Renders in threads take turns applying the style, renders in a process pool
+# each have their own.
+_STYLE = matplotlib.style.library['ggplot']
+_style_lock = threading.Lock()
+
+
+def _pager(entries, chunk: int):
+    for x in range(0, len(entries), chunk):
+        yield entries[x:x + chunk]
+
+
+def _hilo(numbers, indexm: int=1):
+    highest = [index * indexm for index, val in enumerate(numbers) if val == max(numbers)]
+    lowest = [index * indexm for index, val in enumerate(numbers) if val == min(numbers)]
+
+    return highest, lowest
+
+
+def _times(current: datetime.datetime):
+    fmt = '%H%M'
+    start = current - datetime.timedelta(minutes=60)
+    start2 = current - datetime.timedelta(minutes=30)
+
+    times = [(start + datetime.timedelta(minutes=10 * x)).strftime(fmt) for x in range(7)]
+    times2 = [(start2 + datetime.timedelta(minutes=5 * x)).strftime(fmt) for x in range(7)]
+    times3 = [(start + datetime.timedelta(minutes=60 / 25 * x)).strftime(fmt) for x in range(26)]
+
+    return times, times2, times3
+
+
+def render_ping_plot(name: str, numbers: list, current: datetime.datetime) -> bytes:
+    """Render the last hour of latency, 60 samples, to PNG bytes.
+
+    Only the Figure API is used, never pyplot, so this is safe to run in threads and process pools.
+    The output only depends on the arguments, so it can be cached.
+    """
+    with _style_lock, matplotlib.rc_context(_STYLE):
+        return _render(name, list(numbers), current)
+
+
+def _render(name, numbers, current):
+    # Base Data
+    long_num = list(itertools.chain.from_iterable(itertools.repeat(num, 2) for num in numbers))
+    chunks = tuple(_pager(numbers, 4))
+
+    avg = list(itertools.chain.from_iterable(itertools.repeat(np.average(x), 8) for x in chunks))
+    mean = [np.mean(numbers)] * 60
+    prange = int(max(numbers)) - int(min(numbers))
+    plog = np.log(numbers)
+
+    t = np.sin(np.array(numbers) * np.pi*2 / 180.)
+    xnp = np.linspace(-np.pi, np.pi, 60)
+
+    # Spacing/Figure/Subs
+    fig = Figure(figsize=(15, 7.5))
+    FigureCanvasAgg(fig)
+
+    ax = fig.add_subplot(2, 2, 2, facecolor='aliceblue', alpha=0.3)   # Right
+    ax2 = fig.add_subplot(2, 2, 1, facecolor='thistle', alpha=0.2)  # Left
+    ax3 = fig.add_subplot(2, 1, 2, facecolor='aliceblue', alpha=0.3)  # Bottom
+    ml = MultipleLocator(5)
+    ml2 = MultipleLocator(1)
+
+    # Times
+    times, times2, times3 = _times(current)
+
+    # Axis's/Labels
+    ax3.set_title(f'Latency over Time ({name}) | {current} UTC')
+    ax.set_xlabel(' ')
+    ax.set_ylabel('Network Stability')
+    ax2.set_xlabel(' ')
+    ax2.set_ylabel('Milliseconds(ms)')
+    ax3.set_xlabel('Time(HHMM) UTC')
+    ax3.set_ylabel('Latency(ms)')
+
+    if min(numbers) > 100:
+        ax3.set_yticks(np.arange(min(int(min(numbers)), 2000) - 100,
+                                 max(range(0, int(max(numbers)) + 100)) + 50, max(numbers) / 12))
+    else:
+        ax3.set_yticks(np.arange(min(0, 1), max(range(0, int(max(numbers)) + 100)) + 50, max(numbers) / 12))
+
+    # Labels
+    ax.yaxis.set_minor_locator(ml2)
+    ax2.xaxis.set_minor_locator(ml2)
+    ax3.yaxis.set_minor_locator(ml)
+    ax3.xaxis.set_major_locator(ml)
+
+    ax.set_ylim([-1, 1])
+    ax.set_xlim([0, np.pi])
+    ax.yaxis.set_ticks_position('right')
+    ax.set_xticks(np.linspace(0, np.pi, 7))
+    ax.set_xticklabels(times2)
+    ax2.set_ylim([min(numbers) - prange/4, max(numbers) + prange/4])
+    ax2.set_xlim([0, 60])
+    ax2.set_xticks(np.linspace(0, 60, 7))
+    ax2.set_xticklabels(times)
+    ax3.set_xlim([0, 120])
+    ax3.set_xticks(np.linspace(0, 120, 26))
+    ax3.set_xticklabels(times3, rotation=45)
+    ax3.minorticks_on()
+
+    highest, lowest = _hilo(numbers, 2)
+
+    mup = []
+    p10 = mean[0] * (1 + 0.5)
+    m10 = mean[0] * (1 - 0.5)
+
+    for count, x in enumerate(numbers):
+        if x > p10:
+            mup.append(count)
+
+    # Axis 2 - Left
+    ax2.plot(range(0, 60), list(itertools.repeat(p10, 60)), '--', c='indianred', linewidth=1.0, markevery=highest,
+             label='+10%')
+    ax2.plot(range(0, 60), list(itertools.repeat(m10, 60)), '--', c='indianred', linewidth=1.0, markevery=highest,
+             label='+-10%')
+    ax2.plot(range(0, 60), numbers, '-', c='blue', linewidth=1.0, label='Mark Up', alpha=.8, drawstyle='steps-post')
+    ax2.plot(range(0, 60), numbers, ' ', c='red', linewidth=1.0, markevery=mup, label='Mark Up', marker='^')
+    ax2.plot(range(0, 60), mean, label='Mean', c='blue', linestyle='--', linewidth=.75)
+    ax2.plot(list(range(0, 60)), plog, 'darkorchid', alpha=.9, linewidth=1, drawstyle='default', label='Ping')
+
+    # Axis 3 - Bottom
+    ax3.plot(list(range(0, 120)), long_num, 'darkorchid', alpha=.9, linewidth=1.25, drawstyle='default', label='Ping')
+    ax3.fill_between(list(range(0, 120)), long_num, 0, facecolors='darkorchid', alpha=0.3)
+    ax3.plot(range(0, 120), long_num, ' ', c='indianred', linewidth=1.0, markevery=highest, marker='^', markersize=12)
+    ax3.text(highest[0], max(long_num) - 10, f'{round(max(numbers))}ms', fontsize=12)
+    ax3.plot(range(0, 120), long_num, ' ', c='lime', linewidth=1.0, markevery=lowest, marker='v', markersize=12)
+    ax3.text(lowest[0], min(long_num) - 10, f'{round(min(numbers))}ms', fontsize=12)
+    ax3.plot(list(range(0, 120)), long_num, 'darkorchid', alpha=.5, linewidth=.75, drawstyle='steps-pre',
+             label='Steps')
+    ax3.plot(range(0, 120), avg, c='forestgreen', linewidth=1.25, markevery=.5, label='Average')
+
+    # Axis - Right
+    ax.fill_between(list(range(0, 120)), .25, 1, facecolors='lime', alpha=0.2)
+    ax.fill_between(list(range(0, 120)), .25, -.25, facecolors='dodgerblue', alpha=0.2)
+    ax.fill_between(list(range(0, 120)), -.25, -1, facecolors='crimson', alpha=0.2)
+    ax.fill_between(xnp, t, 1, facecolors='darkred')
+
+    # Legend
+    ax.legend(bbox_to_anchor=(.905, .97), bbox_transform=fig.transFigure)
+    ax3.legend(loc='best', bbox_transform=fig.transFigure)
+
+    # Grid
+    ax.grid(which='minor')
+    ax2.grid(which='both')
+    ax3.grid(which='both')
+    ax3.grid(True, alpha=0.25)
+
+    # Inverts
+    ax.invert_yaxis()
+
+    f = BytesIO()
+    fig.savefig(f, format='png', bbox_inches='tight')
+    return f.getvalue()
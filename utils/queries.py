@@ -0,0 +1,124 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import datetime
+
+from .db import Query
+
+# Every statement the bot runs against its own tables, declared once.
+# Run them with bot.db, which records latency and row counts per query for the owner queries command.
+# Every query here is also EXPLAINed by python -m utils.migrations --check.
+
+_TS = datetime.datetime(2018, 1, 1)
+
+
+# Guilds
+guilds_load = Query('guilds.load', """SELECT id, prefixes, autoroom, twitch FROM guilds""", scan_ok=True)
+
+guilds_fix_prefixes = Query('guilds.fix_prefixes', """UPDATE guilds SET prefixes = $1 WHERE id = ANY($2::bigint[])""",
+                            example=(['>>'], [1]))
+
+guilds_insert = Query('guilds.insert', """INSERT INTO guilds(id, prefixes) VALUES($1, $2) ON CONFLICT (id)
+                                          DO UPDATE SET prefixes = $2
+                                          WHERE guilds.id IN ($1) AND guilds.prefixes IS NULL""",
+                      example=(1, ['>>']))
+
+guilds_add_prefix = Query('guilds.add_prefix', """UPDATE guilds SET prefixes = prefixes || $1::text WHERE id IN ($2)""",
+                          example=('>>', 1))
+
+guilds_remove_prefix = Query('guilds.remove_prefix', """UPDATE guilds SET prefixes = array_remove(prefixes, $1::text)
+                                                        WHERE id IN ($2)""", example=('>>', 1))
+
+guilds_set_autoroom = Query('guilds.set_autoroom', """UPDATE guilds SET autoroom = $1 WHERE guilds.id IN ($2)""",
+                            example=(1, 1))
+
+guilds_get_twitch = Query('guilds.get_twitch', """SELECT twitch FROM guilds WHERE id = $1""", example=(1, ))
+
+guilds_set_twitch = Query('guilds.set_twitch', """UPDATE guilds SET twitch = $1 WHERE guilds.id = $2""",
+                          example=(1, 1))
+
+
+# Blocks
+blocks_load = Query('blocks.load', """SELECT id, ends FROM blocks""", scan_ok=True)
+
+blocks_list = Query('blocks.list', """SELECT * FROM blocks""", scan_ok=True)
+
+blocks_insert = Query('blocks.insert', """INSERT INTO blocks(id, reason, start, ends) VALUES ($1, $2, now(), $3)
+                                          ON CONFLICT (id)
+                                          DO NOTHING""", example=(1, 'reason', _TS))
+
+blocks_remove = Query('blocks.remove', """DELETE FROM blocks WHERE id IN ($1)""", example=(1, ))
+
+blocks_expire = Query('blocks.expire', """DELETE FROM blocks WHERE id = ANY($1::bigint[]) AND ends <= $2""",
+                      example=([1], _TS))
+
+
+# Temp channels
+tempchannels_for_member = Query('tempchannels.for_member', """SELECT cid FROM tempchannels WHERE mid IN ($1)""",
+                                example=(1, ))
+
+tempchannels_insert = Query('tempchannels.insert', """INSERT INTO tempchannels(cid, gid, mid, ts)
+                                                      VALUES($1, $2, $3, $4)""", example=(1, 1, 1, _TS))
+
+tempchannels_all = Query('tempchannels.all', """SELECT * FROM tempchannels""", scan_ok=True)
+
+tempchannels_remove = Query('tempchannels.remove', """DELETE FROM tempchannels WHERE cid IN ($1)""", example=(1, ))
+
+
+# Messages archive
+messages_get = Query('messages.get', """SELECT * FROM messages WHERE mid IN($1)""", example=(1, ))
+
+messages_expire = Query('messages.expire', """DELETE FROM messages WHERE now() >= messages.expiry""")
+
+
+# osu! and Twitch accounts
+osu_get = Query('osu.get', """SELECT username FROM osu WHERE id IN($1)""", example=(1, ))
+
+osu_set = Query('osu.set', """INSERT INTO osu(id, username) VALUES($1, $2)
+                              ON CONFLICT(id) DO UPDATE SET username = $2 WHERE osu.id IN($1)""", example=(1, 'name'))
+
+twitch_set = Query('twitch.set', """INSERT INTO twitch(uid, channel) VALUES($1, $2)
+                                    ON CONFLICT(uid) DO UPDATE SET channel = $2""", example=(1, 'channel'))
+
+
+# Stats and leaderboards
+stats_totals = Query('stats.totals', """SELECT item, value FROM stats WHERE item IN('messages', 'commands')""")
+
+stats_add = Query('stats.add', """INSERT INTO stats(item, value) SELECT * FROM unnest($1::text[], $2::bigint[])
+                                  ON CONFLICT(item)
+                                    DO UPDATE SET value = COALESCE(stats.value, 0)::bigint + excluded.value::bigint""",
+                  example=(['messages'], [1]))
+
+rollups_load = Query('rollups.load', """SELECT kind, key, count FROM rollups""", scan_ok=True)
+
+rollups_clear = Query('rollups.clear', """DELETE FROM rollups""", scan_ok=True)
+
+rollups_backfill = Query('rollups.backfill', """(SELECT 'command' AS kind, name AS key, count(*) AS count FROM commands
+                                                 GROUP BY name)
+                                                UNION ALL
+                                                (SELECT 'user', uid::text, count(*) FROM commands
+                                                 GROUP BY uid ORDER BY 3 DESC LIMIT $1)
+                                                UNION ALL
+                                                (SELECT 'guild', gid::text, count(*) FROM commands
+                                                 WHERE gid IS NOT NULL
+                                                 GROUP BY gid ORDER BY 3 DESC LIMIT $1)""",
+                         example=(100, ), scan_ok=True)
@@ -0,0 +1,264 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+
+import utils
+
+__all__ = ('RenderService', 'render_gif', 'preload_templates')
+
+
+# TemplateRegistry per (path, directory, font), so each worker process decodes the templates once.
+_registries = {}
+
+
+def _registry(config: tuple):
+    try:
+        return _registries[config]
+    except KeyError:
+        path, directory, font = config
+        registry = _registries[config] = utils.TemplateRegistry(path, directory=directory, font=font)
+        return registry
+
+
+def preload_templates(config: tuple) -> int:
+    """Decode the templates in this worker ahead of the first render. Runs in a worker process."""
+    _registry(config)
+    return os.getpid()
+
+
+def render_gif(config: tuple, name: str, texts: dict) -> bytes:
+    """Draw and encode a template, returning the GIF. Runs in a worker process."""
+    template = _registry(config)[name]
+    return template.encode(template.render(texts))
+
+
+class RenderService:
+    """Draws and encodes the Fun GIFs end to end in worker processes. Only the finished bytes come back.
+
+    The executor caps how many renders run and wait at once. Renders past the cap raise ExecutorSaturated
+    immediately, so the commands can say they are busy instead of queueing without bound.
+
+    The bot process only reads the template file, to know which templates exist. Each worker decodes them on its
+    first render, or on warm().
+
+    Finished GIFs are cached by content. The key is a hash of the template, its GIF and font, and the exact texts
+    drawn, so a render is reused for as long as all of those stay the same. Cache hits never touch the executor.
+    The same render requested again while it is running waits for that render instead of starting another.
+    With cache_dir set, renders are also kept on disk so they survive restarts. Both tiers are limited by bytes.
+
+    Parameters
+    ------------
+    path: str [Optional]
+        The JSON file describing the templates. Defaults to resources/templates.json.
+    directory: str [Optional]
+        The directory holding the GIFs. Defaults to resources.
+    font: str [Optional]
+        The TrueType font drawn with.
+    executor: str [Optional]
+        The name of the registered process executor to use. Defaults to render.
+    cache_size: int [Optional]
+        The max bytes of GIFs kept in memory. Defaults to 32MiB.
+    cache_dir: str [Optional]
+        The directory renders are persisted to. Renders are only kept in memory if this is None, the default.
+    disk_size: int [Optional]
+        The max bytes of GIFs kept in cache_dir. The least recently used are deleted first. Defaults to 256MiB.
+    """
+
+    __slots__ = ('config', 'executor', 'templates', 'missing', 'versions', 'cache', 'cache_dir', 'disk_size',
+                 '_disk_bytes', '_pending', 'rendered', 'rejected', 'bytes_out', 'disk_hits', 'coalesced')
+
+    def __init__(self, path: str='resources/templates.json', *, directory: str='resources',
+                 font: str='resources/fonts/Playtime.ttf', executor: str='render', cache_size: int=32 * 1024 ** 2,
+                 cache_dir: str=None, disk_size: int=256 * 1024 ** 2):
+        self.config = (path, directory, font)
+        self.executor = executor
+
+        with open(path, encoding='utf-8') as fp:
+            specs = json.load(fp)
+
+        exists = {n for n, s in specs.items() if os.path.exists(os.path.join(directory, s['file']))}
+        self.templates = frozenset(exists)
+        self.missing = tuple(n for n in specs if n not in exists)
+
+        with open(font, 'rb') as fp:
+            font_hash = hashlib.sha256(fp.read()).digest()
+
+        self.versions = {}
+        for name in exists:
+            with open(os.path.join(directory, specs[name]['file']), 'rb') as fp:
+                gif = fp.read()
+
+            spec = json.dumps(specs[name], sort_keys=True).encode()
+            self.versions[name] = hashlib.sha256(spec + gif + font_hash).digest()
+
+        # A byte budget, so a few large renders can not crowd out memory. The entry limit is only a backstop.
+        self.cache = utils.EvieeLRU(name='Renders', limit=100_000, max_size=cache_size, sizeof=len)
+
+        self.cache_dir = cache_dir
+        self.disk_size = disk_size
+        self._disk_bytes = 0
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = self._prune()
+
+        self._pending = {}
+
+        self.rendered = {n: 0 for n in exists}
+        self.rejected = 0
+        self.bytes_out = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+
+    def __repr__(self):
+        return f'<RenderService executor={self.executor} templates={len(self.templates)} ' \
+               f'rendered={sum(self.rendered.values())} rejected={self.rejected} cached={len(self.cache)}>'
+
+    def __contains__(self, name: str):
+        return name in self.templates
+
+    @property
+    def disk_bytes(self):
+        return self._disk_bytes
+
+    def key(self, name: str, texts: dict) -> str:
+        """The content address of a render."""
+        drawn = json.dumps(texts, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.sha256(self.versions[name] + drawn).hexdigest()
+
+    def _file(self, key: str):
+        return os.path.join(self.cache_dir, f'{key}.gif')
+
+    def _load(self, key: str):
+        # Renders are at most a few hundred KiB on a local disk, so this is cheaper inline than in an executor.
+        path = self._file(key)
+
+        try:
+            with open(path, 'rb') as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            return None
+
+        # The modified time is the recency used when pruning.
+        os.utime(path)
+        return data
+
+    def _store(self, key: str, data: bytes):
+        path = self._file(key)
+        temp = f'{path}.tmp'
+
+        with open(temp, 'wb') as fp:
+            fp.write(data)
+        os.replace(temp, path)
+
+    def _prune(self) -> int:
+        """Delete the least recently used renders on disk until they fit in disk_size. Returns the bytes kept."""
+        entries = []
+
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.gif'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total <= self.disk_size:
+                break
+
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+        return total
+
+    async def _persist(self, key: str, data: bytes):
+        try:
+            await utils.evieecutor(self._store, 'io', None, key, data)
+            self._disk_bytes += len(data)
+
+            if self._disk_bytes > self.disk_size:
+                self._disk_bytes = await utils.evieecutor(self._prune, 'io')
+        except (utils.ExecutorSaturated, OSError):
+            # The render is still cached in memory, it just will not survive a restart.
+            pass
+
+    async def warm(self):
+        """Have the workers decode the templates before the first command needs them.
+
+        One call is submitted per worker at once. Each takes long enough that they are spread across the pool.
+        Returns the process IDs which loaded them.
+        """
+        executor = utils.executors[self.executor]
+        calls = [executor.run(preload_templates, self.config) for _ in range(executor.max_workers)]
+        return set(await asyncio.gather(*calls))
+
+    async def _render(self, key: str, name: str, texts: dict) -> bytes:
+        try:
+            data = await utils.executors[self.executor].run(render_gif, self.config, name, texts)
+        except utils.ExecutorSaturated:
+            self.rejected += 1
+            raise
+        finally:
+            del self._pending[key]
+
+        self.rendered[name] += 1
+        self.bytes_out += len(data)
+        self.cache[key] = data
+
+        if self.cache_dir is not None:
+            asyncio.ensure_future(self._persist(key, data))
+        return data
+
+    async def render(self, name: str, texts: dict) -> bytes:
+        """Return the template name rendered with texts, keyed by slot, as an encoded GIF.
+
+        Served from cache when possible. Raises ExecutorSaturated when it has to be rendered and too many renders
+        are already running or waiting.
+        """
+        key = self.key(name, texts)
+
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        if self.cache_dir is not None:
+            data = self._load(key)
+
+            if data is not None:
+                self.disk_hits += 1
+                self.cache[key] = data
+                return data
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(self._render(key, name, texts))
+        else:
+            self.coalesced += 1
+
+        # Shielded, so one caller giving up does not cancel the render for everyone else waiting on it.
+        return await asyncio.shield(task)
@@ -0,0 +1,254 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+from discord.backoff import ExponentialBackoff
+
+import asyncio
+import heapq
+import itertools
+import random
+import sys
+import time
+import traceback
+
+
+__all__ = ('Job', 'Scheduler')
+
+
+class Job:
+    """A recurring or one-shot job owned by the Scheduler.
+
+    A recurring job may return a number from its coroutine to override the delay before its next run.
+    Otherwise runs are a fixed interval apart from when they were due, not from when the last one finished.
+    """
+
+    __slots__ = ('name', 'func', 'interval', 'jitter', 'pause_on_reconnect', 'wait_until_ready', 'next_run', 'due',
+                 'last_run', 'last_duration', 'runs', 'failures', 'last_error', 'running', 'cancelled')
+
+    def __init__(self, name: str, func, *, interval: float=None, jitter: float=0, pause_on_reconnect: bool=True,
+                 wait_until_ready: bool=True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.pause_on_reconnect = pause_on_reconnect
+        self.wait_until_ready = wait_until_ready
+
+        self.next_run = None
+        self.due = None
+        self.last_run = None
+        self.last_duration = None
+        self.runs = 0
+        self.failures = 0
+        self.last_error = None
+        self.running = False
+        self.cancelled = False
+
+    def __repr__(self):
+        return f'<Job name={self.name} interval={self.interval} runs={self.runs} failures={self.failures}>'
+
+    @property
+    def one_shot(self):
+        return self.interval is None
+
+
+class Scheduler:
+    """A single timer which owns every recurring and one-shot job the bot runs.
+
+    Jobs are kept in a heap ordered by their next run time, so only the earliest job is ever waited on.
+    Each run is its own task, so a slow job never delays the others. Scheduling a job with the name of an existing
+    job replaces it, which keeps module reloads from stacking duplicate loops.
+    """
+
+    __slots__ = ('bot', '_jobs', '_heap', '_counter', '_wakeup', '_task')
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self._jobs = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __repr__(self):
+        return f'<Scheduler jobs={len(self._jobs)}>'
+
+    def __contains__(self, name: str):
+        return name in self._jobs
+
+    @property
+    def jobs(self):
+        return sorted(self._jobs.values(), key=lambda j: j.next_run or 0)
+
+    def get(self, name: str):
+        return self._jobs.get(name)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = self.bot.loop.create_task(self._runner())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def schedule(self, name: str, func, *, interval: float=None, delay: float=0, jitter: float=0,
+                 pause_on_reconnect: bool=True, wait_until_ready: bool=True) -> Job:
+        """Schedule a coroutine function.
+
+        Parameters
+        ------------
+        name: str
+            A unique name for the job. An existing job with the same name is cancelled and replaced.
+        func:
+            A coroutine function taking no arguments.
+        interval: float [Optional]
+            Seconds between runs. If None, the job runs once.
+        delay: float
+            Seconds to wait before the first run.
+        jitter: float
+            Up to this many random seconds are added to every delay, to avoid jobs running in lockstep.
+        pause_on_reconnect: bool
+            Whether runs wait, with an exponential backoff, while the bot is reconnecting.
+        wait_until_ready: bool
+            Whether runs wait until the bot is ready.
+        """
+        self.cancel(name)
+
+        job = Job(name, func, interval=interval, jitter=jitter, pause_on_reconnect=pause_on_reconnect,
+                  wait_until_ready=wait_until_ready)
+        self._jobs[name] = job
+        self._push(job, delay)
+
+        return job
+
+    def schedule_at(self, name: str, func, *, when: float, **kwargs) -> Job:
+        """Schedule a one-shot job to run at a loop.time() timestamp."""
+        return self.schedule(name, func, delay=max(0, when - self.bot.loop.time()), **kwargs)
+
+    def cancel(self, name: str):
+        job = self._jobs.pop(name, None)
+        if job is not None:
+            job.cancelled = True
+        return job
+
+    def _push(self, job: Job, delay: float):
+        self._push_at(job, self.bot.loop.time() + delay)
+
+    def _push_at(self, job: Job, due: float):
+        # Jitter is applied on top of the due time, so it never accumulates across runs.
+        job.due = due
+        job.next_run = due + (random.uniform(0, job.jitter) if job.jitter else 0)
+        heapq.heappush(self._heap, (job.next_run, next(self._counter), job))
+
+        # Wake the runner if this is now the earliest job.
+        if self._heap[0][2] is job:
+            self._wakeup.set()
+
+    async def _runner(self):
+        loop = self.bot.loop
+
+        while not self.bot.is_closed():
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            when, _, job = self._heap[0]
+
+            # Stale entries are left in the heap when a job is cancelled or replaced.
+            if job.cancelled or when != job.next_run:
+                heapq.heappop(self._heap)
+                continue
+
+            delay = when - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            loop.create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        if job.wait_until_ready:
+            await self.bot.wait_until_ready()
+
+        if job.pause_on_reconnect:
+            await self._wait_reconnected(job)
+
+        if job.cancelled:
+            return
+
+        job.running = True
+        job.last_run = time.time()
+        started = time.perf_counter()
+        ret = None
+
+        try:
+            ret = await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = f'{type(e).__name__}: {e}'
+
+            print(f'Ignoring exception in scheduled job <{job.name}>:', file=sys.stderr)
+            traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
+        finally:
+            job.running = False
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+
+        if job.cancelled or self._jobs.get(job.name) is not job:
+            return
+
+        if job.one_shot:
+            del self._jobs[job.name]
+            return
+
+        if isinstance(ret, (int, float)) and not isinstance(ret, bool):
+            self._push(job, ret)
+            return
+
+        # Keep to the original cadence, so runtime does not push every later run back. Runs missed while this one
+        # was running or waiting for a reconnect are skipped, not run back to back.
+        due = job.due + job.interval
+        now = self.bot.loop.time()
+        if due <= now:
+            due += ((now - due) // job.interval + 1) * job.interval
+
+        self._push_at(job, due)
+
+    async def _wait_reconnected(self, job: Job):
+        backoff = ExponentialBackoff()
+        retrys = 0
+
+        while self.bot.is_reconnecting() and not job.cancelled:
+            retrys += 1
+            await asyncio.sleep(backoff.delay())
+
+        if retrys:
+            print(f'Resumed Job: {job.name} after {retrys} trys.\n')
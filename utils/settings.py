@@ -0,0 +1,137 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import re
+
+__all__ = ('PrefixMatcher', 'GuildSettings', 'SettingsStore')
+
+
+class PrefixMatcher:
+    """A compiled matcher for a set of prefixes, including the bots mention forms.
+
+    Prefixes are ordered longest first, so the first match is always the longest possible prefix.
+    The ordered list is also what get_prefix hands to the library, so both always agree on the prefix used.
+    """
+
+    __slots__ = ('prefixes', '_pattern')
+
+    def __init__(self, prefixes, *, user_id: int):
+        mentions = (f'<@{user_id}> ', f'<@!{user_id}> ')
+        self.prefixes = sorted(sorted({*mentions, *prefixes}, reverse=True), key=len, reverse=True)
+        self._pattern = re.compile('|'.join(re.escape(p) for p in self.prefixes))
+
+    def __repr__(self):
+        return f'<PrefixMatcher prefixes={self.prefixes}>'
+
+    def match(self, content: str):
+        """Return the prefix the content starts with, or None."""
+        match = self._pattern.match(content)
+
+        if match is None:
+            return None
+        return match.group(0)
+
+
+class GuildSettings:
+    """A single guilds row from the guilds table, held in memory."""
+
+    __slots__ = ('id', 'prefixes', 'autoroom', 'twitch', '_matcher')
+
+    def __init__(self, id_: int, *, prefixes, autoroom: int=None, twitch: int=None):
+        self.id = id_
+        self.prefixes = sorted(prefixes, reverse=True)
+        self.autoroom = autoroom
+        self.twitch = twitch
+
+        self._matcher = None
+
+    def __repr__(self):
+        return f'<GuildSettings id={self.id} prefixes={self.prefixes} autoroom={self.autoroom} twitch={self.twitch}>'
+
+    @classmethod
+    def from_record(cls, record, *, defaults):
+        return cls(record['id'], prefixes=record['prefixes'] or defaults,
+                   autoroom=record['autoroom'], twitch=record['twitch'])
+
+    def matcher(self, user_id: int) -> PrefixMatcher:
+        """Return the compiled matcher for this guild, building it only if prefixes have changed."""
+        if self._matcher is None:
+            self._matcher = PrefixMatcher(self.prefixes, user_id=user_id)
+        return self._matcher
+
+    def add_prefix(self, prefix: str):
+        # Kept reverse sorted so longer prefixes sharing a start are matched first. E.g "eviee pls " > "eviee "
+        self.prefixes.append(prefix)
+        self.prefixes.sort(reverse=True)
+        self._matcher = None
+
+    def remove_prefix(self, prefix: str):
+        self.prefixes.remove(prefix)
+        self._matcher = None
+
+
+class SettingsStore:
+    """Unbounded per guild settings store.
+
+    This is bulk loaded once at startup and updated in place by commands which change settings.
+    Lookups never touch the database.
+    """
+
+    __slots__ = ('_guilds', '_defaults')
+
+    def __init__(self, *, defaults):
+        self._guilds = {}
+        self._defaults = defaults
+
+    def __repr__(self):
+        return f'<SettingsStore guilds: {len(self._guilds)}>'
+
+    def __getitem__(self, guild_id: int) -> GuildSettings:
+        return self._guilds[guild_id]
+
+    def __contains__(self, guild_id: int):
+        return guild_id in self._guilds
+
+    def __len__(self):
+        return len(self._guilds)
+
+    def get(self, guild_id: int, default=None):
+        return self._guilds.get(guild_id, default)
+
+    def load(self, records):
+        """Populate the store from guilds table records. Returns the IDs of guilds which had no prefixes."""
+        missing = []
+
+        for record in records:
+            if not record['prefixes']:
+                missing.append(record['id'])
+
+            self._guilds[record['id']] = GuildSettings.from_record(record, defaults=self._defaults)
+
+        return missing
+
+    def create(self, guild_id: int) -> GuildSettings:
+        """Create and store default settings for a guild we have not seen before."""
+        settings = GuildSettings(guild_id, prefixes=self._defaults)
+        self._guilds[guild_id] = settings
+
+        return settings
@@ -0,0 +1,263 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import bisect
+import collections
+import datetime
+import heapq
+import math
+import time
+
+import utils
+
+__all__ = ('LatencyHistogram', 'CommandEvent', 'CommandTelemetry', 'SpaceSaving', 'Leaderboards')
+
+
+class LatencyHistogram:
+    """A fixed size histogram of latencies with exponentially growing buckets.
+
+    Buckets grow by 25% from 1ms, so percentiles are accurate to within a bucket, about 12%, and memory is the same
+    no matter how many values are recorded.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    BOUNDS = tuple(0.001 * 1.25 ** i for i in range(64))
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def __repr__(self):
+        return f'<LatencyHistogram count={self.count} p50={self.percentile(50)} p99={self.percentile(99)}>'
+
+    @property
+    def mean(self):
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        """Return the upper bound, in seconds, of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+
+        target = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                break
+
+        if i >= len(self.BOUNDS):
+            return self.max
+        return min(self.BOUNDS[i], self.max)
+
+
+CommandEvent = collections.namedtuple('CommandEvent', 'name ts gid uid cid latency failed')
+
+
+class CommandTelemetry:
+    """In memory command statistics.
+
+    Keeps per command invocation and error counters, a latency histogram per command and a ring buffer of the most
+    recent command events. Latency is measured from on_command to on_command_completion or on_command_error.
+    """
+
+    __slots__ = ('recent', 'invocations', 'errors', 'histograms')
+
+    def __init__(self, *, capacity: int=1000):
+        self.recent = collections.deque(maxlen=capacity)
+        self.invocations = collections.Counter()
+        self.errors = collections.Counter()
+        self.histograms = collections.defaultdict(LatencyHistogram)
+
+    def __repr__(self):
+        return f'<CommandTelemetry commands={len(self.histograms)} invocations={sum(self.invocations.values())}>'
+
+    def start(self, ctx):
+        ctx.started = time.perf_counter()
+
+    def finish(self, ctx, *, failed: bool=False):
+        """Record a finished command and return its CommandEvent. Returns None if the command was never started."""
+        started = getattr(ctx, 'started', None)
+        if started is None or ctx.command is None:
+            return None
+
+        # A context is only ever finished once, even if it errors after completing.
+        ctx.started = None
+
+        latency = time.perf_counter() - started
+        name = ctx.command.qualified_name
+
+        self.invocations[name] += 1
+        if failed:
+            self.errors[name] += 1
+        self.histograms[name].record(latency)
+
+        event = CommandEvent(name, datetime.datetime.utcnow() - datetime.timedelta(seconds=latency),
+                             ctx.guild.id if ctx.guild else None, ctx.author.id, ctx.channel.id, latency, failed)
+        self.recent.append(event)
+
+        return event
+
+
+class SpaceSaving:
+    """The Space-Saving top-k sketch.
+
+    Tracks the approximate top capacity keys of an unbounded stream in fixed memory. Counts are never under
+    estimated, and over estimated by at most the error stored for the key. Keys with a true count above
+    total / capacity are always tracked.
+    """
+
+    __slots__ = ('capacity', 'counts', 'errors', '_heap')
+
+    def __init__(self, capacity: int=100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def __repr__(self):
+        return f'<SpaceSaving capacity={self.capacity} tracked={len(self.counts)}>'
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def add(self, key, amount: int=1):
+        counts = self.counts
+
+        if key in counts:
+            counts[key] += amount
+        elif len(counts) < self.capacity:
+            counts[key] = amount
+            self.errors[key] = 0
+        else:
+            # Replace the smallest key, inheriting its count as this keys error.
+            victim, floor = self._pop_min()
+            del counts[victim]
+            del self.errors[victim]
+
+            counts[key] = floor + amount
+            self.errors[key] = floor
+
+        heapq.heappush(self._heap, (counts[key], key))
+
+        # The heap holds an entry per update, most of them stale. Rebuild it before it grows unbounded.
+        if len(self._heap) > self.capacity * 8:
+            self._heap = [(c, k) for k, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return key, count
+
+    def top(self, n: int=None):
+        """Return (key, count) pairs, highest count first."""
+        return heapq.nlargest(n or len(self.counts), self.counts.items(), key=lambda kv: kv[1])
+
+    def load(self, items):
+        """Seed the sketch with (key, count) pairs, e.g. from the rollup table."""
+        for key, count in items:
+            self.add(key, count)
+
+
+class Leaderboards:
+    """Command leaderboards and totals, maintained as commands run and messages are seen.
+
+    Commands are counted exactly. Users and guilds are unbounded, so they are counted with a SpaceSaving sketch.
+    The tops are persisted to the rollups table periodically and loaded at startup, so the about command never has
+    to aggregate the commands table. Nothing is persisted until they have been loaded, so a failed startup can not
+    replace the table with empty boards.
+    """
+
+    __slots__ = ('bot', 'commands', 'users', 'guilds', 'totals', 'loaded')
+
+    KINDS = ('command', 'user', 'guild')
+
+    def __init__(self, bot, *, capacity: int=100):
+        self.bot = bot
+
+        self.commands = collections.Counter()
+        self.users = SpaceSaving(capacity)
+        self.guilds = SpaceSaving(capacity)
+        self.totals = collections.Counter()
+        self.loaded = False
+
+    def __repr__(self):
+        return f'<Leaderboards commands={len(self.commands)} users={len(self.users)} guilds={len(self.guilds)}>'
+
+    def record(self, event: CommandEvent):
+        self.commands[event.name] += 1
+        self.users.add(event.uid)
+
+        if event.gid is not None:
+            self.guilds.add(event.gid)
+
+    async def load(self):
+        """Load the totals and leaderboards. On first run the leaderboards are built from the commands table once."""
+        async with self.bot.db.acquire() as conn:
+            for record in await conn.fetch(utils.queries.stats_totals):
+                self.totals[record['item']] = int(record['value'] or 0)
+
+            rows = await conn.fetch(utils.queries.rollups_load)
+            if not rows:
+                rows = await conn.fetch(utils.queries.rollups_backfill, self.users.capacity)
+
+        for row in rows:
+            if row['kind'] == 'command':
+                self.commands[row['key']] = row['count']
+            elif row['kind'] == 'user':
+                self.users.load([(int(row['key']), row['count'])])
+            elif row['kind'] == 'guild':
+                self.guilds.load([(int(row['key']), row['count'])])
+
+        self.loaded = True
+
+    async def persist(self, *, timeout: float=None):
+        """Replace the rollups table with the current leaderboards. Does nothing until they have been loaded."""
+        if not self.loaded:
+            return
+
+        records = [('command', k, c) for k, c in self.commands.items()]
+        records.extend(('user', str(k), c) for k, c in self.users.counts.items())
+        records.extend(('guild', str(k), c) for k, c in self.guilds.counts.items())
+
+        async with self.bot.db.acquire(timeout=timeout) as conn:
+            async with conn.transaction():
+                await conn.execute(utils.queries.rollups_clear, timeout=timeout)
+                await conn.copy_records_to_table('rollups', records=records, columns=('kind', 'key', 'count'),
+                                                 timeout=timeout)
@@ -0,0 +1,407 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+from PIL import GifImagePlugin, Image, ImageColor, ImageDraw, ImageFont, ImageSequence
+import numpy as np
+
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import types
+
+__all__ = ('TextSlot', 'GifTemplate', 'TemplateRegistry', 'text_size', 'encode_gif')
+
+
+def text_size(font, text: str):
+    """The width and height of text drawn with font, from the origin. getsize was removed in Pillow 10."""
+    try:
+        return font.getsize(text)
+    except AttributeError:
+        left, top, right, bottom = font.getbbox(text)
+        return right, bottom
+
+
+@contextlib.contextmanager
+def _palette_frames():
+    """Decode GIF frames as palette images while they share one palette. Pillow 9+ otherwise decodes every frame
+    after the first as RGBA, which is four times the size and can not be drawn on with palette indexes.
+    """
+    strategy = getattr(GifImagePlugin, 'LOADING_STRATEGY', None)
+    if strategy is None:
+        yield
+        return
+
+    GifImagePlugin.LOADING_STRATEGY = GifImagePlugin.LoadingStrategy.RGB_AFTER_DIFFERENT_PALETTE_ONLY
+    try:
+        yield
+    finally:
+        GifImagePlugin.LOADING_STRATEGY = strategy
+
+
+def _merge(frames, durations):
+    """Fold runs of the same frame object into one frame shown for their combined duration."""
+    merged = []
+
+    for frame, duration in zip(frames, durations):
+        if merged and merged[-1][0] is frame:
+            merged[-1][1] += duration
+        else:
+            merged.append([frame, duration])
+
+    return merged
+
+
+def encode_gif(frames, durations, *, loop: int=0, transparency: int=None) -> bytes:
+    """Encode frames as a GIF, writing only what changed between frames.
+
+    Every frame after the first is cropped to the rectangle which changed since the frame before it, and drawn over
+    it without disposal. Inside that rectangle pixels which did not change are made transparent, which compresses
+    much better. Frames identical to the one before, such as padding, are dropped and their duration added to it.
+
+    The frames must be palette images sharing the first frames palette. When they are not, they are handed to
+    Pillow's GIF writer instead, after merging repeated frames.
+
+    Parameters
+    ------------
+    frames: list
+        The frames. The same image object may appear more than once.
+    durations: list
+        The duration of each frame in milliseconds.
+    loop: int [Optional]
+        The loop count. 0 loops forever.
+    transparency: int [Optional]
+        The palette index treated as transparent, usually the templates. Without one, changed rectangles are
+        written opaque.
+    """
+    merged = _merge(frames, durations)
+    first = merged[0][0]
+    palette = first.getpalette()
+
+    f = io.BytesIO()
+
+    if any(frame.mode != 'P' or (frame is not first and frame.getpalette() != palette) for frame, _ in merged):
+        images = [frame for frame, _ in merged]
+        images[0].save(f, 'gif', save_all=True, append_images=images[1:], loop=loop,
+                       duration=[duration for _, duration in merged])
+        return f.getvalue()
+
+    header, _ = GifImagePlugin.getheader(first.copy(), None, {'loop': loop, 'optimize': False})
+    f.write(b''.join(header))
+
+    params = {'disposal': 1}
+    if transparency is not None:
+        params['transparency'] = transparency
+
+    previous = None
+    writes = []
+
+    for frame, duration in merged:
+        current = np.asarray(frame)
+
+        if previous is None:
+            writes.append([frame, (0, 0), duration])
+            previous = current
+            continue
+
+        changed = current != previous
+        rows = np.flatnonzero(changed.any(axis=1))
+
+        if not rows.size:
+            writes[-1][2] += duration
+            continue
+
+        cols = np.flatnonzero(changed.any(axis=0))
+        top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+        delta = current[top:bottom, left:right].copy()
+        if transparency is not None:
+            delta[~changed[top:bottom, left:right]] = transparency
+
+        image = Image.frombytes('P', (right - left, bottom - top), delta.tobytes())
+        writes.append([image, (int(left), int(top)), duration])
+        previous = current
+
+    for image, offset, duration in writes:
+        f.write(b''.join(GifImagePlugin.getdata(image, offset, duration=duration, **params)))
+
+    f.write(b';')
+    return f.getvalue()
+
+
+def _axis(spec, frames: int):
+    """Parse one coordinate of a slot into (centre, offsets).
+
+    A number is a fixed position. {"centre": width} centres the text in width. A track,
+    {"start": 45, "step": 15, "steps": {"12": 45}, "hold": [6, 8]}, moves the text by step each frame, or by the
+    value in steps for that frame, except on held frames.
+    """
+    if isinstance(spec, (int, float)):
+        return None, (spec, ) * frames
+
+    if 'centre' in spec:
+        return spec['centre'], (0, ) * frames
+
+    steps = {int(k): v for k, v in spec.get('steps', {}).items()}
+    hold = set(spec.get('hold', ()))
+
+    offsets = []
+    position = spec['start']
+    for index in range(frames):
+        if index not in hold:
+            position += steps.get(index, spec.get('step', 0))
+        offsets.append(position)
+
+    return None, tuple(offsets)
+
+
+class TextSlot:
+    """Text drawn on a range of a templates frames. Built from one entry of a templates "slots".
+
+    Colours are palette indexes. A colour string is converted to its greyscale value, as the commands always have.
+    """
+
+    __slots__ = ('text', 'font', 'fill', 'fontmode', 'start', 'stop', '_x', '_y')
+
+    def __init__(self, spec: dict, font, frames: int):
+        fill = spec.get('fill', 0)
+
+        self.text = spec['text']
+        self.font = font
+        self.fill = ImageColor.getcolor(fill, 'L') if isinstance(fill, str) else fill
+        self.fontmode = spec.get('fontmode')
+
+        start, stop = spec.get('frames', (None, None))
+        self.start = start or 0
+        self.stop = frames if stop is None else stop
+
+        self._x = _axis(spec['x'], frames)
+        self._y = _axis(spec['y'], frames)
+
+    def __repr__(self):
+        return f'<TextSlot text={self.text} frames={self.start}-{self.stop} fill={self.fill}>'
+
+    def position(self, index: int, size: tuple):
+        """The position of text size big on the frame at index."""
+        (cx, xs), (cy, ys) = self._x, self._y
+        w, h = size
+
+        x = xs[index] if cx is None else (cx - w) / 2
+        y = ys[index] if cy is None else (cy - h) / 2
+        return x, y
+
+    def mask(self, text: str, size: tuple, fraction: tuple, fontmode: str):
+        """Rasterize text once. Returns the mask and the margin it is padded by on each side.
+
+        Text is rasterized at the sub pixel offset and with the fontmode it is drawn with, so the mask is identical
+        to what draw.text would produce on a frame.
+        """
+        margin = self.font.size
+        w, h = size
+
+        image = Image.new('L', (w + margin * 2, h + margin * 2))
+        draw = ImageDraw.Draw(image)
+        draw.fontmode = fontmode
+        draw.text((margin + fraction[0], margin + fraction[1]), text, font=self.font, fill=255)
+
+        return image, margin
+
+
+class GifTemplate:
+    """A decoded GIF and the text drawn on it. Read only.
+
+    The frames are shared by every render and the encoder, so they must never be drawn on directly. render()
+    copies the frames it draws on and shares the rest.
+    """
+
+    __slots__ = ('name', 'path', 'size', 'frames', 'durations', 'disposal', 'palette', 'transparency', 'loop',
+                 'duration', 'pad', 'slots', 'nbytes')
+
+    def __init__(self, name: str, path: str, spec: dict, fonts):
+        frames = []
+        durations = []
+        disposal = []
+
+        with _palette_frames(), Image.open(path) as base:
+            transparency = base.info.get('transparency')
+
+            for frame in ImageSequence.Iterator(base):
+                durations.append(frame.info.get('duration', 0))
+                disposal.append(getattr(base, 'disposal_method', 0))
+                frames.append(frame.copy())
+
+            palette = base.getpalette() if base.mode == 'P' else None
+            loop = base.info.get('loop', 0)
+            size = base.size
+
+        slots = tuple(TextSlot(s, fonts(s['size']), len(frames)) for s in spec['slots'])
+
+        _set = super().__setattr__
+        _set('name', name)
+        _set('path', path)
+        _set('size', size)
+        _set('frames', tuple(frames))
+        _set('durations', tuple(durations))
+        _set('disposal', tuple(disposal))
+        _set('palette', tuple(palette) if palette else None)
+        _set('transparency', transparency)
+        _set('loop', loop)
+        _set('duration', spec.get('duration'))
+        _set('pad', spec.get('pad', 0))
+        _set('slots', slots)
+        _set('nbytes', sum(f.width * f.height * len(f.getbands()) for f in frames) + len(palette or ()))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'GifTemplate <{self.name}> is read only.')
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __repr__(self):
+        return f'<GifTemplate name={self.name} frames={len(self)} size={self.size} nbytes={self.nbytes}>'
+
+    def copy_frames(self):
+        """A list of fresh copies of every frame, safe to draw on."""
+        return [frame.copy() for frame in self.frames]
+
+    def render(self, texts: dict):
+        """Draw texts, a mapping of slot text name to string, and return the frames to encode.
+
+        Each slots text is rasterized once per render and stamped onto the frames it covers, which only touches
+        the texts bounding box. Frames without text and the padding frames are the shared template frames, not
+        copies. Blocking.
+        """
+        frames = list(self.frames)
+        copied = set()
+
+        for slot in self.slots:
+            text = texts[slot.text]
+            size = text_size(slot.font, text)
+            masks = {}
+
+            for index in range(slot.start, slot.stop):
+                if index not in copied:
+                    frames[index] = frames[index].copy()
+                    copied.add(index)
+
+                # Pillow draws aliased text on palette frames, unless the slot chooses a fontmode.
+                draw = ImageDraw.Draw(frames[index])
+                fontmode = slot.fontmode or draw.fontmode
+
+                x, y = slot.position(index, size)
+                key = (math.modf(x)[0], math.modf(y)[0], fontmode)
+
+                try:
+                    mask, margin = masks[key]
+                except KeyError:
+                    mask, margin = masks[key] = slot.mask(text, size, key[:2], fontmode)
+
+                draw.bitmap((int(x) - margin, int(y) - margin), mask, fill=slot.fill)
+
+        # Saving sets encoderinfo on the first frame, so it is never a shared one.
+        if 0 not in copied:
+            frames[0] = frames[0].copy()
+
+        frames.extend([frames[-1]] * self.pad)
+        return frames
+
+    def encode(self, frames) -> bytes:
+        """Encode rendered frames with encode_gif. Frames are shown for the templates duration, or for their own
+        duration in the GIF when the template does not set one. Padding frames take the last frames duration.
+        """
+        last = len(self) - 1
+        durations = [self.duration or self.durations[min(i, last)] for i in range(len(frames))]
+
+        return encode_gif(frames, durations, loop=self.loop, transparency=self.transparency)
+
+
+class TemplateRegistry:
+    """Every GIF template used by the image commands, decoded once along with their fonts.
+
+    Templates are described in a JSON file, so adding one is a data change. Templates whose GIF is missing are
+    skipped and listed in missing, so the commands using them can decline instead of failing on each call.
+
+    Parameters
+    ------------
+    path: str [Optional]
+        The JSON file describing the templates. Defaults to resources/templates.json.
+    directory: str [Optional]
+        The directory holding the GIFs. Defaults to resources.
+    font: str [Optional]
+        The TrueType font drawn with. Each size is loaded once and shared between templates.
+    """
+
+    __slots__ = ('path', 'directory', 'font_path', 'fonts', 'templates', 'missing')
+
+    def __init__(self, path: str='resources/templates.json', *, directory: str='resources',
+                 font: str='resources/fonts/Playtime.ttf'):
+        self.path = path
+        self.directory = directory
+        self.font_path = font
+
+        with open(path, encoding='utf-8') as fp:
+            specs = json.load(fp)
+
+        fonts = {}
+        templates = {}
+        missing = []
+
+        def get_font(size: int):
+            if size not in fonts:
+                fonts[size] = ImageFont.truetype(font, size)
+            return fonts[size]
+
+        for name, spec in specs.items():
+            file = os.path.join(directory, spec['file'])
+
+            if not os.path.exists(file):
+                print(f'GIF template <{name}> is missing: {file}', file=sys.stderr)
+                missing.append(name)
+                continue
+
+            templates[name] = GifTemplate(name, file, spec, get_font)
+
+        self.fonts = types.MappingProxyType(fonts)
+        self.templates = types.MappingProxyType(templates)
+        self.missing = tuple(missing)
+
+    def __getitem__(self, name: str) -> GifTemplate:
+        return self.templates[name]
+
+    def __contains__(self, name: str):
+        return name in self.templates
+
+    def __iter__(self):
+        return iter(self.templates.values())
+
+    def __len__(self):
+        return len(self.templates)
+
+    def __repr__(self):
+        return f'<TemplateRegistry templates={len(self)} missing={len(self.missing)} nbytes={self.nbytes}>'
+
+    @property
+    def nbytes(self):
+        """The approximate memory held by decoded frames and palettes, not counting font faces."""
+        return sum(t.nbytes for t in self.templates.values())
@@ -0,0 +1,199 @@
+"""The MIT License (MIT)
+
+Copyright (c) 2018 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import numpy as np
+
+import os
+import time
+
+__all__ = ('Tier', 'TimeSeriesStore')
+
+
+class Tier:
+    """A ring of fixed width time buckets. E.g 1 minute buckets for a day."""
+
+    __slots__ = ('name', 'resolution', 'length')
+
+    def __init__(self, name: str, resolution: int, length: int):
+        self.name = name
+        self.resolution = resolution
+        self.length = length
+
+    def __repr__(self):
+        return f'<Tier name={self.name} resolution={self.resolution}s length={self.length}>'
+
+    @property
+    def span(self):
+        return self.resolution * self.length
+
+
+DEFAULT_TIERS = (Tier('1m', 60, 1440), Tier('1h', 3600, 720), Tier('1d', 86400, 365))
+
+# One bucket. Bucket is the absolute bucket number, ts // resolution, so stale slots can be told apart.
+BUCKET = np.dtype([('bucket', '<i8'), ('count', '<u4'), ('sum', '<f8'), ('min', '<f4'), ('max', '<f4')])
+
+_MAGIC = b'EVTS1\n'
+
+
+class TimeSeriesStore:
+    """A compact, multi resolution store for numeric samples, such as latency, backed by a memory mapped file.
+
+    Every sample is added to one bucket in each tier, so each tier is always a ready made downsample of the samples
+    and reads never aggregate. The default tiers keep 1 minute buckets for a day, 1 hour buckets for a month and
+    1 day buckets for a year, in about 69KiB per series (28 bytes per bucket).
+
+    The file is rebuilt, empty, if the series or tiers it was created with change.
+
+    Parameters
+    ------------
+    path: str
+        The file to map. Its directory is created if it does not exist.
+    series: tuple
+        The names of the series stored.
+    tiers: tuple [Optional]
+        The Tiers to keep, finest first. Defaults to 1m/1d, 1h/30d and 1d/365d.
+    """
+
+    __slots__ = ('path', 'series', 'tiers', '_index', '_map', '_rings', '_latest', 'version')
+
+    def __init__(self, path: str, *, series: tuple, tiers: tuple=DEFAULT_TIERS):
+        self.path = path
+        self.series = tuple(series)
+        self.tiers = {tier.name: tier for tier in tiers}
+
+        self._index = {name: i for i, name in enumerate(self.series)}
+        self._latest = {}
+
+        # Incremented on every write. Lets readers cache anything derived from the data.
+        self.version = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._map, self._rings = self._open()
+
+    def __repr__(self):
+        return f'<TimeSeriesStore path={self.path} series={self.series} tiers={tuple(self.tiers)}>'
+
+    def _header(self):
+        layout = ','.join(self.series) + '|' + ','.join(f'{t.resolution}x{t.length}' for t in self.tiers.values())
+        return (_MAGIC + layout.encode()).ljust(256, b'\0')
+
+    def _open(self):
+        header = self._header()
+        slots = sum(tier.length for tier in self.tiers.values()) * len(self.series)
+        size = len(header) + slots * BUCKET.itemsize
+
+        try:
+            with open(self.path, 'rb') as fp:
+                valid = fp.read(len(header)) == header and os.fstat(fp.fileno()).st_size == size
+        except FileNotFoundError:
+            valid = False
+
+        if not valid:
+            with open(self.path, 'wb') as fp:
+                fp.write(header)
+                fp.truncate(size)
+
+        mapped = np.memmap(self.path, dtype=BUCKET, mode='r+', offset=len(header))
+        if not valid:
+            # A bucket number of -1 is never current, so every slot starts empty.
+            mapped['bucket'] = -1
+
+        rings = {}
+        start = 0
+        for tier in self.tiers.values():
+            end = start + tier.length * len(self.series)
+            rings[tier.name] = mapped[start:end].reshape(len(self.series), tier.length)
+            start = end
+
+        return mapped, rings
+
+    def record(self, series: str, value: float, *, ts: float=None):
+        """Add a sample to every tier."""
+        ts = time.time() if ts is None else ts
+        row = self._index[series]
+
+        for name, tier in self.tiers.items():
+            bucket = int(ts // tier.resolution)
+            slot = self._rings[name][row, bucket % tier.length]
+
+            if slot['bucket'] != bucket:
+                slot['bucket'] = bucket
+                slot['count'] = 0
+                slot['sum'] = 0
+                slot['min'] = value
+                slot['max'] = value
+
+            slot['count'] += 1
+            slot['sum'] += value
+            slot['min'] = min(slot['min'], value)
+            slot['max'] = max(slot['max'], value)
+
+        self._latest[series] = value
+        self.version += 1
+
+    def latest(self, series: str, default=None):
+        """The last recorded sample, or the mean of the newest minute bucket after a restart."""
+        try:
+            return self._latest[series]
+        except KeyError:
+            pass
+
+        values = self.values(series, next(iter(self.tiers)))
+        return float(values[-1]) if len(values) else default
+
+    def query(self, series: str, tier: str, *, count: int=None, now: float=None):
+        """Return the bucket start timestamps and buckets of the last count buckets in a tier, oldest first.
+
+        Buckets without any samples are left out.
+        """
+        info = self.tiers[tier]
+        now = time.time() if now is None else now
+
+        count = info.length if count is None else min(count, info.length)
+        newest = int(now // info.resolution)
+        wanted = np.arange(newest - count + 1, newest + 1)
+
+        buckets = self._rings[tier][self._index[series]][wanted % info.length]
+        found = buckets[buckets['bucket'] == wanted]
+
+        return found['bucket'] * info.resolution, found
+
+    def values(self, series: str, tier: str, *, count: int=None, now: float=None):
+        """The mean of each bucket, oldest first."""
+        _, buckets = self.query(series, tier, count=count, now=now)
+        return buckets['sum'] / buckets['count']
+
+    def mean(self, series: str, seconds: float, *, now: float=None):
+        """The mean of every sample over the last seconds, from the finest tier which covers them."""
+        tiers = list(self.tiers.values())
+        tier = next((t for t in tiers if t.span >= seconds), tiers[-1])
+
+        _, buckets = self.query(series, tier.name, count=-(-int(seconds) // tier.resolution), now=now)
+        count = buckets['count'].sum()
+        return float(buckets['sum'].sum() / count) if count else None
+
+    def flush(self):
+        """Write dirty pages back to the file."""
+        self._map.flush()